@@ -1,57 +1,157 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from werkzeug.utils import secure_filename
 import os
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import nest_asyncio
-import PyPDF2
-import re
-from openai import OpenAI
 import dotenv
-import csv
+import json
 import logging
 import threading
-import dateutil.parser
+import multiprocessing
 from utils.helpers import (
     allowed_file,
-    parse_rbi_directions,
+    parse_document_rows,
+    enrich_document_rows,
     enhance_csv_with_summary_and_action,
     extract_document_summary_and_action,
+    write_structured_csv,
+    read_document_summary,
+    failed_row_indices,
+    EXPECTED_COLUMNS,
+)
+from utils.dedup import ContentRegistry, save_and_hash
+from utils.llm import llm_cache, rate_limiter, circuit_breaker, usage_snapshot
+from utils.pdf_extract import extract_pdf_text, backend_timings
+from utils.text_clean import prepare_text
+from utils.jobs import JobQueue, QueueFull
+from utils.log_setup import setup_logging, log_stats
+from utils.perf import perf, document_totals
+from utils.checkpoints import CheckpointStore, StageFailed, next_stages, read_jsonl, write_text
+from utils.document_rows import DocumentRow, read_structured_csv
+from utils.row_store import RowStore
+from utils.notice_registry import NoticeRegistry, APPROVAL_STATUSES, now_string
+from utils.metrics import UploadMetrics
+from utils.progress import ProgressHub, format_sse
+from utils.revisions import (
+    match_rows,
+    carry_forward,
+    change_report,
+    save_report,
+    load_report,
 )
 import uuid
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("app.log"), logging.StreamHandler()],
-)
+# Load environment variables
+dotenv.load_dotenv()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config["UPLOAD_FOLDER"] = "Uploads"
 app.config["EXTRACTED_TEXT"] = "data/Extracted Text"
 app.config["EXCEL_SHEETS"] = "data/Excel Sheets"
+app.config["CONTENT_REGISTRY"] = "data/Content Registry"
+app.config["CHANGE_REPORTS"] = "data/Change Reports"
+app.config["CHECKPOINTS"] = "data/Checkpoints"
 ALLOWED_EXTENSIONS = {"pdf"}
 
-# Ensure directories exist
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-os.makedirs(app.config["EXTRACTED_TEXT"], exist_ok=True)
-os.makedirs(app.config["EXCEL_SHEETS"], exist_ok=True)
-logger.info("Application directories initialized")
+# Content-addressed cache of finished documents, keyed by PDF sha256
+content_registry = ContentRegistry(app.config["CONTENT_REGISTRY"])
 
-# Load environment variables
-dotenv.load_dotenv()
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-logger.info("Environment variables loaded")
+# Row-level copy of every CSV so cell edits do not rewrite whole documents
+row_store = RowStore(os.getenv("ROW_STORE_PATH", "data/rows.sqlite3"))
+
+# Bounded queue of processing jobs drained by a fixed worker pool
+job_queue = JobQueue(
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_size=int(os.getenv("JOB_QUEUE_SIZE", "20")),
+)
+
+# Live progress events per job (job id == notice id), streamed over SSE
+progress_hub = ProgressHub()
+
+# Durable processing/approval status per notice, indexed by notice_id and filename
+notice_registry = NoticeRegistry(os.getenv("NOTICE_REGISTRY_PATH", "data/notices.sqlite3"))
+# Per-stage checkpoints of unfinished jobs; those jobs resume instead of failing
+checkpoints = CheckpointStore(app.config["CHECKPOINTS"])
+
+# Dashboard counters kept current by the notice events below
+upload_metrics = UploadMetrics(os.getenv("METRICS_PATH", "data/metrics.sqlite3"))
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def init_app(resume=True):
+    # Start-up work, run once per server process. Kept out of module scope: the PDF
+    # pool's spawn workers re-import this module and must not repeat any of it.
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        _initialized = True
+
+        # Queue-backed logging: JSON lines to a rotating app.log and the console
+        setup_logging()
+        for folder in ("UPLOAD_FOLDER", "EXTRACTED_TEXT", "EXCEL_SHEETS"):
+            os.makedirs(app.config[folder], exist_ok=True)
+        logger.info("Application directories initialized")
+
+        # Apply nest_asyncio to allow nested event loops
+        nest_asyncio.apply()
+        logger.info("Nested asyncio applied")
+
+        logger.info(
+            f"Row store imported {row_store.import_directory(app.config['EXCEL_SHEETS'])} documents"
+        )
+        reconciled = notice_registry.fail_interrupted(keep=checkpoints.pending())
+        adopted = notice_registry.sync_directory(
+            app.config["EXCEL_SHEETS"], app.config["UPLOAD_FOLDER"]
+        )
+        logger.info(f"Notice registry adopted {adopted} existing CSVs")
+        if reconciled or adopted or upload_metrics.is_empty():
+            upload_metrics.rebuild(notice_registry.list(with_csv=False))
+
+        # Never from a child process (e.g. a PDF pool worker): it would run every
+        # checkpointed job a second time
+        if resume and multiprocessing.parent_process() is None:
+            threading.Thread(target=resume_interrupted, name="resume-jobs", daemon=True).start()
+
+
+@app.before_request
+def ensure_initialized():
+    # Servers that import the app (flask run, WSGI) initialise on the first request
+    init_app()
+
+
+def register_notice(notice_id, csv_filename, content_hash, update_of=""):
+    notice = notice_registry.register(
+        notice_id, csv_filename, content_hash=content_hash, update_of=update_of
+    )
+    upload_metrics.record_upload(notice["upload_date"][:10], notice["status"], content_hash)
 
-# Apply nest_asyncio to allow nested event loops
-nest_asyncio.apply()
-logger.info("Nested asyncio applied")
 
-# In-memory status tracking
-file_status = {}
-notice_status = {}  # notice_id: {status, last_updated, filename}
+def set_processing_status(notice_id, status, reason=None, **fields):
+    previous = notice_registry.get(notice_id)
+    notice_registry.update(notice_id, status=status, last_updated=now_string(), **fields)
+    if previous:
+        upload_metrics.record_status(previous["status"], status)
+    if status == "Completed":
+        progress_hub.publish(
+            notice_id, "completed", filename=previous["filename"] if previous else None
+        )
+    elif status == "Failed":
+        progress_hub.publish(notice_id, "failed", reason=reason or "Processing failed")
+
+
+def remove_notice(notice_id):
+    notice = notice_registry.get(notice_id)
+    notice_registry.remove(notice_id)
+    if notice:
+        # Rows are served from the store, so they must go with the notice
+        row_store.delete(notice["document_id"])
+        upload_metrics.record_removed(
+            notice["upload_date"][:10], notice["status"], notice["content_hash"]
+        )
 
 
 @app.route("/")
@@ -71,6 +171,14 @@ def upload_file():
         logger.error("No selected file")
         return jsonify({"error": "No selected file"}), 400
     if file and allowed_file(file.filename):
+        # An update of a processed notice reuses its unchanged rows
+        update_of = request.values.get("update_of", "").strip()
+        if update_of:
+            previous = notice_registry.get(update_of)
+            if not previous or not previous["has_csv"] or previous["status"] != "Completed":
+                logger.error(f"Cannot update notice {update_of}: not a completed notice")
+                return jsonify({"error": "update_of must be a completed notice"}), 400
+
         # Add timestamp and UUID to filename
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         notice_id = str(uuid.uuid4())
@@ -79,158 +187,86 @@ def upload_file():
         file_path = os.path.join(app.config["UPLOAD_FOLDER"], unique_filename)
         csv_filename = f"{base}_{timestamp}_{notice_id}.csv"
         logger.info(f"Saving uploaded file: {unique_filename}")
-        file.save(file_path)
+        content_hash = save_and_hash(file.stream, file_path)
+        force = request.values.get("force", "").lower() in ("1", "true", "yes")
 
-        file_status[csv_filename] = "Processing"
-        notice_status[notice_id] = {
-            "status": "Pending Approval",
-            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "filename": csv_filename,
-        }
+        register_notice(notice_id, csv_filename, content_hash, update_of)
         logger.info(f"Set status to Processing for {csv_filename}")
 
-        def process_file():
+        # Updates go through the diff below so the previous version's edits carry over
+        cached = None if force or update_of else content_registry.lookup(content_hash)
+        if cached:
+            logger.info(
+                f"Duplicate upload of {cached['source']} ({content_hash}), reusing results"
+            )
             try:
-                logger.info(f"Extracting text from PDF: {unique_filename}")
-                with open(file_path, "rb") as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                        else:
-                            logger.warning(
-                                f"Empty text extracted from page in {unique_filename}"
-                            )
-
-                if not text.strip():
-                    logger.error(f"No text extracted from PDF: {unique_filename}")
-                    file_status[csv_filename] = "Failed"
-                    return
-
-                txt_path = os.path.join(
-                    app.config["EXTRACTED_TEXT"], f"{base}_{timestamp}_{notice_id}.txt"
+                materialize_duplicate(
+                    content_hash,
+                    cached,
+                    f"{base}_{timestamp}_{notice_id}",
+                    csv_filename,
                 )
-                logger.info(f"Saving extracted text to: {txt_path}")
-                with open(txt_path, "w", encoding="utf-8") as f:
-                    f.write(text)
-
-                logger.info(f"Reading text from: {txt_path}")
-                with open(txt_path, "r", encoding="utf-8") as file:
-                    raw_data = file.read()
-
-                # --- Extract document-level summary and action item ---
-                doc_summary_action = extract_document_summary_and_action(raw_data)
-                notice_status[notice_id]["summary"] = doc_summary_action.get(
-                    "summary", ""
+                set_processing_status(
+                    notice_id,
+                    "Completed",
+                    has_csv=1,
+                    size=os.path.getsize(
+                        os.path.join(app.config["EXCEL_SHEETS"], csv_filename)
+                    ),
+                    summary=cached.get("summary", ""),
+                    action_item=cached.get("action_item", ""),
                 )
-                notice_status[notice_id]["action_item"] = doc_summary_action.get(
-                    "action_item", ""
-                )
-
-                logger.info("Parsing text data into DataFrame")
-                df = parse_rbi_directions(raw_data)
-
-                if df.empty:
-                    logger.error(f"Parsed DataFrame is empty for {unique_filename}")
-                    file_status[csv_filename] = "Failed"
-                    return
-                logger.info(f"Parsed DataFrame contains {len(df)} rows")
-
-                csv_path = os.path.join(app.config["EXCEL_SHEETS"], csv_filename)
-                logger.info(f"Saving initial CSV to: {csv_path}")
-                df.to_csv(csv_path, index=False, encoding="utf-8", na_rep="")
-
-                structured_data = []
-                document_id = f"{base}_{timestamp}_{notice_id}"
-                document_summary = doc_summary_action.get("summary", "")
-                document_action_item = doc_summary_action.get("action_item", "")
-                for idx, row in enumerate(df.iterrows()):
-                    _, row = row
-                    structured_data.append(
-                        [
-                            document_id,
-                            row["Chapter"],
-                            row["Section No."],
-                            row["Section"],
-                            row["Sub-Section"],
-                            "",  # Summary
-                            "",  # Action Item
-                            "",  # Due date
-                            "",  # Periodicity
-                            "No",  # Marked as Completed
-                            "Not Started",  # Work Status
-                            "",  # Role Assigned To
-                            document_summary if idx == 0 else "",
-                            document_action_item if idx == 0 else "",
-                        ]
-                    )
-
-                if not structured_data:
-                    logger.error(f"No structured data generated for {unique_filename}")
-                    file_status[csv_filename] = "Failed"
-                    return
-                logger.info(f"Generated {len(structured_data)} rows of structured data")
-
-                logger.info(f"Saving structured CSV to: {csv_path}")
-                with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(
-                        [
-                            "Document ID",
-                            "Chapter",
-                            "Section No.",
-                            "Section",
-                            "Sub-Section",
-                            "Summary",
-                            "Action Item",
-                            "Due date",
-                            "Periodicity",
-                            "Marked as Completed",
-                            "Work Status",
-                            "Role Assigned To",
-                            "Document Summary",
-                            "Document Action Item",
-                        ]
-                    )
-                    writer.writerows(structured_data)
-
-                # Enhance CSV with Summary, Action Item, Due date, and Periodicity
-                logger.info(
-                    f"Enhancing CSV with summary, action items, and periodicity: {csv_path}"
-                )
-                if not enhance_csv_with_summary_and_action(csv_path):
-                    logger.error(f"Failed to enhance CSV: {csv_path}")
-                    file_status[csv_filename] = "Failed"
-                    return
-
-                # Verify CSV file
-                if not os.path.exists(csv_path):
-                    logger.error(f"CSV file was not created: {csv_path}")
-                    file_status[csv_filename] = "Failed"
-                    return
-                csv_size = os.path.getsize(csv_path)
-                if csv_size < 100:
-                    logger.error(
-                        f"CSV file is suspiciously small ({csv_size} bytes): {csv_path}"
-                    )
-                    file_status[csv_filename] = "Failed"
-                    return
-
-                logger.info(f"File {unique_filename} processed successfully")
-                file_status[csv_filename] = "Completed"
-                notice_status[notice_id]["last_updated"] = datetime.now().strftime(
-                    "%Y-%m-%d %H:%M:%S"
+                return (
+                    jsonify(
+                        {
+                            "message": "Duplicate upload, reused previous results",
+                            "filename": unique_filename,
+                            "csv_path": csv_filename,
+                            "notice_id": notice_id,
+                            "duplicate_of": cached["source"],
+                        }
+                    ),
+                    200,
                 )
             except Exception as e:
-                logger.error(f"Error processing file {unique_filename}: {str(e)}")
-                file_status[csv_filename] = "Failed"
-                notice_status[notice_id]["last_updated"] = datetime.now().strftime(
-                    "%Y-%m-%d %H:%M:%S"
+                logger.error(
+                    f"Failed to reuse registry entry {content_hash}, reprocessing: {str(e)}"
                 )
 
-        threading.Thread(target=process_file, daemon=True).start()
+        checkpoints.create(
+            notice_id,
+            file_path=file_path,
+            unique_filename=unique_filename,
+            csv_filename=csv_filename,
+            document_id=f"{base}_{timestamp}_{notice_id}",
+            content_hash=content_hash,
+            update_of=update_of,
+            priority=request.values.get("priority"),
+        )
+        progress_hub.publish(
+            notice_id, "queued", queue_depth=job_queue.metrics()["queue_depth"]
+        )
+        try:
+            job = job_queue.submit(
+                run_pipeline,
+                notice_id,
+                job_id=notice_id,
+                name=unique_filename,
+                priority=request.values.get("priority"),
+            )
+        except (QueueFull, ValueError) as e:
+            logger.error(f"Rejecting upload {unique_filename}: {str(e)}")
+            remove_notice(notice_id)
+            checkpoints.remove(notice_id)
+            progress_hub.publish(notice_id, "failed", reason=str(e))
+            os.remove(file_path)
+            if isinstance(e, ValueError):
+                return jsonify({"error": "Invalid priority"}), 400
+            response = jsonify(
+                {"error": "Processing queue is full", "retry_after": e.retry_after}
+            )
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response, 503
 
         return (
             jsonify(
@@ -239,6 +275,8 @@ def upload_file():
                     "filename": unique_filename,
                     "csv_path": csv_filename,
                     "notice_id": notice_id,
+                    "job_id": job.id,
+                    "queue_depth": job_queue.metrics()["queue_depth"],
                 }
             ),
             202,
@@ -247,43 +285,366 @@ def upload_file():
     return jsonify({"error": "Invalid file type"}), 400
 
 
+def reenrich_failures(notice_id, failed):
+    # Job body: enrich only the rows that failed before, then refresh the stores
+    job_id = f"reenrich-{notice_id}"
+    progress = progress_hub.reporter(job_id)
+    progress("started", rows=len(failed))
+    perf.start(notice_id, stored_perf(notice_registry.get(notice_id)))
+    try:
+        with perf.stage(notice_id, "reenrich"):
+            filename, still_failed = reenrich_rows(notice_id, failed, progress)
+    except Exception as e:
+        # e.g. the notice was removed while the job was running
+        logger.error(f"Re-enriching notice {notice_id} failed: {str(e)}")
+        progress_hub.publish(job_id, "failed", reason=str(e))
+        return
+    finally:
+        notice_registry.update(notice_id, **perf_fields(perf.finish(notice_id)))
+    progress_hub.publish(job_id, "completed", filename=filename, still_failed=still_failed)
+
+
+def reenrich_rows(notice_id, failed, progress):
+    # Returns the CSV filename and how many of its rows still failed after the retry
+    notice = notice_registry.get(notice_id)
+    if not notice:
+        raise StageFailed("Notice not found")
+    csv_path = os.path.join(app.config["EXCEL_SHEETS"], notice["filename"])
+    if not enhance_csv_with_summary_and_action(csv_path, progress=progress, only_rows=failed):
+        raise StageFailed("Enrichment failed")
+    row_store.ensure(notice["document_id"], csv_path)
+    still_failed = len(failed_row_indices(row_store.rows(notice["document_id"])))
+    notice_registry.update(
+        notice_id, size=os.path.getsize(csv_path), last_updated=now_string()
+    )
+    txt_path = os.path.join(app.config["EXTRACTED_TEXT"], f"{notice['document_id']}.txt")
+    if notice["content_hash"] and os.path.exists(txt_path):
+        # Later duplicate uploads should reuse the repaired rows, not the holes
+        try:
+            with open(txt_path, "r", encoding="utf-8") as f:
+                content_registry.store_from_csv(
+                    notice["content_hash"], f.read(), csv_path, notice["document_id"]
+                )
+        except Exception as e:
+            logger.error(f"Failed to refresh content {notice['content_hash']}: {str(e)}")
+    logger.info(
+        f"Re-enriched {len(failed)} failed rows of {notice['filename']}, {still_failed} still failed"
+    )
+    return notice["filename"], still_failed
+
+
+# Stages hand their results to the next one in `work`, kept in memory for the run;
+# only a resumed run reads them back from the checkpoint and the files on disk
+def stage_extract(notice_id, job, data, work, progress):
+    logger.info(f"Extracting text from PDF: {job['unique_filename']}")
+    extraction = extract_pdf_text(job["file_path"])
+    if extraction.empty_pages:
+        logger.warning(
+            f"Empty text extracted from {extraction.empty_pages} pages in {job['unique_filename']}"
+        )
+    if not extraction.text.strip():
+        raise StageFailed("No text extracted")
+    checkpoints.save_json(notice_id, "pages.json", extraction.pages)
+    work["pages"] = extraction.pages
+    progress(
+        "text_extracted",
+        pages=len(extraction.pages),
+        empty_pages=extraction.empty_pages,
+        characters=len(extraction.text),
+    )
+
+
+def stage_clean(notice_id, job, data, work, progress):
+    # Strip Hindi, page furniture and letterhead before any model sees the text
+    pages = work.get("pages") or checkpoints.load_json(notice_id, "pages.json")
+    cleaning = prepare_text(pages)
+    if not cleaning.text.strip():
+        raise StageFailed("No text left after cleaning")
+    notice_registry.update(notice_id, tokens_saved=cleaning.tokens_saved)
+    progress("text_cleaned", **cleaning.stats())
+
+    txt_path = os.path.join(app.config["EXTRACTED_TEXT"], f"{job['document_id']}.txt")
+    logger.info(f"Saving extracted text to: {txt_path}")
+    write_text(txt_path, cleaning.text)
+    work["text"] = cleaning.text
+    return {"txt_path": txt_path}
+
+
+def stage_text(data, work):
+    if "text" not in work:
+        logger.info(f"Reading text from: {data['txt_path']}")
+        with open(data["txt_path"], "r", encoding="utf-8") as file:
+            work["text"] = file.read()
+    return work["text"]
+
+
+def stage_rows(notice_id, data, work):
+    # After a restart: the structure snapshot plus the rows enrichment had finished
+    if "rows" not in work:
+        rows = read_structured_csv(data["csv_path"]).rows
+        for result in read_jsonl(checkpoints.path(notice_id, "enrich.jsonl")):
+            rows[result["index"]].apply(result)
+        work["rows"] = rows
+    return work["rows"]
+
+
+def stage_summary(notice_id, job, data, work, progress):
+    doc_summary_action = extract_document_summary_and_action(stage_text(data, work))
+    notice_registry.update(
+        notice_id,
+        summary=doc_summary_action.get("summary", ""),
+        action_item=doc_summary_action.get("action_item", ""),
+    )
+    progress("summary_extracted")
+
+
+def stage_structure(notice_id, job, data, work, progress):
+    logger.info("Parsing text into structured rows")
+    rows, structure_stats = parse_document_rows(stage_text(data, work))
+    if not rows:
+        raise StageFailed("No structure rows parsed")
+    logger.info(f"Generated {len(rows)} rows of structured data")
+    notice_registry.update(
+        notice_id, structure_local_share=structure_stats.get("local_share", 0)
+    )
+    progress("structure_parsed", rows=len(rows), **structure_stats)
+
+    only_rows = None
+    if job["update_of"]:
+        compared = compare_with_previous(job["update_of"], notice_id, job["csv_filename"], rows)
+        if compared:
+            rows, only_rows, counts = compared
+            progress("revision_compared", **counts)
+
+    # The unenriched snapshot is enrichment's restart point and lets the file be
+    # opened while its rows are still being enriched
+    csv_path = os.path.join(app.config["EXCEL_SHEETS"], job["csv_filename"])
+    notice = notice_registry.get(notice_id)
+    logger.info(f"Saving structured CSV to: {csv_path}")
+    with perf.timed("csv_write"):
+        write_structured_csv(
+            csv_path,
+            job["document_id"],
+            rows,
+            notice["summary"],
+            notice["action_item"],
+        )
+    work["rows"] = rows
+    notice_registry.update(notice_id, has_csv=1)
+    return {"csv_path": csv_path, "only_rows": only_rows}
+
+
+def stage_enrich(notice_id, job, data, work, progress):
+    # Finished rows are appended to enrich.jsonl, so a restart picks up where it stopped
+    logger.info(f"Enhancing rows with summary, action items, and periodicity: {data['csv_path']}")
+    try:
+        enrich_document_rows(
+            stage_rows(notice_id, data, work),
+            progress=progress,
+            only_rows=data["only_rows"],
+            checkpoint=checkpoints.path(notice_id, "enrich.jsonl"),
+        )
+    except Exception as e:
+        logger.error(f"Error enhancing rows of {job['unique_filename']}: {str(e)}")
+        raise StageFailed("Enrichment failed")
+
+
+def stage_finalize(notice_id, job, data, work, progress):
+    # The enriched CSV is written once, replacing the structure snapshot atomically
+    csv_path = data["csv_path"]
+    rows = stage_rows(notice_id, data, work)
+    notice = notice_registry.get(notice_id)
+    with perf.timed("csv_write"):
+        csv_size = write_structured_csv(
+            csv_path, job["document_id"], rows, notice["summary"], notice["action_item"]
+        )
+    if csv_size < 100:
+        logger.error(f"CSV file is suspiciously small ({csv_size} bytes): {csv_path}")
+        raise StageFailed("CSV is too small")
+
+    try:
+        content_registry.store(
+            job["content_hash"],
+            stage_text(data, work),
+            rows,
+            notice["summary"],
+            notice["action_item"],
+            job["document_id"],
+        )
+    except Exception as e:
+        logger.error(f"Failed to register content {job['content_hash']}: {str(e)}")
+
+    logger.info(f"File {job['unique_filename']} processed successfully")
+    set_processing_status(notice_id, "Completed", size=csv_size)
+
+
+PIPELINE = {
+    "extract": stage_extract,
+    "clean": stage_clean,
+    "summary": stage_summary,
+    "structure": stage_structure,
+    "enrich": stage_enrich,
+    "finalize": stage_finalize,
+}
+
+
+def stored_perf(notice):
+    # The {stage: counters} breakdown saved with a notice, {} if it has none
+    if not notice or not notice["perf"]:
+        return {}
+    try:
+        return json.loads(notice["perf"])
+    except ValueError:
+        return {}
+
+
+def perf_fields(breakdown):
+    # Registry columns for a document's breakdown: the JSON plus sortable totals
+    totals = document_totals(breakdown)
+    return {
+        "perf": json.dumps(breakdown),
+        "llm_calls": totals["calls"],
+        "prompt_tokens": totals["prompt_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "cost_usd": totals["cost_usd"],
+        "processing_seconds": totals["seconds"],
+    }
+
+
+def run_pipeline(notice_id):
+    # Job body: runs every stage after the last checkpoint, recording each one as it
+    # finishes; the checkpoint is dropped once the notice completes or fails
+    state = checkpoints.load(notice_id)
+    if state is None:
+        set_processing_status(notice_id, "Failed", reason="Checkpoint missing")
+        return
+    job = state["job"]
+    progress = progress_hub.reporter(notice_id)
+    if state["stage"]:
+        logger.info(f"Resuming {job['unique_filename']} after stage {state['stage']}")
+        progress("resumed", stage=state["stage"])
+    else:
+        progress("started")
+    work = {}
+    perf.start(notice_id, stored_perf(notice_registry.get(notice_id)))
+    try:
+        for stage in next_stages(state):
+            with perf.stage(notice_id, stage):
+                output = PIPELINE[stage](notice_id, job, state["data"], work, progress) or {}
+            state = checkpoints.complete(notice_id, stage, **output)
+            notice_registry.update(notice_id, stage=stage, **perf_fields(perf.document(notice_id)))
+    except StageFailed as e:
+        logger.error(f"Processing {job['unique_filename']} failed: {str(e)}")
+        set_processing_status(notice_id, "Failed", reason=str(e))
+    except Exception as e:
+        logger.error(f"Error processing file {job['unique_filename']}: {str(e)}")
+        set_processing_status(notice_id, "Failed", reason=str(e))
+    breakdown = perf.finish(notice_id)
+    notice_registry.update(notice_id, **perf_fields(breakdown))
+    checkpoints.remove(notice_id)
+
+
+def resume_interrupted():
+    # Requeue jobs a previous run left unfinished, from their last checkpoint. Runs on
+    # a background thread: a backlog larger than the queue waits for free slots.
+    resumed = 0
+    for notice_id in checkpoints.pending():
+        notice = notice_registry.get(notice_id)
+        state = checkpoints.load(notice_id)
+        if not notice or notice["status"] != "Processing" or state is None:
+            checkpoints.remove(notice_id)
+            continue
+        progress_hub.publish(notice_id, "queued", queue_depth=job_queue.metrics()["queue_depth"])
+        job_queue.submit(
+            run_pipeline,
+            notice_id,
+            job_id=notice_id,
+            name=state["job"]["unique_filename"],
+            priority=state["job"]["priority"],
+            block=True,
+        )
+        resumed += 1
+    if resumed:
+        logger.info(f"Resumed {resumed} interrupted jobs from their checkpoints")
+    return resumed
+
+
+def change_report_path(notice_id):
+    return os.path.join(app.config["CHANGE_REPORTS"], f"{notice_id}.json")
+
+
+def compare_with_previous(previous_id, notice_id, csv_filename, rows):
+    # Diff freshly parsed rows against the previous version of the notice. Returns the
+    # rows with unchanged ones carried forward, the indices still to enrich and the
+    # change counts, or None to process the document in full.
+    previous = notice_registry.get(previous_id)
+    if not previous:
+        logger.warning(f"Previous notice {previous_id} is gone, processing in full")
+        return None
+    previous_csv = os.path.join(app.config["EXCEL_SHEETS"], previous["filename"])
+    if not row_store.ensure(previous["document_id"], previous_csv):
+        logger.warning(f"No rows for previous notice {previous_id}, processing in full")
+        return None
+
+    old_rows = row_store.rows(previous["document_id"])
+    matches, removed = match_rows(old_rows, rows)
+    report = change_report(old_rows, rows, matches, removed)
+    report.update(
+        notice_id=notice_id,
+        filename=csv_filename,
+        previous_notice_id=previous_id,
+        previous_filename=previous["filename"],
+        generated=now_string(),
+    )
+    save_report(change_report_path(notice_id), report)
+    logger.info(f"Compared with {previous['filename']}: {report['counts']}")
+
+    only_rows = [match["index"] for match in matches if match["change"] != "unchanged"]
+    carried = [DocumentRow.from_dict(row) for row in carry_forward(old_rows, rows, matches)]
+    return carried, only_rows, report["counts"]
+
+
+def materialize_duplicate(content_hash, manifest, document_id, csv_filename):
+    # Build the new document's artifacts from a registry entry without any model calls
+    txt_path = os.path.join(app.config["EXTRACTED_TEXT"], f"{document_id}.txt")
+    with open(txt_path, "w", encoding="utf-8") as f:
+        f.write(content_registry.load_text(content_hash))
+
+    rows = content_registry.load_rows(content_hash)
+    csv_path = os.path.join(app.config["EXCEL_SHEETS"], csv_filename)
+    write_structured_csv(
+        csv_path,
+        document_id,
+        rows,
+        manifest.get("summary", ""),
+        manifest.get("action_item", ""),
+    )
+    logger.info(f"Materialized {len(rows)} cached rows into {csv_path}")
+
+
 @app.route("/api/files", methods=["GET"])
 def list_files():
     logger.info("Listing CSV files")
-    files = []
     try:
-        excel_dir = app.config["EXCEL_SHEETS"]
-        for filename in os.listdir(excel_dir):
-            if filename.endswith(".csv"):
-                file_path = os.path.join(excel_dir, filename)
-                document_id = os.path.splitext(filename)[0]
-                found_notice_id = None
-                for notice_id, notice_info in notice_status.items():
-                    if notice_info["filename"] == filename:
-                        found_notice_id = notice_id
-                        break
-                if found_notice_id:
-                    approval_status = notice_status[found_notice_id]["status"]
-                    last_updated = notice_status[found_notice_id]["last_updated"]
-                else:
-                    approval_status = "Pending Approval"
-                    last_updated = datetime.fromtimestamp(
-                        os.path.getctime(file_path)
-                    ).strftime("%Y-%m-%d %H:%M:%S")
-                files.append(
-                    {
-                        "filename": filename,
-                        "document_id": document_id,
-                        "upload_date": datetime.fromtimestamp(
-                            os.path.getctime(file_path)
-                        ).strftime("%Y-%m-%d %H:%M:%S"),
-                        "size": os.path.getsize(file_path),
-                        "status": file_status.get(filename, "Completed"),
-                        "notice_id": found_notice_id or document_id,
-                        "approval_status": approval_status,
-                        "last_updated": last_updated,
-                    }
-                )
+        files = [
+            {
+                "filename": notice["filename"],
+                "document_id": notice["document_id"],
+                "upload_date": notice["upload_date"],
+                "size": notice["size"],
+                "status": notice["status"],
+                "notice_id": notice["notice_id"],
+                "approval_status": notice["approval_status"],
+                "last_updated": notice["last_updated"],
+                "update_of": notice["update_of"],
+                "tokens_saved": notice["tokens_saved"],
+                "structure_local_share": notice["structure_local_share"],
+                "stage": notice["stage"],
+                "cost_usd": notice["cost_usd"],
+                "processing_seconds": notice["processing_seconds"],
+            }
+            for notice in notice_registry.list(status=request.args.get("status"))
+        ]
         logger.info(f"Found {len(files)} CSV files")
     except Exception as e:
         logger.error(f"Error listing files: {str(e)}")
@@ -291,40 +652,77 @@ def list_files():
     return jsonify(files)
 
 
+# Rows per /api/file page, and the largest page a client may ask for
+FILE_PAGE_SIZE = int(os.getenv("FILE_PAGE_SIZE", "100"))
+FILE_PAGE_MAX = int(os.getenv("FILE_PAGE_MAX", "1000"))
+
+
+def open_document(filename):
+    # (document_id, headers, row_count) from the row store, importing the CSV on first use;
+    # returns an error message and status instead when the document cannot be shown
+    document_id = os.path.splitext(filename)[0]
+    file_path = os.path.join(app.config["EXCEL_SHEETS"], filename)
+    if not row_store.ensure(document_id, file_path):
+        logger.error(f"File not found: {filename}")
+        return None, ("File not found", 404)
+    headers = row_store.headers(document_id)
+    total = row_store.row_count(document_id)
+    if not total:
+        logger.error(f"File is empty: {filename}")
+        return None, ("File is empty", 400)
+    if not all(col in headers for col in EXPECTED_COLUMNS):
+        logger.error(f"Invalid CSV structure: {filename}")
+        return None, ("Invalid CSV structure", 400)
+    return (document_id, headers, total), None
+
+
 @app.route("/api/file/<filename>", methods=["GET"])
 def get_file_content(filename):
     logger.info(f"Fetching content for file: {filename}")
-    file_path = os.path.join(app.config["EXCEL_SHEETS"], filename)
-    if not os.path.exists(file_path):
-        logger.error(f"File not found: {filename}")
-        return jsonify({"error": "File not found"}), 404
     try:
-        df = pd.read_csv(file_path)
-        if df.empty:
-            logger.error(f"File is empty: {filename}")
-            return jsonify({"error": "File is empty"}), 400
-        expected_columns = [
-            "Document ID",
-            "Chapter",
-            "Section No.",
-            "Section",
-            "Sub-Section",
-            "Summary",
-            "Action Item",
-            "Due date",
-            "Periodicity",
-            "Marked as Completed",
-            "Work Status",
-            "Role Assigned To",
-        ]
-        if not all(col in df.columns for col in expected_columns):
-            logger.error(f"Invalid CSV structure: {filename}")
-            return jsonify({"error": "Invalid CSV structure"}), 400
-        df = df.fillna("")
-        data = df.to_dict(orient="records")
-        headers = df.columns.tolist()
-        logger.info(f"Successfully fetched content for {filename}")
-        return jsonify({"headers": headers, "data": data})
+        document, error = open_document(filename)
+        if error:
+            return jsonify({"error": error[0]}), error[1]
+        document_id, headers, total = document
+
+        # Read the version before the rows so a concurrent edit can only make the ETag stale
+        etag = f"v{row_store.version(document_id)}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        offset = request.args.get("offset", 0, type=int)
+        limit = request.args.get("limit", FILE_PAGE_SIZE, type=int)
+        if offset < 0 or not 1 <= limit <= FILE_PAGE_MAX:
+            logger.error(f"Invalid page offset={offset} limit={limit} for {filename}")
+            return jsonify({"error": f"offset must be >= 0 and limit 1-{FILE_PAGE_MAX}"}), 400
+        columns = headers
+        if request.args.get("columns"):
+            columns = [col.strip() for col in request.args["columns"].split(",")]
+            unknown = [col for col in columns if col not in headers]
+            if unknown:
+                logger.error(f"Unknown columns requested for {filename}: {unknown}")
+                return jsonify({"error": f"Unknown columns: {unknown}"}), 400
+
+        rows = row_store.rows(document_id, offset, limit)
+        if columns is not headers:
+            rows = [{col: row.get(col, "") for col in columns} for row in rows]
+        end = offset + len(rows)
+        response = jsonify(
+            {
+                "headers": columns,
+                "data": rows,
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+                "next_offset": end if end < total else None,
+            }
+        )
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        logger.info(f"Successfully fetched rows {offset}-{end} of {total} for {filename}")
+        return response
     except Exception as e:
         logger.error(f"Error reading file {filename}: {str(e)}")
         return jsonify({"error": f"Failed to read file: {str(e)}"}), 500
@@ -332,39 +730,20 @@ def get_file_content(filename):
 
 @app.route("/file/<filename>", methods=["GET"])
 def view_file(filename):
+    # Renders only the table shell; file_view.js pages the rows in from /api/file
     logger.info(f"Rendering file view for: {filename}")
-    file_path = os.path.join(app.config["EXCEL_SHEETS"], filename)
-    if not os.path.exists(file_path):
-        logger.error(f"File not found: {filename}")
-        return render_template("error.html", message="File not found"), 404
     try:
-        df = pd.read_csv(file_path)
-        if df.empty:
-            logger.error(f"File is empty: {filename}")
-            return render_template("error.html", message="File is empty"), 400
-        expected_columns = [
-            "Document ID",
-            "Chapter",
-            "Section No.",
-            "Section",
-            "Sub-Section",
-            "Summary",
-            "Action Item",
-            "Due date",
-            "Periodicity",
-            "Marked as Completed",
-            "Work Status",
-            "Role Assigned To",
-        ]
-        if not all(col in df.columns for col in expected_columns):
-            logger.error(f"Invalid CSV structure: {filename}")
-            return render_template("error.html", message="Invalid CSV structure"), 400
-        df = df.fillna("")
-        headers = df.columns.tolist()
-        data = df.to_dict(orient="records")
+        document, error = open_document(filename)
+        if error:
+            return render_template("error.html", message=error[0]), error[1]
+        _, headers, total = document
         logger.info(f"Successfully loaded file for view: {filename}")
         return render_template(
-            "file_view.html", filename=filename, headers=headers, data=data
+            "file_view.html",
+            filename=filename,
+            headers=headers,
+            total_rows=total,
+            page_size=FILE_PAGE_SIZE,
         )
     except Exception as e:
         logger.error(f"Error reading file {filename}: {str(e)}")
@@ -377,8 +756,9 @@ def view_file(filename):
 @app.route("/api/update_role/<filename>", methods=["POST"])
 def update_role(filename):
     logger.info(f"Updating Role Assigned To for file: {filename}")
+    document_id = os.path.splitext(filename)[0]
     file_path = os.path.join(app.config["EXCEL_SHEETS"], filename)
-    if not os.path.exists(file_path):
+    if not row_store.ensure(document_id, file_path):
         logger.error(f"File not found: {filename}")
         return jsonify({"error": "File not found"}), 404
     try:
@@ -389,13 +769,11 @@ def update_role(filename):
             logger.error("Missing row_index or role_assigned_to in request")
             return jsonify({"error": "Missing row_index or role_assigned_to"}), 400
 
-        df = pd.read_csv(file_path)
-        if row_index < 0 or row_index >= len(df):
+        if not row_store.update_row(
+            document_id, row_index, {"Role Assigned To": new_role}
+        ):
             logger.error(f"Invalid row_index: {row_index}")
             return jsonify({"error": "Invalid row_index"}), 400
-
-        df.at[row_index, "Role Assigned To"] = new_role
-        df.to_csv(file_path, index=False, encoding="utf-8")
         logger.info(
             f"Successfully updated Role Assigned To for row {row_index} in {filename}"
         )
@@ -405,130 +783,94 @@ def update_role(filename):
         return jsonify({"error": f"Failed to update file: {str(e)}"}), 500
 
 
-@app.route("/api/metrics", methods=["GET"])
-def get_metrics():
-    logger.info("Calculating metrics")
-    today = datetime.now().date()
-    week_ago = today - timedelta(days=7)
-    dates = [(today - timedelta(days=x)).strftime("%Y-%m-%d") for x in range(6, -1, -1)]
-
+@app.route("/api/export/<filename>", methods=["GET", "POST"])
+def export_file(filename):
+    # GET downloads the current rows as CSV; POST also writes them back to the CSV on disk
+    logger.info(f"Exporting {filename} from the row store")
+    document_id = os.path.splitext(filename)[0]
+    file_path = os.path.join(app.config["EXCEL_SHEETS"], filename)
+    if not row_store.ensure(document_id, file_path):
+        logger.error(f"File not found: {filename}")
+        return jsonify({"error": "File not found"}), 404
     try:
-        files = os.listdir(app.config["EXCEL_SHEETS"])
-        file_data = [
-            {
-                "date": datetime.fromtimestamp(
-                    os.path.getctime(os.path.join(app.config["EXCEL_SHEETS"], f))
-                ).date(),
-                "filename": f,
-                "status": file_status.get(f, "Completed"),
-            }
-            for f in files
-            if f.endswith(".csv")
-        ]
-
-        df = pd.DataFrame(file_data)
-        logger.info(f"Created DataFrame with {len(df)} entries")
-
-        if df.empty:
-            logger.warning("No CSV files found for metrics calculation")
-            return jsonify(
-                {
-                    "daily_avg_uploads": 0,
-                    "weekly_uploads": 0,
-                    "total_uploads": 0,
-                    "unique_documents": 0,
-                    "daily_uploads": {date: 0 for date in dates},
-                    "status_distribution": {
-                        "Processing": 0,
-                        "Completed": 0,
-                        "Failed": 0,
-                    },
-                }
-            )
-
-        daily_avg = len(df[df["date"] == today]) / 7 if "date" in df.columns else 0
-        weekly_uploads = len(df[df["date"] >= week_ago]) if "date" in df.columns else 0
-        total_uploads = len(df)
-        unique_documents = (
-            len(df["filename"].unique()) if "filename" in df.columns else 0
+        text = row_store.export_csv(
+            document_id, file_path if request.method == "POST" else None
+        )
+        if request.method == "POST":
+            notice = notice_registry.by_filename(filename)
+            if notice:
+                notice_registry.update(
+                    notice["notice_id"], size=os.path.getsize(file_path)
+                )
+            return jsonify({"message": "CSV exported successfully", "filename": filename})
+        return Response(
+            text,
+            mimetype="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
+    except Exception as e:
+        logger.error(f"Error exporting file {filename}: {str(e)}")
+        return jsonify({"error": f"Failed to export file: {str(e)}"}), 500
 
-        daily_uploads = {}
-        for date in dates:
-            date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-            count = len(df[df["date"] == date_obj]) if "date" in df.columns else 0
-            daily_uploads[date] = count
 
-        status_counts = (
-            df["status"].value_counts().to_dict() if "status" in df.columns else {}
-        )
-        status_distribution = {
-            "Processing": status_counts.get("Processing", 0),
-            "Completed": status_counts.get("Completed", 0),
-            "Failed": status_counts.get("Failed", 0),
-        }
+@app.route("/api/changes/<notice_id>", methods=["GET"])
+def get_change_report(notice_id):
+    report = load_report(change_report_path(notice_id))
+    if report is None:
+        return jsonify({"error": "No change report for this notice"}), 404
+    return jsonify(report)
 
-        logger.info("Metrics calculated successfully")
-        return jsonify(
-            {
-                "daily_avg_uploads": round(daily_avg, 2),
-                "weekly_uploads": weekly_uploads,
-                "total_uploads": total_uploads,
-                "unique_documents": unique_documents,
-                "daily_uploads": daily_uploads,
-                "status_distribution": status_distribution,
-            }
-        )
+
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    try:
+        return jsonify(upload_metrics.snapshot())
     except Exception as e:
         logger.error(f"Error calculating metrics: {str(e)}")
         return jsonify({"error": f"Failed to calculate metrics: {str(e)}"}), 500
 
 
+def notice_summary(notice):
+    # Registry copy of the document summary; row 0 is re-read only after the CSV changes
+    file_path = os.path.join(app.config["EXCEL_SHEETS"], notice["filename"])
+    try:
+        mtime = os.path.getmtime(file_path)
+        if mtime == notice["summary_mtime"]:
+            return notice["summary"], notice["action_item"]
+        fresh = read_document_summary(file_path)
+    except Exception as e:
+        logger.error(f"Error reading summary/action from CSV: {str(e)}")
+        return notice["summary"], notice["action_item"]
+    summary = fresh["summary"] or notice["summary"]
+    action_item = fresh["action_item"] or notice["action_item"]
+    notice_registry.update(
+        notice["notice_id"],
+        summary=summary,
+        action_item=action_item,
+        summary_mtime=mtime,
+    )
+    return summary, action_item
+
+
 @app.route("/api/notices", methods=["GET"])
 def list_notices():
     logger.info("Listing all notices for approval table")
     notices = []
     try:
-        excel_dir = app.config["EXCEL_SHEETS"]
-        for filename in os.listdir(excel_dir):
-            if filename.endswith(".csv"):
-                file_path = os.path.join(excel_dir, filename)
-                found_notice_id = None
-                for notice_id, notice_info in notice_status.items():
-                    if notice_info["filename"] == filename:
-                        found_notice_id = notice_id
-                        break
-                if found_notice_id:
-                    status = notice_status[found_notice_id]["status"]
-                    last_updated = notice_status[found_notice_id]["last_updated"]
-                    summary = notice_status[found_notice_id].get("summary", "")
-                    action_item = notice_status[found_notice_id].get("action_item", "")
-                else:
-                    status = "Pending Approval"
-                    last_updated = datetime.fromtimestamp(
-                        os.path.getctime(file_path)
-                    ).strftime("%Y-%m-%d %H:%M:%S")
-                    summary = ""
-                    action_item = ""
-                if not summary or not action_item:
-                    try:
-                        df = pd.read_csv(file_path)
-                        if "Document Summary" in df.columns and not df.empty:
-                            summary = df.at[0, "Document Summary"]
-                        if "Document Action Item" in df.columns and not df.empty:
-                            action_item = df.at[0, "Document Action Item"]
-                    except Exception as e:
-                        logger.error(f"Error reading summary/action from CSV: {str(e)}")
-                notices.append(
-                    {
-                        "notice_id": found_notice_id or os.path.splitext(filename)[0],
-                        "status": status,
-                        "last_updated": last_updated,
-                        "filename": filename,
-                        "summary": summary,
-                        "action_item": action_item,
-                    }
-                )
+        for notice in notice_registry.list(
+            approval_status=request.args.get("status")
+        ):
+            summary, action_item = notice_summary(notice)
+            notices.append(
+                {
+                    "notice_id": notice["notice_id"],
+                    "status": notice["approval_status"],
+                    "last_updated": notice["last_updated"],
+                    "filename": notice["filename"],
+                    "summary": summary,
+                    "action_item": action_item,
+                }
+            )
         logger.info(f"Found {len(notices)} notices")
     except Exception as e:
         logger.error(f"Error listing notices: {str(e)}")
@@ -539,33 +881,17 @@ def list_notices():
 @app.route("/api/approve_notice/<notice_id>", methods=["POST"])
 def approve_notice(notice_id):
     logger.info(f"Updating approval status for notice: {notice_id}")
-    filename = None
-    for f in os.listdir(app.config["EXCEL_SHEETS"]):
-        if f.startswith(notice_id) or os.path.splitext(f)[0] == notice_id:
-            filename = f
-            break
-    if notice_id not in notice_status:
-        if filename:
-            file_path = os.path.join(app.config["EXCEL_SHEETS"], filename)
-            notice_status[notice_id] = {
-                "status": "Pending Approval",
-                "last_updated": datetime.fromtimestamp(
-                    os.path.getctime(file_path)
-                ).strftime("%Y-%m-%d %H:%M:%S"),
-                "filename": filename,
-            }
-        else:
-            logger.error(f"Notice ID not found: {notice_id}")
-            return jsonify({"error": "Notice ID not found"}), 404
+    if notice_registry.get(notice_id) is None:
+        logger.error(f"Notice ID not found: {notice_id}")
+        return jsonify({"error": "Notice ID not found"}), 404
     try:
         data = request.json
         new_status = data.get("status")
-        if new_status not in ["Pending Approval", "Approved", "Rejected"]:
+        if new_status not in APPROVAL_STATUSES:
             logger.error(f"Invalid status: {new_status}")
             return jsonify({"error": "Invalid status"}), 400
-        notice_status[notice_id]["status"] = new_status
-        notice_status[notice_id]["last_updated"] = datetime.now().strftime(
-            "%Y-%m-%d %H:%M:%S"
+        notice_registry.update(
+            notice_id, approval_status=new_status, last_updated=now_string()
         )
         logger.info(f"Notice {notice_id} status updated to {new_status}")
         return jsonify({"message": "Notice status updated successfully"})
@@ -577,8 +903,9 @@ def approve_notice(notice_id):
 @app.route("/api/update_work_status/<filename>", methods=["POST"])
 def update_work_status(filename):
     logger.info(f"Updating work status for file: {filename}")
+    document_id = os.path.splitext(filename)[0]
     file_path = os.path.join(app.config["EXCEL_SHEETS"], filename)
-    if not os.path.exists(file_path):
+    if not row_store.ensure(document_id, file_path):
         logger.error(f"File not found: {filename}")
         return jsonify({"error": "File not found"}), 404
     try:
@@ -589,15 +916,13 @@ def update_work_status(filename):
         if row_index is None:
             logger.error("Missing row_index in request")
             return jsonify({"error": "Missing row_index"}), 400
-        df = pd.read_csv(file_path)
-        if row_index < 0 or row_index >= len(df):
+        if not row_store.update_row(
+            document_id,
+            row_index,
+            {"Marked as Completed": marked_completed, "Work Status": work_status},
+        ):
             logger.error(f"Invalid row_index: {row_index}")
             return jsonify({"error": "Invalid row_index"}), 400
-        if marked_completed is not None:
-            df.at[row_index, "Marked as Completed"] = marked_completed
-        if work_status is not None:
-            df.at[row_index, "Work Status"] = work_status
-        df.to_csv(file_path, index=False, encoding="utf-8")
         logger.info(
             f"Successfully updated work status for row {row_index} in {filename}"
         )
@@ -607,6 +932,187 @@ def update_work_status(filename):
         return jsonify({"error": f"Failed to update work status: {str(e)}"}), 500
 
 
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    limit = request.args.get("limit", 100, type=int)
+    return jsonify({"metrics": job_queue.metrics(), "jobs": job_queue.jobs(limit)})
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        logger.error(f"Job not found: {job_id}")
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    # Server-Sent Events stream of a job's progress; ends after "completed" or "failed"
+    def active():
+        job = job_queue.get(job_id)
+        return job is not None and job.status in ("Queued", "Running")
+
+    if not progress_hub.known(job_id) and not active():
+        # Unknown, or finished so long ago that its events have expired
+        job = job_queue.get(job_id)
+        logger.error(f"No progress events for job: {job_id}")
+        return jsonify({"error": "Job not found", "job": job.to_dict() if job else None}), 404
+    last_event_id = request.headers.get("Last-Event-ID", 0, type=int)
+    if progress_hub.delivered(job_id, last_event_id):
+        # EventSource reconnects after every stream end; 204 tells it to stop
+        return "", 204
+
+    def stream():
+        for record in progress_hub.subscribe(job_id, last_event_id, alive=active):
+            yield format_sse(record)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/pdf_backends", methods=["GET"])
+def pdf_backend_stats():
+    stats = {}
+    for backend, timing in backend_timings.items():
+        stats[backend] = dict(
+            timing,
+            seconds_per_page=round(timing["seconds"] / timing["pages"], 4)
+            if timing["pages"]
+            else 0,
+        )
+    return jsonify(stats)
+
+
+@app.route("/api/rate_limit", methods=["GET"])
+def rate_limit_stats():
+    return jsonify(rate_limiter.stats())
+
+
+@app.route("/api/reenrich_failures", methods=["POST"])
+def reenrich_failed_rows():
+    # Queue a job per completed document that has rows whose enrichment failed;
+    # notice_id limits the scan to one document
+    only = request.values.get("notice_id") or (request.get_json(silent=True) or {}).get("notice_id")
+    notices = [notice_registry.get(only)] if only else notice_registry.list(status="Completed")
+    queued = []
+    for notice in notices:
+        if not notice or not notice["has_csv"] or notice["status"] != "Completed":
+            continue
+        running = job_queue.get(f"reenrich-{notice['notice_id']}")
+        if running and running.status in ("Queued", "Running"):
+            continue
+        csv_path = os.path.join(app.config["EXCEL_SHEETS"], notice["filename"])
+        if not row_store.ensure(notice["document_id"], csv_path):
+            continue
+        failed = failed_row_indices(row_store.rows(notice["document_id"]))
+        if not failed:
+            continue
+        try:
+            job = job_queue.submit(
+                reenrich_failures,
+                notice["notice_id"],
+                failed,
+                job_id=f"reenrich-{notice['notice_id']}",
+                name=f"Re-enrich {notice['filename']}",
+                priority="low",
+            )
+        except QueueFull as e:
+            logger.error(f"Queue full while re-enriching failures: {str(e)}")
+            response = jsonify(
+                {"error": "Processing queue is full", "retry_after": e.retry_after, "queued": queued}
+            )
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response, 503
+        queued.append(
+            {"notice_id": notice["notice_id"], "job_id": job.id, "failed_rows": len(failed)}
+        )
+    logger.info(f"Queued failed-row re-enrichment for {len(queued)} documents")
+    return jsonify({"queued": queued}), 202
+
+
+@app.route("/api/llm_resilience", methods=["GET"])
+def llm_resilience_stats():
+    usage = usage_snapshot()
+    return jsonify(
+        {
+            "circuit_breaker": circuit_breaker.stats(),
+            "retries": usage["retries"],
+            "hedged": usage["hedged"],
+        }
+    )
+
+
+@app.route("/api/perf", methods=["GET"])
+def perf_stats():
+    # Process-wide histograms and per-stage totals plus the costliest notices;
+    # notice_id returns that notice's per-stage breakdown instead
+    notice_id = request.args.get("notice_id")
+    if notice_id:
+        notice = notice_registry.get(notice_id)
+        if not notice:
+            return jsonify({"error": "Notice not found"}), 404
+        breakdown = perf.document(notice_id) or stored_perf(notice)
+        return jsonify(
+            {
+                "notice_id": notice_id,
+                "filename": notice["filename"],
+                "status": notice["status"],
+                "stages": breakdown,
+                "totals": document_totals(breakdown),
+            }
+        )
+    try:
+        costliest = notice_registry.costliest(
+            limit=min(int(request.args.get("top", 10)), 100),
+            by=request.args.get("by", "cost_usd"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    stats = perf.snapshot()
+    stats["costliest"] = [
+        {
+            field: notice[field]
+            for field in (
+                "notice_id",
+                "filename",
+                "status",
+                "processing_seconds",
+                "llm_calls",
+                "prompt_tokens",
+                "completion_tokens",
+                "cost_usd",
+            )
+        }
+        for notice in costliest
+    ]
+    return jsonify(stats)
+
+
+@app.route("/api/perf/prometheus", methods=["GET"])
+def perf_prometheus():
+    return Response(perf.prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/logging", methods=["GET"])
+def logging_stats():
+    return jsonify(log_stats())
+
+
+@app.route("/api/llm_cache", methods=["GET", "DELETE"])
+def llm_cache_stats():
+    if request.method == "DELETE":
+        logger.info("Clearing LLM response cache")
+        llm_cache.clear()
+    return jsonify(llm_cache.stats())
+
+
 if __name__ == "__main__":
+    # The debug reloader's parent process only watches files; the child it spawns resumes
+    init_app(resume=os.environ.get("WERKZEUG_RUN_MAIN") == "true")
     logger.info("Starting Flask application")
     app.run(debug=True)
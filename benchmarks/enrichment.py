@@ -0,0 +1,61 @@
+import os
+import json
+import time
+import argparse
+import logging
+
+# Measure real model traffic, not cache hits
+os.environ.setdefault("LLM_CACHE_BYPASS", "1")
+
+import pandas as pd
+from tabulate import tabulate
+from utils import helpers
+from utils.document_rows import read_structured_csv
+from utils.llm import usage_snapshot
+
+
+def run_document(csv_path, batch_size, batch_tokens):
+    rows = read_structured_csv(csv_path).rows
+    if not rows:
+        return None
+    helpers.ENRICH_BATCH_SIZE = batch_size
+    helpers.ENRICH_BATCH_TOKENS = batch_tokens
+    current_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+    before = usage_snapshot()
+    started = time.perf_counter()
+    results = helpers.enrich_rows_threaded(list(enumerate(rows)), current_date)
+    elapsed = time.perf_counter() - started
+    after = usage_snapshot()
+    return {
+        "document": os.path.basename(csv_path)[:40],
+        "batch_size": batch_size,
+        "rows": len(rows),
+        "calls": after["calls"] - before["calls"],
+        "prompt_tokens": after["prompt_tokens"] - before["prompt_tokens"],
+        "completion_tokens": after["completion_tokens"] - before["completion_tokens"],
+        "failed_rows": sum(1 for result in results if not result["success"]),
+        "wall_seconds": round(elapsed, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare single-row and batched section enrichment per document"
+    )
+    parser.add_argument("csv", nargs="+", help="structured CSVs to enrich (not modified)")
+    parser.add_argument("--batch-sizes", default="1,5,10", help="comma-separated K values")
+    parser.add_argument("--batch-tokens", type=int, default=helpers.ENRICH_BATCH_TOKENS)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rows = []
+    for csv_path in args.csv:
+        for batch_size in [int(k) for k in args.batch_sizes.split(",")]:
+            result = run_document(csv_path, batch_size, args.batch_tokens)
+            if result:
+                rows.append(result)
+    print(tabulate(rows, headers="keys"))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
@@ -0,0 +1,192 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI chat completions endpoint. Answers are canned per
+# prompt type (structure, document summary, single row, short row, multi-row batch)
+# in the formats the pipeline parses, so the whole pipeline runs without an API key.
+
+NUMBERED_RE = re.compile(r"^\s*(\d{1,2})\.\s+([A-Z][^\n]{2,60})$", re.MULTILINE)
+BATCH_ROW_RE = re.compile(r"^\s*Row (\d+)$", re.MULTILINE)
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def structure_answer(prompt):
+    # One row per numbered heading in the fenced document text
+    text = prompt.rsplit("```", 2)[-2] if prompt.count("```") >= 2 else prompt
+    lines = [
+        f"Chapter: Main Document|Section No.: {number}|Section: {title.strip()}|"
+        f"Sub-Section: - {number}.1 Stub text for section {number}."
+        for number, title in NUMBERED_RE.findall(text)
+    ]
+    return "\n".join(lines) or (
+        "Chapter: Main Document|Section No.: 1|Section: Stub|Sub-Section: - Stub text."
+    )
+
+
+def canned_answer(prompt):
+    if "hierarchical structure" in prompt:
+        return structure_answer(prompt)
+    if "entire document" in prompt:
+        return (
+            "Summary: Stub summary of the regulatory document.\n"
+            "Action Item: Review the document and assign owners."
+        )
+    rows = BATCH_ROW_RE.findall(prompt)
+    if rows:
+        return json.dumps(
+            [
+                {
+                    "row": int(row),
+                    "summary": f"Stub summary of row {row}.",
+                    "action_item": f"Stub action for row {row}.",
+                    "due_date": "N/A",
+                    "periodicity": "N/A",
+                }
+                for row in rows
+            ]
+        )
+    if "Due date:" in prompt:
+        return "Summary: Stub summary.|Action Item: Stub action.|Due date: N/A|Periodicity: N/A"
+    return "Summary: Stub summary.|Action Item: Stub action."
+
+
+class StubConfig:
+    def __init__(self, latency=0.2, jitter=0.1, rate_429=0.0, rate_500=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.random = random.Random(seed)
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def draw(self):
+        # (delay seconds, injected status or None)
+        with self.lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            roll = self.random.random()
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.rate_500:
+            return delay, 500
+        return delay, None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        config = self.server.config
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        delay, status = config.draw()
+        time.sleep(delay)
+        if status == 429:
+            config.count("injected_429")
+            self._send(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "requests"}},
+                {"retry-after": "1", "x-ratelimit-reset-requests": "1s"},
+            )
+            return
+        if status == 500:
+            config.count("injected_500")
+            self._send(500, {"error": {"message": "Internal error (stub)", "type": "server_error"}})
+            return
+
+        prompt = "\n".join(message.get("content") or "" for message in request.get("messages", []))
+        content = canned_answer(prompt)
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        config.count("completions")
+        config.count("prompt_tokens", prompt_tokens)
+        config.count("completion_tokens", completion_tokens)
+        self._send(
+            200,
+            {
+                "id": f"chatcmpl-stub-{config.counts['completions']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o-mini"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+            {
+                "x-ratelimit-limit-requests": "100000",
+                "x-ratelimit-limit-tokens": "100000000",
+            },
+        )
+
+
+def start_stub(host="127.0.0.1", port=0, **config):
+    # Serves in a daemon thread; returns (server, base_url). server.config.counts has the tallies.
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.config = StubConfig(**config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="mean seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- seconds around the mean")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="share of requests answered 500")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server, base_url = start_stub(
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        rate_500=args.rate_500,
+        seed=args.seed,
+    )
+    print(f"Serving OpenAI stub at {base_url} (OPENAI_BASE_URL={base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(dict(server.config.counts))
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+
+from tabulate import tabulate
+
+# End-to-end throughput of the upload pipeline against the local OpenAI stub. Each
+# concurrency level runs in a fresh process (JOB_WORKERS is read at import) inside
+# a scratch working directory, so the repo's data/ and Uploads/ stay untouched.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Progress events that close each stage, in pipeline order
+STAGES = [
+    ("extract", "text_extracted"),
+    ("clean", "text_cleaned"),
+    ("summary", "summary_extracted"),
+    ("structure", "structure_parsed"),
+    ("enrich", "rows_enriched"),
+    ("finish", "completed"),
+]
+
+
+def stage_times(events):
+    # Seconds spent in each stage of one job, from its progress event timestamps
+    last = {}
+    for record in events:
+        last[record["event"]] = record["time"]
+    times = {}
+    previous = last.get("started")
+    if previous is None:
+        return times
+    for stage, event in STAGES:
+        if event in last:
+            times[stage] = round(last[event] - previous, 3)
+            previous = last[event]
+    return times
+
+
+def process_io():
+    # Bytes this process has read and written (files, sockets, logs); Linux only
+    try:
+        with open("/proc/self/io", "r", encoding="utf-8") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return {}
+    return {"read": int(fields["rchar"]), "write": int(fields["wchar"])}
+
+
+def run_level(pdfs, workers, timeout):
+    # Child process body: upload every PDF through the real app and wait for the jobs
+    sys.path.insert(0, REPO_ROOT)
+    os.environ["JOB_WORKERS"] = str(workers)
+    os.environ.setdefault("JOB_QUEUE_SIZE", str(len(pdfs) + 1))
+    import app as app_module
+    from utils.llm import usage_snapshot
+
+    app_module.init_app()
+
+    client = app_module.app.test_client()
+    before = usage_snapshot()
+    io_before = process_io()
+    started = time.perf_counter()
+    notice_ids = []
+    for path in pdfs:
+        with open(path, "rb") as f:
+            response = client.post(
+                "/api/upload",
+                data={"file": (f, os.path.basename(path)), "force": "1"},
+                content_type="multipart/form-data",
+            )
+        if response.status_code not in (200, 202):
+            raise RuntimeError(f"Upload of {path} failed: {response.status_code} {response.get_json()}")
+        notice_ids.append(response.get_json()["notice_id"])
+
+    deadline = time.monotonic() + timeout
+    pending = set(notice_ids)
+    while pending and time.monotonic() < deadline:
+        for notice_id in list(pending):
+            notice = app_module.notice_registry.get(notice_id)
+            if notice and notice["status"] in ("Completed", "Failed"):
+                pending.discard(notice_id)
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    after = usage_snapshot()
+    io_after = process_io()
+
+    stage_totals = {}
+    statuses = {}
+    for notice_id in notice_ids:
+        statuses[notice_id] = app_module.notice_registry.get(notice_id)["status"]
+        for stage, seconds in stage_times(app_module.progress_hub.events(notice_id)).items():
+            stage_totals[stage] = stage_totals.get(stage, 0) + seconds
+    completed = sum(1 for status in statuses.values() if status == "Completed")
+    return {
+        "workers": workers,
+        "documents": len(pdfs),
+        "completed": completed,
+        "failed": sum(1 for status in statuses.values() if status == "Failed"),
+        "timed_out": len(pending),
+        "wall_seconds": round(elapsed, 2),
+        "docs_per_minute": round(completed / elapsed * 60, 2) if elapsed else 0,
+        "calls": after["calls"] - before["calls"],
+        "prompt_tokens": after["prompt_tokens"] - before["prompt_tokens"],
+        "completion_tokens": after["completion_tokens"] - before["completion_tokens"],
+        "stage_seconds": {
+            stage: round(stage_totals[stage] / len(notice_ids), 3)
+            for stage, _ in STAGES
+            if stage in stage_totals
+        },
+        "io_read_kb_per_doc": round((io_after["read"] - io_before["read"]) / 1024 / len(pdfs), 1)
+        if io_after
+        else None,
+        "io_write_kb_per_doc": round((io_after["write"] - io_before["write"]) / 1024 / len(pdfs), 1)
+        if io_after
+        else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def spawn_level(pdfs, workers, base_url, timeout):
+    workdir = tempfile.mkdtemp(prefix=f"bench-pipeline-{workers}-")
+    env = dict(
+        os.environ,
+        OPENAI_BASE_URL=base_url,
+        OPENAI_API_KEY="stub",
+        # Measure real model traffic, not cache hits
+        LLM_CACHE_BYPASS="1",
+        OPENAI_RPM=os.getenv("OPENAI_RPM", "100000"),
+        OPENAI_TPM=os.getenv("OPENAI_TPM", "100000000"),
+        PYTHONPATH=REPO_ROOT,
+    )
+    try:
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.pipeline", "--child", str(workers),
+             "--timeout", str(timeout), *pdfs],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Benchmark run with {workers} workers failed:\n{process.stderr[-2000:]}")
+        return json.loads(process.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def find_pdfs(targets):
+    pdfs = []
+    for target in targets:
+        if os.path.isdir(target):
+            pdfs.extend(
+                os.path.join(target, name)
+                for name in sorted(os.listdir(target))
+                if name.lower().endswith(".pdf")
+            )
+        else:
+            pdfs.append(target)
+    return [os.path.abspath(path) for path in pdfs]
+
+
+def compare(results, baseline_path, tolerance):
+    # Levels whose throughput fell more than `tolerance` below the baseline run
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {level["workers"]: level for level in json.load(f)["levels"]}
+    regressions = []
+    for level in results:
+        previous = baseline.get(level["workers"])
+        if previous and level["docs_per_minute"] < previous["docs_per_minute"] * (1 - tolerance):
+            regressions.append(
+                f"{level['workers']} workers: {level['docs_per_minute']} docs/min "
+                f"vs {previous['docs_per_minute']} in {baseline_path}"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the upload pipeline end to end against a local OpenAI stub"
+    )
+    parser.add_argument("pdfs", nargs="*", default=["Uploads"], help="PDFs or directories of PDFs")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated JOB_WORKERS levels")
+    parser.add_argument("--limit", type=int, help="use only the first N PDFs")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub mean seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds to wait per level")
+    parser.add_argument("--json", help="results file (default benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file; exit 1 on a throughput regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed docs/min drop")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_level(args.pdfs, args.child, args.timeout)))
+        sys.exit(0)
+
+    from benchmarks.openai_stub import start_stub
+
+    pdfs = find_pdfs(args.pdfs)[: args.limit]
+    if not pdfs:
+        sys.exit(f"No PDFs found in {args.pdfs}")
+    stub_settings = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "rate_429": args.rate_429,
+        "rate_500": args.rate_500,
+        "seed": args.seed,
+    }
+    server, base_url = start_stub(**stub_settings)
+    levels = []
+    for workers in [int(level) for level in args.workers.split(",")]:
+        levels.append(spawn_level(pdfs, workers, base_url, args.timeout))
+    server.shutdown()
+
+    print(
+        tabulate(
+            [
+                dict(
+                    {key: value for key, value in level.items() if key != "stage_seconds"},
+                    **{f"{stage}_s": seconds for stage, seconds in level["stage_seconds"].items()},
+                )
+                for level in levels
+            ],
+            headers="keys",
+        )
+    )
+    out_path = args.json or os.path.join(
+        REPO_ROOT, "benchmarks", "results", f"pipeline-{datetime.now():%Y%m%d%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "pdfs": [os.path.basename(path) for path in pdfs],
+                "stub": dict(stub_settings, requests=dict(server.config.counts)),
+                "levels": levels,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Results written to {out_path}")
+
+    if args.compare:
+        regressions = compare(levels, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -1,105 +1,191 @@
 document.addEventListener("DOMContentLoaded", () => {
-  const saveButtons = document.querySelectorAll(".save-btn");
+  const table = document.getElementById("file-content-table");
+  const tbody = table.querySelector("tbody");
+  const loader = document.getElementById("rows-loader");
+  const filename = table.dataset.filename;
+  const totalRows = parseInt(table.dataset.totalRows);
+  const pageSize = parseInt(table.dataset.pageSize);
+  const headers = Array.from(table.querySelectorAll("thead th")).map((th) => th.dataset.header);
 
-  saveButtons.forEach((btn) => {
-    btn.addEventListener("click", async () => {
-      const rowIndex = btn.dataset.rowIndex;
-      const roleInput = btn.parentElement.querySelector(".role-input");
-      const newRole = roleInput.value.trim();
-      const filename = window.location.pathname.split("/").pop();
+  let nextOffset = 0;
+  let loading = false;
 
-      if (!newRole) {
-        showError("Role Assigned To cannot be empty");
+  // Rows are fetched a page at a time as the loader scrolls into view
+  async function loadNextPage() {
+    if (loading || nextOffset === null) return;
+    loading = true;
+    try {
+      const response = await fetch(`/api/file/${filename}?offset=${nextOffset}&limit=${pageSize}`);
+      const page = await response.json();
+      if (!response.ok) {
+        showError(`Error: ${page.error}`);
+        loader.textContent = "Failed to load rows";
+        nextOffset = null;
         return;
       }
+      page.data.forEach((row, i) => tbody.appendChild(renderRow(row, page.offset + i)));
+      nextOffset = page.next_offset;
+      loader.textContent = nextOffset === null ? `${page.total} rows` : `Showing ${nextOffset} of ${page.total} rows…`;
+    } catch (error) {
+      showError(`Error loading rows: ${error.message}`);
+      console.error("Error loading rows:", error);
+      loader.textContent = "Failed to load rows";
+      nextOffset = null;
+    } finally {
+      loading = false;
+    }
+    // A short page may leave the loader visible without another intersection event
+    if (nextOffset !== null && isVisible(loader)) loadNextPage();
+  }
 
-      try {
-        const response = await fetch(`/api/update_role/${filename}`, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify({
-            row_index: parseInt(rowIndex),
-            role_assigned_to: newRole,
-          }),
-        });
+  function isVisible(element) {
+    const rect = element.getBoundingClientRect();
+    return rect.top < window.innerHeight && rect.bottom > 0;
+  }
 
-        const data = await response.json();
-        if (response.ok) {
-          showSuccess("Role updated successfully");
-          btn.textContent = "Saved";
-          btn.disabled = true;
-          setTimeout(() => {
-            btn.textContent = "Save";
-            btn.disabled = false;
-          }, 2000);
+  function renderRow(row, rowIndex) {
+    const tr = document.createElement("tr");
+    headers.forEach((header) => {
+      const td = document.createElement("td");
+      const value = row[header] ?? "";
+      if (header === "Role Assigned To") {
+        td.className = "role-cell";
+        const input = document.createElement("input");
+        input.type = "text";
+        input.className = "role-input";
+        input.dataset.rowIndex = rowIndex;
+        input.value = value;
+        const button = document.createElement("button");
+        button.className = "save-btn";
+        button.dataset.rowIndex = rowIndex;
+        button.innerHTML = '<i class="fa-solid fa-floppy-disk"></i> Save';
+        td.append(input, button);
+      } else if (header === "Marked as Completed") {
+        td.className = "marked-completed-cell";
+        if (value === "No") {
+          const button = document.createElement("button");
+          button.className = "mark-completed-btn";
+          button.dataset.rowIndex = rowIndex;
+          button.innerHTML = '<i class="fa-solid fa-check"></i> Mark as Completed';
+          td.appendChild(button);
         } else {
-          showError(`Error: ${data.error}`);
+          td.innerHTML = '<span style="color: #059669; font-weight: 600"><i class="fa-solid fa-circle-check"></i> Completed</span>';
         }
-      } catch (error) {
-        showError(`Error updating role: ${error.message}`);
-        console.error("Error updating role:", error);
+      } else {
+        if (header === "Work Status") td.className = "work-status-cell";
+        td.textContent = value;
       }
+      tr.appendChild(td);
     });
+    return tr;
+  }
+
+  if (totalRows > 0) {
+    new IntersectionObserver((entries) => {
+      if (entries.some((entry) => entry.isIntersecting)) loadNextPage();
+    }).observe(loader);
+  }
+  loadNextPage();
+
+  // Buttons are created per page, so clicks are handled once on the table body
+  tbody.addEventListener("click", (event) => {
+    const btn = event.target.closest("button");
+    if (!btn) return;
+    if (btn.classList.contains("save-btn")) saveRole(btn);
+    else if (btn.classList.contains("save-marked-btn")) saveMarked(btn);
+    else if (btn.classList.contains("mark-completed-btn")) markCompleted(btn);
   });
 
+  async function saveRole(btn) {
+    const rowIndex = btn.dataset.rowIndex;
+    const roleInput = btn.parentElement.querySelector(".role-input");
+    const newRole = roleInput.value.trim();
+
+    if (!newRole) {
+      showError("Role Assigned To cannot be empty");
+      return;
+    }
+
+    try {
+      const response = await fetch(`/api/update_role/${filename}`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({
+          row_index: parseInt(rowIndex),
+          role_assigned_to: newRole,
+        }),
+      });
+
+      const data = await response.json();
+      if (response.ok) {
+        showSuccess("Role updated successfully");
+        btn.textContent = "Saved";
+        btn.disabled = true;
+        setTimeout(() => {
+          btn.textContent = "Save";
+          btn.disabled = false;
+        }, 2000);
+      } else {
+        showError(`Error: ${data.error}`);
+      }
+    } catch (error) {
+      showError(`Error updating role: ${error.message}`);
+      console.error("Error updating role:", error);
+    }
+  }
+
   // Add save logic for Marked as Completed
-  document.querySelectorAll(".save-marked-btn").forEach((btn) => {
-    btn.addEventListener("click", async () => {
-      const rowIndex = btn.dataset.rowIndex;
-      const markedInput = btn.parentElement.querySelector(".marked-completed-input");
-      const marked_completed = markedInput.value.trim();
-      const filename = window.location.pathname.split("/").pop();
-      try {
-        const response = await fetch(`/api/update_work_status/${filename}`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ row_index: parseInt(rowIndex), marked_completed }),
-        });
-        const data = await response.json();
-        if (response.ok) {
-          showSuccess("Marked as Completed updated successfully");
-          btn.textContent = "Saved";
-          btn.disabled = true;
-          setTimeout(() => {
-            btn.textContent = "Save";
-            btn.disabled = false;
-          }, 2000);
-        } else {
-          showError(`Error: ${data.error}`);
-        }
-      } catch (error) {
-        showError(`Error updating Marked as Completed: ${error.message}`);
-        console.error("Error updating Marked as Completed:", error);
+  async function saveMarked(btn) {
+    const rowIndex = btn.dataset.rowIndex;
+    const markedInput = btn.parentElement.querySelector(".marked-completed-input");
+    const marked_completed = markedInput.value.trim();
+    try {
+      const response = await fetch(`/api/update_work_status/${filename}`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ row_index: parseInt(rowIndex), marked_completed }),
+      });
+      const data = await response.json();
+      if (response.ok) {
+        showSuccess("Marked as Completed updated successfully");
+        btn.textContent = "Saved";
+        btn.disabled = true;
+        setTimeout(() => {
+          btn.textContent = "Save";
+          btn.disabled = false;
+        }, 2000);
+      } else {
+        showError(`Error: ${data.error}`);
       }
-    });
-  });
+    } catch (error) {
+      showError(`Error updating Marked as Completed: ${error.message}`);
+      console.error("Error updating Marked as Completed:", error);
+    }
+  }
 
-  document.querySelectorAll(".mark-completed-btn").forEach((btn) => {
-    btn.addEventListener("click", async () => {
-      const rowIndex = btn.dataset.rowIndex;
-      const filename = window.location.pathname.split("/").pop();
-      try {
-        const response = await fetch(`/api/update_work_status/${filename}`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ row_index: parseInt(rowIndex), marked_completed: "Yes" }),
-        });
-        const data = await response.json();
-        if (response.ok) {
-          // Replace button with 'Completed'
-          btn.parentElement.innerHTML = "Completed";
-          showSuccess("Marked as Completed!");
-        } else {
-          showError(`Error: ${data.error}`);
-        }
-      } catch (error) {
-        showError(`Error updating Marked as Completed: ${error.message}`);
-        console.error("Error updating Marked as Completed:", error);
+  async function markCompleted(btn) {
+    const rowIndex = btn.dataset.rowIndex;
+    try {
+      const response = await fetch(`/api/update_work_status/${filename}`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ row_index: parseInt(rowIndex), marked_completed: "Yes" }),
+      });
+      const data = await response.json();
+      if (response.ok) {
+        // Replace button with 'Completed'
+        btn.parentElement.innerHTML = "Completed";
+        showSuccess("Marked as Completed!");
+      } else {
+        showError(`Error: ${data.error}`);
       }
-    });
-  });
+    } catch (error) {
+      showError(`Error updating Marked as Completed: ${error.message}`);
+      console.error("Error updating Marked as Completed:", error);
+    }
+  }
 
   // Toast notifications
   function showSuccess(message) {
@@ -33,6 +33,8 @@ document.addEventListener("DOMContentLoaded", () => {
         fetchMetrics();
       } else if (pageId === "notices") {
         fetchNotices();
+      } else if (pageId === "upload") {
+        fetchUpdatableNotices();
       }
     });
   });
@@ -43,6 +45,13 @@ document.addEventListener("DOMContentLoaded", () => {
     const fileInput = document.getElementById("pdf-file");
     const formData = new FormData();
     formData.append("file", fileInput.files[0]);
+    if (document.getElementById("force-reprocess").checked) {
+      formData.append("force", "true");
+    }
+    const updateOf = document.getElementById("update-of").value;
+    if (updateOf) {
+      formData.append("update_of", updateOf);
+    }
 
     uploadStatus.textContent = "Uploading...";
     try {
@@ -52,12 +61,15 @@ document.addEventListener("DOMContentLoaded", () => {
       });
       const result = await response.json();
       if (response.ok) {
-        uploadStatus.textContent = `Upload started: ${result.filename}`;
+        uploadStatus.textContent = result.duplicate_of
+          ? `Duplicate of ${result.duplicate_of}, reused previous results: ${result.filename}`
+          : `Upload started: ${result.filename}`;
         Toastify({
-          text: "File upload started!",
+          text: result.duplicate_of ? "Duplicate upload, results reused!" : "File upload started!",
           duration: 3000,
           style: { background: "green" },
         }).showToast();
+        if (result.job_id) watchJob(result.job_id, result.filename);
         // Switch to Files tab and refresh
         document.querySelector('.sidebar nav a[data-page="files"]').click();
         fetchFiles();
@@ -79,6 +91,80 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   });
 
+  // Completed notices a new upload can be a revised version of
+  async function fetchUpdatableNotices() {
+    const select = document.getElementById("update-of");
+    try {
+      const response = await fetch("/api/files?status=Completed");
+      const files = await response.json();
+      select.length = 1;
+      files.forEach((file) => select.add(new Option(`Update of ${file.filename}`, file.notice_id)));
+    } catch (error) {
+      console.error("Error fetching notices to update:", error);
+    }
+  }
+
+  // Live job progress over Server-Sent Events; the lists refresh once when a job ends
+  const jobProgressList = document.getElementById("job-progress");
+  const jobStreams = {};
+
+  function watchJob(jobId, label) {
+    if (jobStreams[jobId]) return;
+    const item = document.createElement("li");
+    jobProgressList.appendChild(item);
+    const show = (text) => (item.textContent = `${label}: ${text}`);
+    show("queued");
+
+    const source = new EventSource(`/api/jobs/${jobId}/events`);
+    jobStreams[jobId] = source;
+    const on = (event, render) => source.addEventListener(event, (e) => show(render(JSON.parse(e.data))));
+    on("queued", (data) => `queued (${data.queue_depth} ahead)`);
+    on("started", () => "extracting text");
+    on("resumed", (data) => `resumed after the ${data.stage} stage`);
+    on("text_extracted", (data) => `text extracted from ${data.pages} pages`);
+    on("text_cleaned", (data) => `text cleaned, ${data.tokens_saved} tokens saved`);
+    on("summary_extracted", () => "document summary ready, parsing structure");
+    on("structure_parsed", (data) => `${data.rows} structure rows parsed, ${Math.round((data.local_share || 0) * 100)}% locally`);
+    on("rows_local", (data) => `${data.rows_skipped} rows answered locally, ${data.short_prompts} shorter prompts, ${data.prompt_tokens_saved} prompt tokens saved`);
+    on("revision_compared", (data) => `${data.unchanged} rows unchanged, ${data.changed} changed, ${data.added} added, ${data.removed} removed`);
+    on("rows_enriched", (data) => {
+      const failed = data.failed ? `, ${data.failed} failed` : "";
+      const eta = data.done < data.total ? `, about ${Math.ceil(data.eta_seconds)}s left` : "";
+      return `${data.done} of ${data.total} rows enriched${failed}${eta}`;
+    });
+
+    const finish = () => {
+      source.close();
+      delete jobStreams[jobId];
+      fetchFiles();
+      fetchMetrics();
+      fetchNotices();
+    };
+    on("completed", () => "completed");
+    on("failed", (data) => `failed: ${data.reason}`);
+    source.addEventListener("completed", finish);
+    source.addEventListener("failed", finish);
+    source.onerror = () => {
+      // EventSource reconnects by itself unless the server refused the stream
+      if (source.readyState === EventSource.CLOSED) {
+        show("progress unavailable");
+        delete jobStreams[jobId];
+      }
+    };
+  }
+
+  // Resume watching jobs that were already queued or running when the page loaded
+  async function watchActiveJobs() {
+    try {
+      const response = await fetch("/api/jobs");
+      const { jobs } = await response.json();
+      jobs.filter((job) => job.status === "Queued" || job.status === "Running").forEach((job) => watchJob(job.job_id, job.name));
+    } catch (error) {
+      console.error("Error fetching jobs:", error);
+    }
+  }
+  watchActiveJobs();
+
   // Fetch and display metrics
   async function fetchMetrics() {
     try {
@@ -0,0 +1,4 @@
+import os
+
+# utils.llm creates its OpenAI client on import; tests never send a request with it
+os.environ.setdefault("OPENAI_API_KEY", "test")
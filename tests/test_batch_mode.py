@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+from utils.batch_mode import ingest, make_custom_id, prepare, read_results, split_custom_id
+from utils.document_rows import read_structured_csv
+
+# Sections 1-2 are parsed locally; the untitled paragraph 3 goes to the model
+TEXT = """CHAPTER - I
+Preliminary
+1. Definitions
+1.1 "Card" means a payment card issued by a bank.
+2. Fraud Controls
+2.1 Banks shall monitor transactions for unusual patterns.
+CHAPTER - II
+Card Payments
+3. Card issuers shall provide card usage limits to customers.
+"""
+STRUCTURE_ANSWER = (
+    "Chapter: Card Payments | Section No.: 3 | Section: Card Limits | "
+    "Sub-Section: Card issuers shall provide card usage limits to customers."
+)
+SUMMARY_ANSWER = "Summary: Card security rules.\nAction Item: Review card controls."
+ROW_ANSWER = "Summary: Row summary | Action Item: Row action | Due date: N/A | Periodicity: N/A"
+
+
+def result_line(custom_id, content, status_code=200):
+    body = {"choices": [{"message": {"content": content}}]}
+    return {"custom_id": custom_id, "response": {"status_code": status_code, "body": body}}
+
+
+def write_results(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(json.dumps(line) + "\n")
+    return str(path)
+
+
+def read_requests(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def answer(requests, answers):
+    # One successful result per request, answered by the kind in its custom id
+    return [
+        result_line(request["custom_id"], answers[split_custom_id(request["custom_id"])[1]])
+        for request in requests
+    ]
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    text_dir, csv_dir = tmp_path / "text", tmp_path / "csv"
+    text_dir.mkdir()
+    csv_dir.mkdir()
+    (text_dir / "doc.txt").write_text(TEXT, encoding="utf-8")
+    return tmp_path, str(text_dir), str(csv_dir)
+
+
+def test_custom_id_round_trip():
+    custom_id = make_custom_id("circular_2025", "structure-of-3", 2)
+    assert custom_id == "circular_2025::structure-of-3::2"
+    assert split_custom_id(custom_id) == ("circular_2025", "structure-of-3", "2")
+
+
+def test_read_results_skips_failed_and_malformed_lines(tmp_path):
+    path = write_results(
+        tmp_path / "results.jsonl",
+        [
+            result_line("ok", "answer"),
+            result_line("server", "answer", status_code=500),
+            {"custom_id": "error", "error": {"message": "expired"}},
+            {"custom_id": "malformed", "response": {"status_code": 200, "body": {}}},
+            result_line("empty", ""),
+        ],
+    )
+    assert read_results(path) == {"ok": "answer"}
+
+
+def test_structure_round_sends_only_the_model_parts(dirs):
+    tmp_path, text_dir, csv_dir = dirs
+    counts = prepare(text_dir, csv_dir, str(tmp_path / "batch" / "requests.jsonl"))
+    assert counts == {"summary": 1, "structure": 1}
+    requests = read_requests(tmp_path / "batch" / "requests.jsonl")
+    assert [r["custom_id"] for r in requests] == ["doc::summary::0", "doc::structure-of-2::1"]
+
+    results = write_results(
+        tmp_path / "results.jsonl",
+        answer(requests, {"summary": SUMMARY_ANSWER, "structure-of-2": STRUCTURE_ANSWER}),
+    )
+    report = ingest(results, csv_dir, text_dir)
+    assert report["doc"]["structure_rows"] == 3
+    document = read_structured_csv(f"{csv_dir}/doc.csv")
+    sections = [row["Section"] for row in document.rows]
+    assert sections == ["Definitions", "Fraud Controls", "Card Limits"]
+    assert document.summary == "Card security rules."
+    # The definitions row never needs the model
+    assert report["doc"]["rows_local"] == 1
+    assert document.rows[0]["Summary"].startswith("Defines the terms")
+
+
+def test_missing_structure_part_writes_no_csv(dirs):
+    tmp_path, text_dir, csv_dir = dirs
+    results = write_results(
+        tmp_path / "results.jsonl", [result_line("doc::summary::0", SUMMARY_ANSWER)]
+    )
+    report = ingest(results, csv_dir, text_dir)
+    assert report["doc"]["error"] == "1 structure parts not returned"
+    assert not (tmp_path / "csv" / "doc.csv").exists()
+
+
+def test_row_round_fills_the_remaining_rows(dirs):
+    tmp_path, text_dir, csv_dir = dirs
+    first = str(tmp_path / "first.jsonl")
+    prepare(text_dir, csv_dir, first)
+    answers = {"summary": SUMMARY_ANSWER, "structure-of-2": STRUCTURE_ANSWER, "row": ROW_ANSWER}
+    results = write_results(tmp_path / "first.out", answer(read_requests(first), answers))
+    ingest(results, csv_dir, text_dir)
+
+    second = str(tmp_path / "second.jsonl")
+    counts = prepare(text_dir, csv_dir, second, only_missing=True)
+    # The definitions row was filled at ingest and is not sent again
+    assert counts == {"summary": 1, "row": 2}
+    requests = read_requests(second)
+    assert [r["custom_id"] for r in requests[1:]] == ["doc::row::1", "doc::row::2"]
+
+    results = write_results(tmp_path / "second.out", answer(requests, answers))
+    report = ingest(results, csv_dir, text_dir)
+    assert report["doc"]["rows_updated"] == 2 and report["doc"]["structure_rows"] == 0
+    rows = read_structured_csv(f"{csv_dir}/doc.csv").rows
+    assert [row["Summary"] for row in rows[1:]] == ["Row summary", "Row summary"]
+    assert rows[0]["Summary"].startswith("Defines the terms")
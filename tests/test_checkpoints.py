@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+from utils.checkpoints import (
+    STAGES,
+    CheckpointStore,
+    StageFailed,
+    append_jsonl,
+    next_stages,
+    read_jsonl,
+    write_text,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints"))
+
+
+def test_next_stages():
+    assert next_stages({"stage": None}) == list(STAGES)
+    assert next_stages({"stage": "structure"}) == ["enrich", "finalize"]
+    assert next_stages({"stage": "finalize"}) == []
+
+
+def test_completed_stages_and_their_data_survive_a_reload(store, tmp_path):
+    store.create("n1", unique_filename="doc.pdf", priority=None)
+    store.complete("n1", "extract", pages=3)
+    store.complete("n1", "clean", tokens_saved=40)
+
+    state = CheckpointStore(str(tmp_path / "checkpoints")).load("n1")
+    assert state["job"]["unique_filename"] == "doc.pdf"
+    assert state["stage"] == "clean"
+    assert state["data"] == {"pages": 3, "tokens_saved": 40}
+    assert next_stages(state)[0] == "summary"
+
+
+def test_pending_lists_readable_checkpoints_until_removed(store, tmp_path):
+    store.create("b")
+    store.create("a")
+    os.makedirs(tmp_path / "checkpoints" / "stray")
+    assert store.pending() == ["a", "b"]
+    store.remove("a")
+    assert store.pending() == ["b"]
+    assert store.load("a") is None
+
+
+def test_stage_outputs_are_written_atomically(store, tmp_path):
+    store.create("n1")
+    store.save_json("n1", "pages.json", ["one", "two"])
+    assert store.load_json("n1", "pages.json") == ["one", "two"]
+    write_text(store.path("n1", "text.txt"), "text")
+    # No .tmp files are left behind
+    files = sorted(os.listdir(tmp_path / "checkpoints" / "n1"))
+    assert files == ["pages.json", "state.json", "text.txt"]
+
+
+def test_read_jsonl_skips_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "rows.jsonl")
+    assert read_jsonl(path) == []
+    append_jsonl(path, [{"index": 0}, {"index": 1}])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"index": 2, "Summ')
+    assert read_jsonl(path) == [{"index": 0}, {"index": 1}]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    # The app's job body over temporary stores, with every stage recording its call
+    import app as app_module
+    from utils.metrics import UploadMetrics
+    from utils.notice_registry import NoticeRegistry
+
+    monkeypatch.setattr(app_module, "checkpoints", CheckpointStore(str(tmp_path / "ckpt")))
+    monkeypatch.setattr(app_module, "notice_registry", NoticeRegistry(str(tmp_path / "n.sqlite3")))
+    monkeypatch.setattr(app_module, "upload_metrics", UploadMetrics(str(tmp_path / "m.sqlite3")))
+    calls = []
+
+    def stage(name):
+        def run(notice_id, job, data, work, progress):
+            calls.append((name, dict(data)))
+            if name == "enrich" and job.get("fail"):
+                raise StageFailed("No rows")
+            return {f"{name}_done": True}
+
+        return run
+
+    monkeypatch.setattr(app_module, "PIPELINE", {name: stage(name) for name in STAGES})
+    return app_module, calls
+
+
+def test_run_pipeline_resumes_after_the_checkpointed_stage(pipeline):
+    app_module, calls = pipeline
+    app_module.notice_registry.register("n1", "doc.csv")
+    app_module.checkpoints.create("n1", unique_filename="doc.pdf")
+    app_module.checkpoints.complete("n1", "extract", extract_done=True)
+    app_module.checkpoints.complete("n1", "structure", structure_done=True)
+
+    app_module.run_pipeline("n1")
+
+    assert [name for name, _ in calls] == ["enrich", "finalize"]
+    # Earlier stages' outputs reach the resumed ones
+    assert calls[0][1] == {"extract_done": True, "structure_done": True}
+    assert calls[1][1]["enrich_done"]
+    assert app_module.notice_registry.get("n1")["stage"] == "finalize"
+    assert app_module.checkpoints.pending() == []
+
+
+def test_failed_stage_stops_the_pipeline(pipeline):
+    app_module, calls = pipeline
+    app_module.notice_registry.register("n1", "doc.csv")
+    app_module.checkpoints.create("n1", unique_filename="doc.pdf", fail=True)
+
+    app_module.run_pipeline("n1")
+
+    assert [name for name, _ in calls] == ["extract", "clean", "summary", "structure", "enrich"]
+    notice = app_module.notice_registry.get("n1")
+    assert notice["status"] == "Failed" and notice["stage"] == "structure"
+    assert app_module.checkpoints.pending() == []
@@ -0,0 +1,76 @@
+import pytest
+
+from utils import chunking
+from utils.chunking import boundary_level, split_into_chunks
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # One token per word keeps the budgets independent of the tokenizer
+    monkeypatch.setattr(chunking, "count_tokens", lambda text: len(text.split()))
+
+
+def section(number, words):
+    return f"{number}. Heading {number}\n" + " ".join(["word"] * words)
+
+
+@pytest.mark.parametrize(
+    "line, level",
+    [
+        ("CHAPTER - II", 3),
+        ("Annex 1", 3),
+        ("3. Scope of the directions", 2),
+        ("Principle 4 Governance", 2),
+        ("3.2 Banks shall", 1),
+        ("Banks shall report", 0),
+    ],
+)
+def test_boundary_level(line, level):
+    assert boundary_level(line) == level
+
+
+def test_chunks_stay_within_the_budget():
+    text = "\n".join(section(n, 30) for n in range(1, 9))
+    chunks = split_into_chunks(text, max_tokens=100, min_fill=1.0)
+    assert len(chunks) > 1
+    assert all(chunk["tokens"] <= 100 for chunk in chunks)
+    assert "\n".join(chunk["text"] for chunk in chunks) == text
+
+
+def test_oversized_block_is_split_on_lines():
+    text = "1. Heading\n" + "\n".join(" ".join(["word"] * 10) for _ in range(12))
+    chunks = split_into_chunks(text, max_tokens=40)
+    assert len(chunks) >= 3
+    assert all(chunk["tokens"] <= 40 for chunk in chunks)
+
+
+def test_chunk_closes_early_on_a_section_once_reasonably_full():
+    text = "\n".join(section(n, 20) for n in range(1, 4))
+    chunks = split_into_chunks(text, max_tokens=100, min_fill=0.2)
+    assert [chunk["text"].split("\n")[0] for chunk in chunks] == [
+        "1. Heading 1",
+        "2. Heading 2",
+        "3. Heading 3",
+    ]
+
+
+def test_chunks_carry_the_headings_in_force():
+    text = "\n".join(["CHAPTER - I", "Introduction", section(1, 60), section(2, 60)])
+    chunks = split_into_chunks(text, max_tokens=80)
+    assert chunks[0]["chapter"] == ""
+    assert chunks[-1]["chapter"] == "CHAPTER - I Introduction"
+    assert chunks[-1]["section"] == "1. Heading 1"
+
+
+def test_index_entries_do_not_become_context():
+    text = "\n".join(
+        [
+            "1. Introduction ........ 3",
+            "2. Scope ........ 5",
+            " ".join(["word"] * 60),
+            " ".join(["word"] * 60),
+        ]
+    )
+    chunks = split_into_chunks(text, max_tokens=80)
+    assert len(chunks) == 2
+    assert chunks[-1]["section"] == ""
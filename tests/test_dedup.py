@@ -0,0 +1,69 @@
+import io
+import csv
+import hashlib
+
+import pytest
+
+from utils import dedup
+from utils.dedup import ContentRegistry, hash_file, save_and_hash
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ContentRegistry(str(tmp_path / "registry"))
+
+
+def test_save_and_hash_writes_the_stream_and_matches_hash_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "CHUNK_SIZE", 7)
+    payload = b"%PDF-1.4 " + bytes(range(256)) * 3
+    path = str(tmp_path / "upload.pdf")
+    digest = save_and_hash(io.BytesIO(payload), path)
+    with open(path, "rb") as f:
+        assert f.read() == payload
+    assert digest == hashlib.sha256(payload).hexdigest() == hash_file(path)
+
+
+def test_store_then_lookup_returns_text_rows_and_manifest(registry):
+    rows = [
+        {"Chapter": "1", "Section No.": "1.1", "Summary": "s", "Work Status": "Completed"},
+        {"Section No.": "1.2", "Action Item": "a"},
+    ]
+    assert registry.lookup("abc") is None
+    registry.store("abc", "text", rows, "doc summary", "doc action", "circular")
+
+    manifest = registry.lookup("abc")
+    assert manifest["rows"] == 2
+    assert manifest["summary"] == "doc summary"
+    assert manifest["source"] == "circular"
+    assert registry.load_text("abc") == "text"
+    stored = registry.load_rows("abc")
+    # Work-tracking columns are not cached; missing fields come back empty
+    assert "Work Status" not in stored[0]
+    assert stored[1]["Chapter"] == "" and stored[1]["Action Item"] == "a"
+
+
+def test_entry_without_manifest_is_not_a_hit(registry, tmp_path):
+    entry = tmp_path / "registry" / "partial"
+    entry.mkdir()
+    (entry / "text.txt").write_text("text", encoding="utf-8")
+    assert registry.lookup("partial") is None
+    (entry / "manifest.json").write_text("{not json", encoding="utf-8")
+    assert registry.lookup("partial") is None
+
+
+def test_backfill_registers_processed_uploads_once(registry, tmp_path):
+    uploads, texts, csvs = tmp_path / "up", tmp_path / "txt", tmp_path / "csv"
+    for directory in (uploads, texts, csvs):
+        directory.mkdir()
+    (uploads / "done.pdf").write_bytes(b"done")
+    (uploads / "pending.pdf").write_bytes(b"pending")
+    (texts / "done.txt").write_text("done text", encoding="utf-8")
+    with open(csvs / "done.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, ["Section No.", "Document Summary", "Document Action Item"])
+        writer.writeheader()
+        writer.writerow({"Section No.": "1", "Document Summary": "sum", "Document Action Item": "act"})
+
+    assert registry.backfill(str(uploads), str(texts), str(csvs)) == 1
+    manifest = registry.lookup(hash_file(str(uploads / "done.pdf")))
+    assert manifest["summary"] == "sum" and manifest["source"] == "done"
+    assert registry.backfill(str(uploads), str(texts), str(csvs)) == 0
@@ -0,0 +1,116 @@
+import io
+import os
+import threading
+
+import pytest
+
+from utils.jobs import JobQueue, QueueFull, parse_priority
+
+
+def wait_for(condition, timeout=5):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        event.wait(0.01)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.fixture
+def blocked_queue():
+    # One worker held on a running job, so later submissions stay queued
+    release = threading.Event()
+    job_queue = JobQueue(workers=1, max_size=1)
+    blocker = job_queue.submit(release.wait, job_id="blocker")
+    wait_for(lambda: blocker.status == "Running")
+    yield job_queue, release
+    release.set()
+
+
+@pytest.mark.parametrize(
+    "value, expected", [(None, 5), ("", 5), ("high", 0), ("LOW", 9), ("3", 3), ("42", 9)]
+)
+def test_parse_priority(value, expected):
+    assert parse_priority(value) == expected
+
+
+def test_parse_priority_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        parse_priority("urgent")
+
+
+def test_jobs_run_in_priority_order(blocked_queue):
+    job_queue, release = blocked_queue
+    job_queue.max_size = 3
+    job_queue._queue.maxsize = 3
+    order = []
+    jobs = [
+        job_queue.submit(order.append, name, job_id=name, priority=name)
+        for name in ("low", "normal", "high")
+    ]
+    release.set()
+    wait_for(lambda: all(job.status == "Finished" for job in jobs))
+    assert order == ["high", "normal", "low"]
+
+
+def test_full_queue_raises_with_a_retry_hint(blocked_queue):
+    job_queue, _ = blocked_queue
+    job_queue.submit(print, job_id="waiting")
+    with pytest.raises(QueueFull) as excinfo:
+        job_queue.submit(print, job_id="rejected")
+    # No finished runs yet: 30s assumed per job, one queued job, one worker
+    assert excinfo.value.retry_after == 30
+    assert job_queue.metrics()["rejected"] == 1
+    assert job_queue.get("rejected") is None
+
+
+def test_failed_job_records_the_error():
+    job_queue = JobQueue(workers=1)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    job = job_queue.submit(fail, job_id="failing")
+    wait_for(lambda: job.status == "Error")
+    assert job.error == "boom"
+    wait_for(lambda: job_queue.metrics()["failed"] == 1)
+    assert job_queue.jobs()[0]["job_id"] == "failing"
+
+
+def test_upload_to_a_full_queue_returns_503_with_retry_after(blocked_queue, tmp_path, monkeypatch):
+    import app as app_module
+    from utils.checkpoints import CheckpointStore
+    from utils.dedup import ContentRegistry
+    from utils.metrics import UploadMetrics
+    from utils.notice_registry import NoticeRegistry
+    from utils.row_store import RowStore
+
+    job_queue, _ = blocked_queue
+    job_queue.submit(print, job_id="waiting")
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    # Start-up work would scan the real data folders
+    monkeypatch.setattr(app_module, "_initialized", True)
+    monkeypatch.setitem(app_module.app.config, "UPLOAD_FOLDER", str(uploads))
+    monkeypatch.setattr(app_module, "job_queue", job_queue)
+    monkeypatch.setattr(app_module, "content_registry", ContentRegistry(str(tmp_path / "reg")))
+    monkeypatch.setattr(app_module, "checkpoints", CheckpointStore(str(tmp_path / "ckpt")))
+    monkeypatch.setattr(app_module, "row_store", RowStore(str(tmp_path / "rows.sqlite3")))
+    notices = NoticeRegistry(str(tmp_path / "notices.sqlite3"))
+    monkeypatch.setattr(app_module, "notice_registry", notices)
+    metrics = UploadMetrics(str(tmp_path / "metrics.sqlite3"))
+    monkeypatch.setattr(app_module, "upload_metrics", metrics)
+
+    response = app_module.app.test_client().post(
+        "/api/upload",
+        data={"file": (io.BytesIO(b"%PDF-1.4 test"), "circular.pdf")},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+    assert response.get_json()["retry_after"] == 30
+    # The rejected upload leaves nothing behind
+    assert os.listdir(uploads) == []
+    assert notices.list() == []
+    assert app_module.checkpoints.pending() == []
@@ -0,0 +1,84 @@
+import pytest
+
+from utils import llm_cache
+from utils.llm_cache import LLMCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    return LLMCache(str(tmp_path / "cache" / "llm.sqlite3"), **kwargs)
+
+
+def test_key_ignores_param_order_but_not_content():
+    messages = [{"role": "user", "content": "hi"}]
+    key = LLMCache.make_key("m", messages, {"temperature": 0, "top_p": 1})
+    assert key == LLMCache.make_key("m", messages, {"top_p": 1, "temperature": 0})
+    assert key != LLMCache.make_key("other", messages, {"temperature": 0, "top_p": 1})
+
+
+def test_hit_miss_and_persistence(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert cache.get("k") is None
+    cache.set("k", "m", "answer")
+    assert cache.get("k") == "answer"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get("k") == "answer"
+    assert reopened.stats()["bytes"] == len("answer")
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("k", "m", "answer")
+    clock.now += 60
+    assert cache.get("k") == "answer"
+    clock.now += 1
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["entries"] == 0 and stats["bytes"] == 0
+
+
+def test_least_recently_used_entry_is_evicted_first(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.set(key, "m", key * 10)
+        clock.now += 1
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == "a" * 10
+    clock.now += 1
+    cache.set("d", "m", "d" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c") and cache.get("d")
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 30
+
+
+def test_replacing_an_entry_counts_its_size_once(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=30)
+    cache.set("k", "m", "x" * 20)
+    cache.set("k", "m", "y" * 25)
+    assert cache.stats()["bytes"] == 25 and cache.stats()["evictions"] == 0
+
+
+def test_disabled_cache_never_touches_the_disk(tmp_path):
+    cache = make_cache(tmp_path, enabled=False)
+    cache.set("k", "m", "answer")
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,110 @@
+import json
+import queue
+import atexit
+import logging
+
+import pytest
+
+from utils import log_setup
+from utils.log_setup import (
+    BoundedQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    log_payload,
+    parse_sample_rates,
+    truncate,
+)
+
+
+def make_record(name="utils.helpers", level=logging.INFO, msg="hello", args=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    counts = {"dropped": 0, "sampled_out": 0, "truncated": 0}
+    monkeypatch.setattr(log_setup, "_stats", counts)
+    return counts
+
+
+def test_truncate():
+    assert truncate("short", 10) == "short"
+    assert truncate("x" * 12, 0) == "x" * 12
+    assert truncate("abcdefghij", 4) == "abcd... [6 chars truncated]"
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("utils.helpers=0.1, utils.llm=2,bad,=0.5") == {
+        "utils.helpers": 0.1,
+        "utils.llm": 1.0,
+    }
+    assert parse_sample_rates("") == {}
+
+
+def test_sampling_applies_to_child_loggers_and_spares_warnings(stats, monkeypatch):
+    monkeypatch.setattr(log_setup.random, "random", lambda: 0.5)
+    sampling = SamplingFilter({"utils": 0.1, "utils.llm": 0.9})
+    assert not sampling.filter(make_record("utils.helpers"))
+    assert sampling.filter(make_record("utils.llm.cache"))
+    assert sampling.filter(make_record("app"))
+    assert sampling.filter(make_record("utils.helpers", level=logging.WARNING))
+    assert stats["sampled_out"] == 1
+
+
+def test_queue_handler_truncates_and_drops_instead_of_blocking(stats):
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, max_message=5)
+    record = make_record(msg="%s rows", args=("1234567",))
+    handler.handle(record)
+    handler.handle(make_record(msg="ok"))
+
+    queued = log_queue.get_nowait()
+    assert queued.getMessage() == "12345... [7 chars truncated]"
+    # The caller's record is left as it was
+    assert record.getMessage() == "1234567 rows"
+    assert stats == {"dropped": 1, "sampled_out": 0, "truncated": 1}
+
+
+def test_json_formatter_merges_extra_fields():
+    record = make_record(msg="Enriched %d rows", args=(3,))
+    record.fields = {"notice_id": "n1"}
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Enriched 3 rows"
+    assert entry["level"] == "INFO" and entry["logger"] == "utils.helpers"
+    assert entry["notice_id"] == "n1"
+
+
+def test_payload_is_not_built_while_the_sink_is_off(monkeypatch):
+    monkeypatch.setattr(log_setup.payload_logger, "level", logging.CRITICAL + 1)
+    built = []
+    log_payload("rows", lambda: built.append(1) or "payload")
+    assert built == []
+
+
+def test_setup_logging_routes_payloads_to_their_own_file(tmp_path, monkeypatch):
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    payload_logger = log_setup.payload_logger
+    saved_payload = payload_logger.handlers[:], payload_logger.level, payload_logger.propagate
+    monkeypatch.setattr(log_setup, "_listener", None)
+    monkeypatch.setattr(log_setup, "LOG_FORMAT", "json")
+    monkeypatch.setattr(log_setup, "LOG_FILE", str(tmp_path / "logs" / "app.log"))
+    monkeypatch.setattr(log_setup, "LOG_PAYLOAD_FILE", str(tmp_path / "logs" / "payloads.log"))
+    try:
+        listener = log_setup.setup_logging()
+        assert log_setup.setup_logging() is listener
+        logging.getLogger("utils.helpers").info("Parsed %d rows", 4)
+        log_payload("rows", lambda: "full payload", notice_id="n1")
+        listener.stop()
+        atexit.unregister(listener.stop)
+    finally:
+        root.handlers, root.level = saved
+        payload_logger.handlers, payload_logger.level, payload_logger.propagate = saved_payload
+
+    with open(tmp_path / "logs" / "app.log", encoding="utf-8") as f:
+        app_lines = [json.loads(line) for line in f]
+    with open(tmp_path / "logs" / "payloads.log", encoding="utf-8") as f:
+        payload_lines = [json.loads(line) for line in f]
+    assert [line["message"] for line in app_lines] == ["Parsed 4 rows"]
+    assert payload_lines[0]["message"] == "rows: full payload"
+    assert payload_lines[0]["notice_id"] == "n1" and payload_lines[0]["kind"] == "rows"
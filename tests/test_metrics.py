@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from utils.metrics import UploadMetrics
+
+TODAY = date(2025, 6, 10)
+NOTICES = [
+    {"upload_date": "2025-06-10 09:00:00", "status": "Completed", "content_hash": "a", "document_id": "d1"},
+    {"upload_date": "2025-06-10 10:00:00", "status": "Failed", "content_hash": "a", "document_id": "d2"},
+    {"upload_date": "2025-06-08 10:00:00", "status": "Processing", "content_hash": "b", "document_id": "d3"},
+    # Adopted CSVs without an upload fall back to their document id
+    {"upload_date": "2025-05-01 10:00:00", "status": "Completed", "content_hash": "", "document_id": "d4"},
+]
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    return UploadMetrics(str(tmp_path / "db" / "metrics.sqlite3"))
+
+
+def test_rebuild_counts(metrics):
+    assert metrics.is_empty()
+    assert metrics.rebuild(NOTICES) == 4
+    assert not metrics.is_empty()
+
+    snapshot = metrics.snapshot(TODAY)
+    assert snapshot["total_uploads"] == 4
+    assert snapshot["unique_documents"] == 3
+    assert snapshot["weekly_uploads"] == 3
+    assert snapshot["daily_avg_uploads"] == round(3 / 7, 2)
+    assert snapshot["daily_uploads"]["2025-06-10"] == 2
+    assert snapshot["daily_uploads"]["2025-06-08"] == 1
+    assert list(snapshot["daily_uploads"])[0] == "2025-06-04"
+    assert snapshot["status_distribution"] == {"Processing": 1, "Completed": 2, "Failed": 1}
+
+
+def test_rebuild_replaces_earlier_counts(metrics):
+    metrics.rebuild(NOTICES)
+    metrics.rebuild(NOTICES[:1])
+    snapshot = metrics.snapshot(TODAY)
+    assert snapshot["total_uploads"] == 1 and snapshot["unique_documents"] == 1
+    assert snapshot["status_distribution"]["Failed"] == 0
+
+
+def test_events_match_a_rebuild(metrics, tmp_path):
+    for notice in NOTICES:
+        key = notice["content_hash"] or notice["document_id"]
+        metrics.record_upload(notice["upload_date"][:10], "Processing", key)
+        metrics.record_status("Processing", notice["status"])
+    rebuilt = UploadMetrics(str(tmp_path / "rebuilt.sqlite3"))
+    rebuilt.rebuild(NOTICES)
+    assert metrics.snapshot(TODAY) == rebuilt.snapshot(TODAY)
+
+
+def test_removed_upload_is_undone(metrics):
+    metrics.record_upload("2025-06-10", "Processing", "a")
+    metrics.record_upload("2025-06-10", "Processing", "a")
+    metrics.record_removed("2025-06-10", "Processing", "a")
+    snapshot = metrics.snapshot(TODAY)
+    assert snapshot["total_uploads"] == 1 and snapshot["unique_documents"] == 1
+    metrics.record_removed("2025-06-10", "Processing", "a")
+    snapshot = metrics.snapshot(TODAY)
+    assert snapshot["total_uploads"] == 0 and snapshot["unique_documents"] == 0
+    assert snapshot["status_distribution"]["Processing"] == 0
+
+
+def test_unchanged_status_is_not_counted_twice(metrics):
+    metrics.record_upload("2025-06-10", "Processing", "a")
+    metrics.record_status("Processing", "Processing")
+    assert metrics.snapshot(TODAY)["status_distribution"]["Processing"] == 1
@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+from utils.dedup import hash_file
+from utils.notice_registry import NoticeRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return NoticeRegistry(str(tmp_path / "db" / "notices.sqlite3"))
+
+
+def test_register_update_and_remove(registry):
+    record = registry.register("n1", "circular_20250101120000_n1.csv")
+    assert record["document_id"] == "circular_20250101120000_n1"
+    assert record["approval_status"] == "Pending Approval"
+
+    assert registry.update("n1", status="Completed", has_csv=1, summary="s")
+    notice = registry.get("n1")
+    assert notice["status"] == "Completed" and notice["summary"] == "s"
+    assert registry.by_filename("circular_20250101120000_n1.csv")["notice_id"] == "n1"
+
+    assert not registry.update("missing", status="Completed")
+    with pytest.raises(ValueError):
+        registry.update("n1", colour="red")
+
+    registry.remove("n1")
+    assert registry.get("n1") is None
+
+
+def test_list_filters_and_orders_newest_first(registry):
+    registry.register("old", "old.csv", status="Completed", has_csv=1, upload_date="2025-01-01 00:00:00")
+    registry.register("new", "new.csv", status="Completed", has_csv=1, upload_date="2025-02-01 00:00:00")
+    registry.register("busy", "busy.csv", upload_date="2025-03-01 00:00:00")
+    registry.update("old", approval_status="Approved")
+
+    assert [n["notice_id"] for n in registry.list()] == ["new", "old"]
+    assert [n["notice_id"] for n in registry.list(with_csv=False)] == ["busy", "new", "old"]
+    assert [n["notice_id"] for n in registry.list(approval_status="Approved")] == ["old"]
+    assert registry.list(status="Processing") == []
+
+
+def test_costliest_sorts_by_a_cost_column(registry):
+    registry.register("cheap", "cheap.csv", cost_usd=0.01, llm_calls=40)
+    registry.register("dear", "dear.csv", cost_usd=0.5, llm_calls=10)
+    assert [n["notice_id"] for n in registry.costliest()] == ["dear", "cheap"]
+    assert [n["notice_id"] for n in registry.costliest(limit=1, by="llm_calls")] == ["cheap"]
+    with pytest.raises(ValueError):
+        registry.costliest(by="summary")
+
+
+def test_fail_interrupted_spares_checkpointed_notices(registry):
+    registry.register("lost", "lost.csv")
+    registry.register("resumable", "resumable.csv")
+    registry.register("done", "done.csv", status="Completed")
+    assert registry.fail_interrupted(keep=["resumable"]) == 1
+    assert registry.get("lost")["status"] == "Failed"
+    assert registry.get("resumable")["status"] == "Processing"
+    assert registry.get("done")["status"] == "Completed"
+
+
+def test_sync_directory_adopts_existing_csvs_once(registry, tmp_path):
+    csv_dir, upload_dir = tmp_path / "csv", tmp_path / "uploads"
+    csv_dir.mkdir()
+    upload_dir.mkdir()
+    (csv_dir / "rbi_20250527182933_abc.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    (csv_dir / "notes.txt").write_text("not a csv", encoding="utf-8")
+    (upload_dir / "rbi_20250527182933_abc.pdf").write_bytes(b"%PDF")
+
+    assert registry.sync_directory(str(csv_dir), str(upload_dir)) == 1
+    notice = registry.get("rbi_20250527182933_abc")
+    assert notice["status"] == "Completed" and notice["has_csv"] == 1
+    assert notice["upload_date"] == "2025-05-27 18:29:33"
+    assert notice["content_hash"] == hash_file(str(upload_dir / "rbi_20250527182933_abc.pdf"))
+    assert registry.sync_directory(str(csv_dir), str(upload_dir)) == 0
+
+
+def test_old_databases_gain_the_new_columns(tmp_path):
+    path = str(tmp_path / "notices.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE notices (notice_id TEXT PRIMARY KEY, document_id TEXT NOT NULL, "
+        "filename TEXT NOT NULL UNIQUE, status TEXT NOT NULL, approval_status TEXT NOT NULL, "
+        "upload_date TEXT NOT NULL, last_updated TEXT NOT NULL, size INTEGER NOT NULL DEFAULT 0, "
+        "has_csv INTEGER NOT NULL DEFAULT 0, summary TEXT NOT NULL DEFAULT '', "
+        "action_item TEXT NOT NULL DEFAULT '')"
+    )
+    conn.execute(
+        "INSERT INTO notices VALUES ('n1', 'd1', 'd1.csv', 'Completed', 'Approved', "
+        "'2025-01-01 00:00:00', '2025-01-01 00:00:00', 10, 1, 's', 'a')"
+    )
+    conn.commit()
+    conn.close()
+
+    notice = NoticeRegistry(path).get("n1")
+    assert notice["approval_status"] == "Approved"
+    assert notice["content_hash"] == "" and notice["cost_usd"] == 0
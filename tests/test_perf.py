@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from utils import perf as perf_module
+from utils.perf import BUCKETS, Histogram, PerfRecorder, cost_usd, document_totals, in_scope
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(perf_module.time, "monotonic", clock)
+    return clock
+
+
+def test_cost_uses_the_per_million_prices(monkeypatch):
+    monkeypatch.setattr(perf_module, "LLM_PRICE_INPUT", 0.15)
+    monkeypatch.setattr(perf_module, "LLM_PRICE_OUTPUT", 0.60)
+    assert cost_usd(1_000_000, 500_000) == pytest.approx(0.45)
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) == 0
+    for value in (0.01, 0.05, 0.3, 0.3, 2):
+        histogram.observe(value)
+    assert histogram.counts[:5] == [2, 0, 0, 2, 0]
+    stats = histogram.stats()
+    assert stats["count"] == 5 and stats["sum"] == pytest.approx(2.66)
+    assert stats["p50"] == 0.5 and stats["p95"] == 2.5
+    histogram.observe(BUCKETS[-1] + 1)
+    assert histogram.counts[-1] == 1 and histogram.quantile(1) is None
+
+
+def test_calls_are_charged_to_the_document_stage(clock):
+    recorder = PerfRecorder()
+    recorder.start("n1")
+    with recorder.stage("n1", "structure"):
+        clock.now += 2
+        recorder.record_call(1.5, 100, 20)
+        recorder.count("cache_hits")
+    with recorder.stage("n1", "enrich"):
+        recorder.record_call(0.5, 50, 10)
+        recorder.count("retries", 2)
+    # Outside any stage the counters go to "other" and no document
+    recorder.record_call(0.1, 7, 1)
+
+    breakdown = recorder.document("n1")
+    assert breakdown["structure"]["seconds"] == 2
+    assert breakdown["structure"]["calls"] == 1 and breakdown["structure"]["cache_hits"] == 1
+    assert breakdown["enrich"]["prompt_tokens"] == 50 and breakdown["enrich"]["retries"] == 2
+
+    snapshot = recorder.snapshot()
+    assert snapshot["stages"]["other"]["prompt_tokens"] == 7
+    assert snapshot["totals"]["calls"] == 3
+    assert snapshot["histograms"]["llm_request_seconds"]["structure"]["count"] == 1
+    assert snapshot["in_flight"]["n1"] == breakdown
+
+
+def test_resumed_document_continues_its_saved_breakdown():
+    recorder = PerfRecorder()
+    recorder.start("n1", {"extract": {"seconds": 1.2, "calls": 0}})
+    with recorder.stage("n1", "summary"):
+        recorder.record_call(1, 10, 5)
+    breakdown = recorder.finish("n1")
+    assert set(breakdown) == {"extract", "summary"}
+    assert breakdown["extract"]["seconds"] == 1.2
+    totals = document_totals(breakdown)
+    assert totals["calls"] == 1 and totals["cost_usd"] == cost_usd(10, 5)
+    assert recorder.document("n1") is None
+
+
+def test_in_scope_carries_the_stage_into_other_threads():
+    recorder = PerfRecorder()
+    recorder.start("n1")
+    with recorder.stage("n1", "enrich"):
+        thread = threading.Thread(target=in_scope(lambda: recorder.count("calls")))
+        thread.start()
+        thread.join()
+    assert recorder.document("n1")["enrich"]["calls"] == 1
+
+
+def test_prometheus_exposition(clock):
+    recorder = PerfRecorder()
+    with recorder.timed("csv_write"):
+        clock.now += 0.2
+    with recorder.stage("n1", "enrich"):
+        recorder.record_call(0.3, 10, 2)
+    text = recorder.prometheus()
+    assert '# TYPE pipeline_step_seconds histogram' in text
+    assert 'pipeline_step_seconds_bucket{step="csv_write",le="0.25"} 1' in text
+    assert 'pipeline_step_seconds_bucket{step="csv_write",le="+Inf"} 1' in text
+    assert 'pipeline_prompt_tokens_total{stage="enrich"} 10' in text
+    assert text.endswith("pipeline_documents_in_flight 1\n")
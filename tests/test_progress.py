@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from utils import progress
+from utils.progress import ProgressHub, format_sse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(progress.time, "time", clock)
+    return clock
+
+
+def test_events_are_numbered_per_job(clock):
+    hub = ProgressHub()
+    hub.publish("a", "queued")
+    hub.reporter("a")("rows_enriched", done=1, total=2)
+    hub.publish("b", "queued")
+    events = hub.events("a")
+    assert [(e["id"], e["event"]) for e in events] == [(1, "queued"), (2, "rows_enriched")]
+    assert events[1]["done"] == 1
+    assert [e["id"] for e in hub.events("a", after=1)] == [2]
+    assert hub.events("b")[0]["id"] == 1
+
+
+def test_history_is_bounded():
+    hub = ProgressHub(history=3)
+    for step in range(5):
+        hub.publish("a", "step", n=step)
+    assert [e["n"] for e in hub.events("a")] == [2, 3, 4]
+
+
+def test_finished_jobs_expire_after_the_retention(clock):
+    hub = ProgressHub(retention_seconds=60)
+    hub.publish("a", "completed")
+    assert hub.delivered("a", 1) and not hub.delivered("a", 0)
+    clock.now += 61
+    hub.publish("b", "queued")
+    assert not hub.known("a") and hub.known("b")
+
+
+def test_reused_job_id_starts_a_fresh_stream(clock):
+    hub = ProgressHub()
+    hub.publish("a", "failed")
+    hub.publish("a", "queued")
+    assert [(e["id"], e["event"]) for e in hub.events("a")] == [(1, "queued")]
+
+
+def test_subscribe_replays_and_stops_after_the_terminal_event():
+    hub = ProgressHub()
+    hub.publish("a", "queued")
+    hub.publish("a", "completed")
+    assert [e["event"] for e in hub.subscribe("a")] == ["queued", "completed"]
+    # A reconnect after the end returns at once
+    assert list(hub.subscribe("a", last_event_id=2)) == []
+
+
+def test_subscribe_sends_heartbeats_while_the_job_is_alive():
+    hub = ProgressHub()
+    stream = hub.subscribe("a", heartbeat=0.01, alive=lambda: True)
+    assert next(stream) is None
+    hub.publish("a", "queued")
+    assert next(stream)["event"] == "queued"
+    assert list(hub.subscribe("gone", alive=lambda: False)) == []
+
+
+def test_format_sse():
+    assert format_sse(None) == ": keep-alive\n\n"
+    frame = format_sse({"id": 3, "event": "queued", "time": 1.0})
+    lines = frame.split("\n")
+    assert lines[:2] == ["id: 3", "event: queued"]
+    assert json.loads(lines[2][len("data: "):])["id"] == 3
+    assert frame.endswith("\n\n")
@@ -0,0 +1,112 @@
+import pytest
+
+from utils import rate_limit
+from utils.rate_limit import RateLimiter, TokenBucket, parse_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("20ms", 0.02), ("1s", 1.0), ("6m0s", 360.0), ("1h", 3600.0), ("2.5", 2.5), (3, 3.0)],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == pytest.approx(expected)
+
+
+def test_parse_duration_rejects_garbage():
+    assert parse_duration(None) is None
+    assert parse_duration("soon") is None
+
+
+def test_bucket_refills_at_the_per_minute_rate(clock):
+    bucket = TokenBucket(600)
+    assert bucket.capacity == 100
+    bucket.level = 0
+    clock.now += 2
+    bucket.refill(clock.now)
+    assert bucket.level == pytest.approx(20)
+    clock.now += 60
+    bucket.refill(clock.now)
+    assert bucket.level == bucket.capacity
+    assert bucket.wait_time(10) == 0.0
+    bucket.level = 5
+    assert bucket.wait_time(10) == pytest.approx(0.5)
+
+
+def test_acquire_spends_both_buckets(clock):
+    limiter = RateLimiter(rpm=60, tpm=6000)
+    assert limiter._try_acquire(100) == 0.0
+    assert limiter.requests.level == pytest.approx(9)
+    assert limiter.tokens.level == pytest.approx(900)
+    assert limiter.acquired == 1
+
+
+def test_acquire_waits_when_the_burst_is_spent(clock):
+    limiter = RateLimiter(rpm=60, tpm=600_000)
+    for _ in range(10):
+        assert limiter._try_acquire(1) == 0.0
+    assert limiter._try_acquire(1) == pytest.approx(1.0)
+    clock.now += 1
+    assert limiter._try_acquire(1) == 0.0
+
+
+def test_oversized_request_is_capped_at_the_bucket_capacity(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)
+    assert limiter._try_acquire(10_000) == 0.0
+    assert limiter.tokens.level == 0
+
+
+def test_rate_limited_halves_the_rate_and_pauses(clock):
+    limiter = RateLimiter(rpm=100, tpm=10_000)
+    limiter.on_rate_limited({"retry-after": "2"})
+    assert limiter.requests.per_minute == 50
+    assert limiter.tokens.per_minute == 5000
+    assert limiter._try_acquire(1) == pytest.approx(2.0)
+    for _ in range(10):
+        limiter.on_rate_limited()
+    # Never below min_fraction of the account limit
+    assert limiter.requests.per_minute == pytest.approx(10)
+    assert limiter.rate_limited == 11
+
+
+def test_successes_recover_towards_the_limit(clock):
+    limiter = RateLimiter(rpm=100, tpm=10_000, recovery=0.25)
+    limiter.on_rate_limited()
+    limiter.on_response({"x-ratelimit-limit-requests": "100"})
+    assert limiter.requests.per_minute == 75
+    limiter.on_response({"x-ratelimit-limit-requests": "100"})
+    limiter.on_response({"x-ratelimit-limit-requests": "100"})
+    assert limiter.requests.per_minute == 100
+
+
+def test_response_headers_cap_the_local_estimate(clock):
+    limiter = RateLimiter(rpm=600, tpm=60_000)
+    limiter.on_response({"x-ratelimit-remaining-requests": "3", "x-ratelimit-remaining-tokens": "50"})
+    assert limiter.requests.level == 3
+    assert limiter.tokens.level == 50
+    # A lower account limit applies at once
+    limiter.on_response({"x-ratelimit-limit-requests": "120"})
+    assert limiter.requests.per_minute == 120
+
+
+def test_reconcile_charges_the_difference(clock):
+    limiter = RateLimiter(rpm=60, tpm=6000)
+    limiter._try_acquire(100)
+    limiter.reconcile(100, 250)
+    assert limiter.tokens.level == pytest.approx(750)
+    limiter.reconcile(100, None)
+    assert limiter.tokens.level == pytest.approx(750)
@@ -0,0 +1,60 @@
+import pytest
+
+from utils import resilience
+from utils.resilience import CircuitBreaker, backoff_delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker._try_pass() == 0.0
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker._try_pass() == pytest.approx(30)
+    assert breaker.opened == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker._try_pass() == 0.0
+    assert breaker.state == "half-open"
+    # Everyone else waits for the probe's outcome
+    assert breaker._try_pass() == pytest.approx(1.0)
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker._try_pass() == 0.0
+
+
+def test_failed_probe_opens_the_breaker_again(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock[0] += 10
+    breaker._try_pass()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker._try_pass() == pytest.approx(10)
+    assert breaker.opened == 2
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=5.0) <= 5.0
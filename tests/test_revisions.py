@@ -0,0 +1,84 @@
+from utils.revisions import carry_forward, change_report, load_report, match_rows, save_report
+
+
+def row(chapter, number, section, text, **fields):
+    return dict(
+        {"Chapter": chapter, "Section No.": number, "Section": section, "Sub-Section": text}, **fields
+    )
+
+
+OLD = [
+    row("Governance", "1", "Role of the Board", "- 1.1 The Board shall approve the IT policy.",
+        Summary="Board approves the policy", **{"Work Status": "Completed"}),
+    row("Governance", "2", "Role of Senior Management",
+        "- 2.1 Senior management shall implement the policy and report to the Board quarterly.",
+        Summary="Management implements it"),
+    row("Risk", "3", "Business Continuity", "- 3.1 Banks shall test the BCP every year.",
+        Summary="Test the BCP"),
+    row("Risk", "4", "Exit Strategy",
+        "- 4.1 Banks shall have an exit strategy for every outsourcing arrangement."),
+]
+
+
+def test_matches_unchanged_changed_added_and_removed():
+    new = [
+        dict(OLD[0]),
+        row("Governance", "2", "Role of Senior Management",
+            "- 2.1 Senior management shall implement the policy and report to the Board monthly."),
+        # Renumbered but otherwise identical
+        row("Risk", "5", "Business Continuity", "- 3.1 Banks shall test the BCP every year."),
+        row("Risk", "6", "Cloud Services", "- 6.1 Banks shall assess cloud concentration risk."),
+    ]
+    matches, removed = match_rows(OLD, new)
+    assert [(match["previous_index"], match["change"]) for match in matches] == [
+        (0, "unchanged"),
+        (1, "changed"),
+        (2, "unchanged"),
+        (None, "added"),
+    ]
+    assert 0.5 <= matches[1]["similarity"] < 1.0
+    assert removed == [3]
+
+
+def test_whitespace_and_case_do_not_count_as_changes():
+    new = [dict(OLD[0], **{"Sub-Section": "- 1.1  The BOARD shall approve\nthe IT policy."})]
+    matches, _ = match_rows(OLD[:1], new)
+    assert matches[0]["change"] == "unchanged"
+
+
+def test_each_old_row_matches_at_most_once():
+    matches, removed = match_rows(OLD[:1], [dict(OLD[0]), dict(OLD[0])])
+    assert [match["change"] for match in matches] == ["unchanged", "added"]
+    assert removed == []
+
+
+def test_carry_forward_copies_enrichment_and_edits_of_unchanged_rows_only():
+    new = [
+        row("Governance", "1", "Role of the Board", OLD[0]["Sub-Section"]),
+        row("Governance", "2", "Role of Senior Management", "- 2.1 Something else entirely now."),
+    ]
+    matches, _ = match_rows(OLD, new)
+    carried = carry_forward(OLD, new, matches)
+    assert carried[0]["Summary"] == "Board approves the policy"
+    assert carried[0]["Work Status"] == "Completed"
+    assert "Summary" not in carried[1]
+    # The input rows are left as they were
+    assert "Summary" not in new[0]
+
+
+def test_change_report_counts_and_sections(tmp_path):
+    new = [dict(OLD[0]), row("Risk", "9", "New Section", "- 9.1 Entirely new requirement text.")]
+    matches, removed = match_rows(OLD, new)
+    report = change_report(OLD, new, matches, removed)
+    assert report["counts"] == {"unchanged": 1, "changed": 0, "added": 1, "removed": 3}
+    by_section = {
+        (section["chapter"], section["section_no"]): section["change"] for section in report["sections"]
+    }
+    assert by_section[("Governance", "1")] == "unchanged"
+    assert by_section[("Risk", "9")] == "added"
+    assert by_section[("Risk", "4")] == "removed"
+
+    path = tmp_path / "reports" / "notice.json"
+    save_report(str(path), report)
+    assert load_report(str(path)) == report
+    assert load_report(str(tmp_path / "missing.json")) is None
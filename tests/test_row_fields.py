@@ -0,0 +1,91 @@
+from datetime import date
+
+import pytest
+
+from utils.row_fields import (
+    add_months,
+    definitional_result,
+    extract_due_date,
+    extract_periodicity,
+    is_definitional,
+    local_row_fields,
+)
+
+TODAY = "2025-01-31"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Banks shall comply by March 31, 2025.", "2025-03-31"),
+        ("Banks shall comply by 31st March 2025.", "2025-03-31"),
+        ("Submit the return by 30.06.2025.", "2025-06-30"),
+        ("Effective from 2025-04-01 for all banks.", "2025-04-01"),
+        ("Submit the report within 30 days.", "2025-03-02"),
+        ("Put the framework in place within six months.", "2025-07-31"),
+        ("Review it within a year.", "2026-01-31"),
+        ("Banks shall maintain a board approved policy.", "N/A"),
+    ],
+)
+def test_extract_due_date(text, expected):
+    assert extract_due_date(text, TODAY) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Two different deadlines
+        "Phase one by March 31, 2025 and phase two by June 30, 2025.",
+        # Working days depend on holidays
+        "Report the incident within 5 working days.",
+        # Timing language the rules cannot resolve
+        "Submit the plan by the end of the quarter.",
+        "Comply within a reasonable time.",
+        # An impossible date
+        "Comply by 31.02.2025.",
+    ],
+)
+def test_extract_due_date_defers_to_the_model(text):
+    assert extract_due_date(text, TODAY) is None
+
+
+def test_issue_dates_are_not_deadlines():
+    text = "This updates the circular dated April 1, 2024."
+    assert extract_due_date(text, TODAY) == "N/A"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("The Board shall review the policy annually.", "annual"),
+        ("Reconcile the accounts on a daily basis: daily.", "daily"),
+        ("Test the plan every quarter.", "quarterly"),
+        ("Audit the controls semi-annually.", "half-yearly"),
+        ("Banks shall maintain a policy.", "N/A"),
+        ("Review the policy periodically.", None),
+        ("Report monthly and review quarterly.", None),
+    ],
+)
+def test_extract_periodicity(text, expected):
+    assert extract_periodicity(text) == expected
+
+
+def test_add_months_clamps_to_the_month_end():
+    assert add_months(date(2025, 1, 31), 1) == date(2025, 2, 28)
+    assert add_months(date(2024, 11, 30), 3) == date(2025, 2, 28)
+
+
+def test_local_row_fields_needs_both_fields():
+    row = {"Section": "Board oversight", "Sub-Section": "The Board shall review the policy annually."}
+    assert local_row_fields(row, TODAY) == {"Due date": "N/A", "Periodicity": "annual"}
+    row["Sub-Section"] = "The Board shall review the policy periodically."
+    assert local_row_fields(row, TODAY) is None
+
+
+def test_definitions_without_obligations():
+    row = {"Section": "Definitions", "Sub-Section": "- (a) 'Bank' shall mean a banking company."}
+    assert is_definitional(row)
+    assert definitional_result(3, row)["index"] == 3
+    row["Sub-Section"] += " - (b) Banks shall report incidents."
+    assert not is_definitional(row)
+    assert not is_definitional({"Section": "Governance", "Sub-Section": "'Bank' shall mean ..."})
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from utils.row_store import RowStore
+
+HEADERS = ["Document ID", "Section No.", "Summary", "Marked as Completed", "Work Status", "Role Assigned To"]
+
+
+def write_csv(path, rows, mtime=None):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(",".join(HEADERS) + "\n")
+        for row in rows:
+            f.write(",".join(row) + "\n")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RowStore(str(tmp_path / "rows.sqlite3"))
+
+
+def test_reimport_keeps_edits_and_takes_pipeline_columns(store, tmp_path):
+    csv_path = str(tmp_path / "doc.csv")
+    rows = [["doc", "1", "old", "No", "Not Started", ""], ["doc", "2", "old", "No", "Not Started", ""]]
+    write_csv(csv_path, rows, 1000)
+    assert store.ensure("doc", csv_path)
+    assert store.update_row("doc", 0, {"Work Status": "Completed", "Role Assigned To": "CISO"})
+
+    # The pipeline rewrites the CSV (e.g. a re-enrichment) with new summaries
+    write_csv(csv_path, [[cell.replace("old", "new") for cell in row] for row in rows], 2000)
+    assert store.ensure("doc", csv_path)
+    rows = store.rows("doc")
+    assert [row["Summary"] for row in rows] == ["new", "new"]
+    assert rows[0]["Work Status"] == "Completed"
+    assert rows[0]["Role Assigned To"] == "CISO"
+    assert rows[1]["Work Status"] == "Not Started"
+
+
+def test_unchanged_csv_is_not_reimported(store, tmp_path):
+    csv_path = str(tmp_path / "doc.csv")
+    write_csv(csv_path, [["doc", "1", "a", "No", "Not Started", ""]], 1000)
+    store.ensure("doc", csv_path)
+    version = store.version("doc")
+    store.ensure("doc", csv_path)
+    assert store.version("doc") == version
+
+
+def test_edits_bump_the_version_and_reject_pipeline_columns(store, tmp_path):
+    csv_path = str(tmp_path / "doc.csv")
+    write_csv(csv_path, [["doc", "1", "a", "No", "Not Started", ""]])
+    store.ensure("doc", csv_path)
+    version = store.version("doc")
+    assert store.update_row("doc", 0, {"Marked as Completed": "Yes"})
+    assert store.version("doc") == version + 1
+    assert not store.update_row("doc", 5, {"Marked as Completed": "Yes"})
+    with pytest.raises(ValueError):
+        store.update_row("doc", 0, {"Summary": "edited"})
+
+
+def test_export_writes_the_edited_rows(store, tmp_path):
+    csv_path = str(tmp_path / "doc.csv")
+    write_csv(csv_path, [["doc", "1", "a", "No", "Not Started", ""]])
+    store.ensure("doc", csv_path)
+    store.update_row("doc", 0, {"Work Status": "In Progress"})
+    text = store.export_csv("doc", csv_path)
+    assert "In Progress" in text
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        assert f.read() == text
+
+
+def test_delete_drops_the_document(store, tmp_path):
+    csv_path = str(tmp_path / "doc.csv")
+    write_csv(csv_path, [["doc", "1", "a", "No", "Not Started", ""]])
+    store.ensure("doc", csv_path)
+    store.delete("doc")
+    assert store.rows("doc") == []
+    assert store.headers("doc") is None
+    assert store.stats()["documents"] == 0
@@ -0,0 +1,167 @@
+from utils.structure_rules import (
+    is_heading,
+    join_split_capitals,
+    normalize_title,
+    plan_document,
+    plan_structure,
+    sub_section_text,
+)
+
+DIRECTION = """Reserve Bank of India
+Master Direction on Something
+CHAPTER - I
+Preliminary
+1. Short Title and Commencement
+1.1 These Directions shall be called the Master Direction.
+1.2 They shall come into effect from the date of issue.
+2. Applicability
+2.1 These Directions shall apply to all commercial banks.
+CHAPTER - II
+Governance
+3. Role of the Board
+3.1 The Board shall approve the policy.
+4. Role of Senior Management
+4.1 Senior management shall implement the policy.
+"""
+
+# A covering circular numbered 1-3, then the guidance itself numbered from 1 again
+CIRCULAR_AND_GUIDANCE = """1. Purpose
+The purpose of this circular is to issue guidance.
+2. Application
+This applies to all banks.
+3. Key changes
+The note updates the earlier guidance.
+Guidance Note on Operational Risk Management
+Index
+Sr.
+No.
+1. Preliminary
+1.1 Operational risk is inherent in all banking activities.
+2. Definitions
+2.1 Terms used here have the usual meaning.
+3. Information and C ommunication Technology
+3.1 Banks shall manage ICT risk.
+"""
+
+# Contents page without page numbers, then the preamble, then the body
+CONTENTS_AND_PREAMBLE = """Index
+Chapter I - Preliminary
+Short Title and Commencement
+Applicability
+Chapter II - Card Payments Security
+Acronyms
+Master Direction on Digital Payment Security Controls
+In exercise of the powers conferred by the Act, the Reserve Bank issues these directions.
+CHAPTER - I
+PRELIMINARY
+1. Short Title and Commencement
+1.1 These Directions shall be called the Master Direction.
+2. Applicability
+2.1 These Directions shall apply to all commercial banks.
+CHAPTER - II
+CARD PAYMENTS SECURITY
+3. Card Controls
+3.1 Issuers shall offer card usage limits.
+"""
+
+
+def sections(units):
+    return [(unit["chapter"], unit["number"], unit["title"]) for unit in units if unit["kind"] == "section"]
+
+
+def test_numbered_sections_under_their_chapters():
+    units = plan_structure(DIRECTION)
+    assert sections(units) == [
+        ("Preliminary", "1", "Short Title and Commencement"),
+        ("Preliminary", "2", "Applicability"),
+        ("Governance", "3", "Role of the Board"),
+        ("Governance", "4", "Role of Senior Management"),
+    ]
+    assert not any(unit["ambiguous"] for unit in units if unit["kind"] == "section")
+    # The letterhead before the first chapter is left to the model
+    assert units[0]["kind"] == "preamble" and units[0]["ambiguous"]
+
+
+def test_plan_parts_keep_document_order():
+    parts = plan_document(DIRECTION).parts(max_tokens=3000)
+    assert "Reserve Bank of India" in parts[0]["text"]
+    rows = parts[1]["rows"]
+    assert [row["Section No."] for row in rows] == ["1", "2", "3", "4"]
+    assert rows[0]["Sub-Section"] == (
+        "- 1.1 These Directions shall be called the Master Direction. "
+        "- 1.2 They shall come into effect from the date of issue."
+    )
+
+
+def test_numbering_restart_opens_a_new_chapter():
+    units = plan_structure(CIRCULAR_AND_GUIDANCE)
+    assert sections(units) == [
+        ("Main Document", "1", "Purpose"),
+        ("Main Document", "2", "Application"),
+        ("Main Document", "3", "Key changes"),
+        ("Guidance Note on Operational Risk Management", "1", "Preliminary"),
+        ("Guidance Note on Operational Risk Management", "2", "Definitions"),
+        ("Guidance Note on Operational Risk Management", "3", "Information and Communication Technology"),
+    ]
+    key_changes = units[3]
+    assert key_changes["lines"] == ["The note updates the earlier guidance."]
+    assert units[4]["skipped"][0] == "Guidance Note on Operational Risk Management"
+
+
+def test_contents_page_chapters_do_not_set_the_chapter():
+    parts = plan_document(CONTENTS_AND_PREAMBLE).parts(max_tokens=3000)
+    preamble = parts[0]
+    assert "In exercise of the powers" in preamble["text"]
+    assert "Short Title" not in preamble["text"]
+    assert preamble["chapter"] == ""
+    assert [(row["Chapter"], row["Section No."]) for row in parts[1]["rows"]] == [
+        ("Preliminary", "1"),
+        ("Preliminary", "2"),
+        ("Card Payments Security", "3"),
+    ]
+
+
+def test_skipped_number_is_left_to_the_model():
+    text = DIRECTION.replace("4. Role of Senior Management", "6. Role of Senior Management")
+    units = plan_structure(text)
+    assert [unit["ambiguous"] for unit in units if unit["kind"] == "section"] == [
+        False, False, True, True,
+    ]
+
+
+def test_split_capitals_are_joined():
+    assert join_split_capitals("Mapping of I nterconnections") == "Mapping of Interconnections"
+    assert join_split_capitals("D isclosure and Reporting") == "Disclosure and Reporting"
+    assert join_split_capitals("A and B") == "A and B"
+    assert join_split_capitals("Part B requirements") == "Part B requirements"
+
+
+def test_normalize_title():
+    assert normalize_title("GOVERNANCE  FRAMEWORK ") == "Governance Framework"
+    assert normalize_title("Role of the Board") == "Role of the Board"
+
+
+def test_headings_and_sub_section_text():
+    assert is_heading("Role of Senior Management")
+    assert not is_heading("The Board shall approve the policy.")
+    assert sub_section_text(["1.1 First item", "continued here", "(a) second"]) == (
+        "- 1.1 First item continued here - (a) second"
+    )
+
+
+def test_untitled_paragraphs_take_the_heading_above_or_go_to_the_model():
+    text = """CHAPTER - I
+Controls
+Fraud Risk Management
+1. REs shall put in place a fraud risk management framework.
+2. REs shall monitor transactions for unusual patterns.
+CHAPTER - II
+Card Payments
+3. Card issuers shall provide card usage limits to customers.
+"""
+    units = [unit for unit in plan_structure(text) if unit["kind"] == "section"]
+    assert [(unit["title"], unit["ambiguous"]) for unit in units] == [
+        ("Fraud Risk Management", False),
+        ("Fraud Risk Management", False),
+        ("", True),
+    ]
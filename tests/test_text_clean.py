@@ -0,0 +1,98 @@
+import pytest
+
+from utils import text_clean
+from utils.text_clean import clean_pages, prepare_text, strip_devanagari
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    monkeypatch.setattr(text_clean, "count_tokens", lambda text: len(text.split()))
+
+
+def page(number, body):
+    return "\n".join(
+        [
+            f"RBI/2025-26/{number} Master Direction",
+            *body,
+            "",
+            "Confidential - internal use",
+            f"Page {number} of 4",
+        ]
+    )
+
+
+PAGES = [
+    page(
+        1,
+        ["Reserve Bank of India", "Tel No: 022-22601000", "1. Introduction", "Banks shall comply."],
+    ),
+    page(2, ["2. Scope", "These directions apply to banks."]),
+    "",
+    page(3, ["3. Reporting", "Banks shall report quarterly."]),
+]
+
+
+def test_repeated_headers_and_footers_are_removed():
+    result = clean_pages(PAGES)
+    assert "Master Direction" not in result.text
+    assert "Confidential" not in result.text
+    assert "Page" not in result.text
+    assert result.removed["header_footer"] == 6
+    assert result.removed["page_number"] == 3
+    assert "2. Scope\nThese directions apply to banks.\n" in result.text
+
+
+def test_first_page_letterhead_is_removed():
+    result = clean_pages(PAGES)
+    assert result.removed["letterhead"] == 2
+    assert result.text.startswith("1. Introduction\nBanks shall comply.\n")
+
+
+def test_lines_repeated_away_from_the_page_edges_are_kept():
+    pages = [
+        "\n".join(
+            [
+                f"Header {n}",
+                f"{n}. Section {letter}",
+                f"Body {letter} one",
+                "Banks shall comply.",
+                f"Body {letter} two",
+                f"Body {letter} three",
+                f"footer text {n}",
+            ]
+        )
+        for n, letter in enumerate("ABC", 1)
+    ]
+    result = clean_pages(pages)
+    assert result.removed["header_footer"] == 6
+    assert result.text.count("Banks shall comply.") == 3
+    assert "Header" not in result.text and "footer" not in result.text
+
+
+def test_single_page_keeps_its_edges():
+    result = clean_pages(["Guidance Note\n1. Scope\nBanks shall comply.\nAnnex"])
+    assert result.text == "Guidance Note\n1. Scope\nBanks shall comply.\nAnnex\n"
+    assert result.tokens_saved == 0
+
+
+def test_strip_devanagari():
+    assert strip_devanagari("भारतीय रिज़र्व बैंक Reserve Bank") == "Reserve Bank"
+    assert strip_devanagari("भारतीय �") is None
+    assert strip_devanagari("Reserve Bank") == "Reserve Bank"
+
+
+def test_hindi_only_lines_are_counted_and_dropped():
+    result = clean_pages(["भारतीय रिज़र्व बैंक\n1. Scope\nBanks शामिल shall comply."])
+    assert result.removed["devanagari"] == 1
+    assert result.text == "1. Scope\nBanks shall comply.\n"
+
+
+def test_token_counts(monkeypatch):
+    result = clean_pages(PAGES)
+    assert result.tokens_after < result.tokens_before
+    assert result.stats()["tokens_saved"] == result.tokens_before - result.tokens_after
+
+    monkeypatch.setattr(text_clean, "TEXT_CLEANING", False)
+    untouched = prepare_text(PAGES)
+    assert untouched.text == "".join(f"{p}\n" for p in PAGES if p)
+    assert untouched.tokens_saved == 0 and not untouched.removed
@@ -0,0 +1,182 @@
+import os
+import sys
+import asyncio
+import logging
+import pandas as pd
+from openai import AsyncOpenAI
+from utils.llm import achat_completion, OPENAI_BASE_URL
+from utils.helpers import (
+    row_request,
+    build_batch_messages,
+    is_batch_response,
+    parse_row_result,
+    parse_batch_result,
+    plan_batches,
+    failed_row_result,
+    plan_local_rows,
+    write_structured_csv,
+)
+from utils.document_rows import read_structured_csv
+from utils.perf import perf
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+ASYNC_ENRICH_CONCURRENCY = int(os.getenv("ASYNC_ENRICH_CONCURRENCY", "100"))
+ASYNC_ENRICH_TIMEOUT = float(os.getenv("ASYNC_ENRICH_TIMEOUT", "120"))
+
+
+def create_async_client():
+    # One client per event loop: its connection pool is bound to the loop
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL, max_retries=0
+    )
+
+
+async def process_row_async(client, semaphore, index, row, current_date, timeout):
+    async with semaphore:
+        logger.info(f"Processing row {index} (async)")
+        try:
+            messages, validate, known = row_request(row, current_date)
+            with perf.timed("row_request"):
+                result = await asyncio.wait_for(
+                    achat_completion(
+                        messages,
+                        client=client,
+                        model="gpt-4o-mini",
+                        validate=validate,
+                    ),
+                    timeout,
+                )
+            return parse_row_result(index, result, known)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out after {timeout}s processing row at index {index}")
+            return failed_row_result(index)
+        except Exception as e:
+            logger.error(f"Error processing row at index {index}: {str(e)}")
+            return failed_row_result(index)
+
+
+async def process_batch_async(client, semaphore, batch, current_date, timeout):
+    if len(batch) == 1:
+        index, row = batch[0]
+        return [
+            await process_row_async(client, semaphore, index, row, current_date, timeout)
+        ]
+    indices = [index for index, _ in batch]
+    results = {}
+    async with semaphore:
+        logger.info(f"Processing rows {indices} in one request (async)")
+        try:
+            with perf.timed("batch_request"):
+                text = await asyncio.wait_for(
+                    achat_completion(
+                        build_batch_messages(batch, current_date),
+                        client=client,
+                        model="gpt-4o-mini",
+                        validate=is_batch_response,
+                    ),
+                    timeout,
+                )
+            results = parse_batch_result(batch, text)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out after {timeout}s processing batch {indices}")
+        except Exception as e:
+            logger.error(f"Error processing batch {indices}: {str(e)}")
+    # Retry rows the batch did not answer one by one, outside the batch's slot
+    missing = [(index, row) for index, row in batch if index not in results]
+    for result in await asyncio.gather(
+        *(
+            process_row_async(client, semaphore, index, row, current_date, timeout)
+            for index, row in missing
+        )
+    ):
+        results[result["index"]] = result
+    return [results[index] for index in indices]
+
+
+async def enrich_rows_async(
+    indexed_rows,
+    current_date,
+    client=None,
+    semaphore=None,
+    timeout=None,
+    on_results=None,
+):
+    # Same result dicts as enrich_rows_threaded, in row order
+    own_client = client is None
+    client = client or create_async_client()
+    semaphore = semaphore or asyncio.Semaphore(ASYNC_ENRICH_CONCURRENCY)
+    timeout = timeout or ASYNC_ENRICH_TIMEOUT
+
+    async def run_batch(batch):
+        results = await process_batch_async(client, semaphore, batch, current_date, timeout)
+        if on_results:
+            on_results(results)
+        return results
+
+    try:
+        batches = await asyncio.gather(
+            *(run_batch(batch) for batch in plan_batches(indexed_rows))
+        )
+        return [result for batch in batches for result in batch]
+    finally:
+        if own_client:
+            await client.close()
+
+
+def run_enrichment(indexed_rows, current_date, **kwargs):
+    coroutine = enrich_rows_async(indexed_rows, current_date, **kwargs)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Worker threads have no loop of their own
+        return asyncio.run(coroutine)
+    # Already inside a loop (notebook, nested call); needs nest_asyncio, as app.py applies
+    return loop.run_until_complete(coroutine)
+
+
+async def enhance_csvs_async(csv_paths, concurrency=None):
+    # Batch runs: enrich many documents on one loop under a single semaphore
+    semaphore = asyncio.Semaphore(concurrency or ASYNC_ENRICH_CONCURRENCY)
+    current_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+    client = create_async_client()
+
+    async def enhance(csv_path):
+        try:
+            document = read_structured_csv(csv_path)
+            if not document.rows:
+                logger.error(f"CSV is empty: {csv_path}")
+                return False
+            results, indexed_rows, _ = plan_local_rows(
+                list(enumerate(document.rows)), current_date
+            )
+            results += await enrich_rows_async(
+                indexed_rows, current_date, client=client, semaphore=semaphore
+            )
+            for result in results:
+                document.rows[result["index"]].apply(result)
+            write_structured_csv(
+                csv_path,
+                document.document_id,
+                document.rows,
+                document.summary,
+                document.action_item,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error enhancing CSV {csv_path}: {str(e)}")
+            return False
+
+    try:
+        outcomes = await asyncio.gather(*(enhance(path) for path in csv_paths))
+    finally:
+        await client.close()
+    return dict(zip(csv_paths, outcomes))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    outcomes = asyncio.run(enhance_csvs_async(sys.argv[1:]))
+    for path, ok in outcomes.items():
+        print(f"{'OK    ' if ok else 'FAILED'} {path}")
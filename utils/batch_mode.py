@@ -0,0 +1,275 @@
+import os
+import json
+import argparse
+import logging
+import pandas as pd
+from collections import defaultdict
+from utils.helpers import (
+    build_structure_messages,
+    build_summary_messages,
+    parse_structure_response,
+    parse_row_result,
+    parse_summary_response,
+    structure_parts,
+    merge_chunk_rows,
+    plan_local_rows,
+    row_request,
+    write_structured_csv,
+)
+from utils.document_rows import read_structured_csv
+from utils.row_fields import LOCAL_ROW_FIELDS, local_row_fields
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-4o-mini"
+ENDPOINT = "/v1/chat/completions"
+# custom_id layout: <document_id>::<kind>::<part>; document ids never contain "::"
+SEPARATOR = "::"
+
+
+def make_custom_id(document_id, kind, part=0):
+    return SEPARATOR.join([document_id, kind, str(part)])
+
+
+def split_custom_id(custom_id):
+    document_id, kind, part = custom_id.rsplit(SEPARATOR, 2)
+    return document_id, kind, part
+
+
+def batch_line(custom_id, messages):
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": ENDPOINT,
+        "body": {"model": MODEL, "messages": messages},
+    }
+
+
+def document_requests(document_id, raw_data, csv_path, only_missing=False):
+    # Documents with a CSV get row requests; the others need structure first. Both
+    # go through the same local shortcuts as the interactive pipeline.
+    yield batch_line(
+        make_custom_id(document_id, "summary"), build_summary_messages(raw_data)
+    )
+    if os.path.exists(csv_path):
+        rows = read_structured_csv(csv_path).rows
+        current_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+        indexed_rows = [
+            (index, row)
+            for index, row in enumerate(rows)
+            if not only_missing or row["Summary"] in ("", "N/A")
+        ]
+        # Definition-only rows are never sent; ingest fills them in
+        _, indexed_rows, _ = plan_local_rows(indexed_rows, current_date)
+        for index, row in indexed_rows:
+            messages, _, _ = row_request(row, current_date)
+            yield batch_line(make_custom_id(document_id, "row", index), messages)
+    else:
+        # Only the parts the structure rules cannot parse go to the model; the part
+        # number is the position in the whole plan, so ingest can put them back
+        parts, _ = structure_parts(raw_data)
+        for position, part in enumerate(parts):
+            if "text" in part:
+                yield batch_line(
+                    make_custom_id(document_id, f"structure-of-{len(parts)}", position),
+                    build_structure_messages(part["text"], part["context"]),
+                )
+
+
+def prepare(text_dir, csv_dir, out_path, only_missing=False):
+    directory = os.path.dirname(out_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    counts = defaultdict(int)
+    with open(out_path, "w", encoding="utf-8") as out:
+        for filename in sorted(os.listdir(text_dir)):
+            if not filename.endswith(".txt"):
+                continue
+            document_id = os.path.splitext(filename)[0]
+            with open(os.path.join(text_dir, filename), encoding="utf-8") as f:
+                raw_data = f.read()
+            csv_path = os.path.join(csv_dir, f"{document_id}.csv")
+            for line in document_requests(document_id, raw_data, csv_path, only_missing):
+                out.write(json.dumps(line, ensure_ascii=False) + "\n")
+                counts[split_custom_id(line["custom_id"])[1].split("-")[0]] += 1
+    logger.info(f"Wrote batch requests to {out_path}: {dict(counts)}")
+    return dict(counts)
+
+
+def read_results(results_path):
+    # {custom_id: response text}; failed or empty responses are reported and skipped
+    results = {}
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                logger.warning(
+                    f"Batch request {record.get('custom_id')} failed: "
+                    f"{record.get('error') or response.get('status_code')}"
+                )
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                logger.warning(f"Malformed batch result for {record.get('custom_id')}")
+                continue
+            if content:
+                results[record["custom_id"]] = content
+    return results
+
+
+def structure_rows(document_id, kinds, text_dir):
+    # (rows, None) rebuilt from the local parts of the structure plan and the model's
+    # answers for the others, or (None, reason) when that is not yet possible
+    text_path = os.path.join(text_dir, f"{document_id}.txt")
+    if not os.path.exists(text_path):
+        return None, "extracted text not found"
+    with open(text_path, encoding="utf-8") as f:
+        parts, _ = structure_parts(f.read())
+    results = kinds.get(f"structure-of-{len(parts)}", {})
+    missing = [
+        position for position, part in enumerate(parts) if "text" in part and position not in results
+    ]
+    if missing:
+        return None, f"{len(missing)} structure parts not returned"
+    return merge_chunk_rows(
+        [
+            part["rows"] if "rows" in part else parse_structure_response(results[position])
+            for position, part in enumerate(parts)
+        ]
+    ), None
+
+
+def ingest(results_path, csv_dir, text_dir):
+    grouped = defaultdict(lambda: defaultdict(dict))
+    for custom_id, content in read_results(results_path).items():
+        document_id, kind, part = split_custom_id(custom_id)
+        grouped[document_id][kind][int(part)] = content
+
+    current_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+    report = {}
+    for document_id, kinds in grouped.items():
+        csv_path = os.path.join(csv_dir, f"{document_id}.csv")
+        summary = None
+        if 0 in kinds.get("summary", {}):
+            summary = parse_summary_response(kinds["summary"][0])
+        outcome = {"structure_rows": 0, "rows_updated": 0, "rows_local": 0, "summary": bool(summary)}
+
+        # Structure results create the CSV, but only when every model part came back
+        if not os.path.exists(csv_path) or any(kind.startswith("structure-of-") for kind in kinds):
+            rows, error = structure_rows(document_id, kinds, text_dir)
+            if rows is None:
+                logger.error(f"{document_id}: {error}, skipping structure")
+                outcome["error"] = error
+            else:
+                write_structured_csv(
+                    csv_path,
+                    document_id,
+                    rows,
+                    summary["summary"] if summary else "",
+                    summary["action_item"] if summary else "",
+                )
+                outcome["structure_rows"] = len(rows)
+
+        row_results = kinds.get("row", {})
+        if (summary or row_results) and os.path.exists(csv_path):
+            document = read_structured_csv(csv_path)
+            if document.rows:
+                for index, content in row_results.items():
+                    if not 0 <= index < len(document.rows):
+                        continue
+                    # Short prompts were answered with the Summary and Action Item only
+                    row = document.rows[index]
+                    known = local_row_fields(row, current_date) if LOCAL_ROW_FIELDS else None
+                    result = parse_row_result(index, content, known)
+                    if not result["success"]:
+                        continue
+                    row.apply(result)
+                    outcome["rows_updated"] += 1
+                pending = [
+                    (index, row)
+                    for index, row in enumerate(document.rows)
+                    if index not in row_results and row["Summary"] in ("", "N/A")
+                ]
+                local_results, _, _ = plan_local_rows(pending, current_date)
+                for result in local_results:
+                    document.rows[result["index"]].apply(result)
+                outcome["rows_local"] = len(local_results)
+                if summary:
+                    document.summary = summary["summary"]
+                    document.action_item = summary["action_item"]
+                write_structured_csv(
+                    csv_path,
+                    document.document_id or document_id,
+                    document.rows,
+                    document.summary,
+                    document.action_item,
+                )
+        report[document_id] = outcome
+    logger.info(f"Ingested batch results for {len(report)} documents")
+    return report
+
+
+def submit(requests_path):
+    from utils.llm import openai_client
+
+    with open(requests_path, "rb") as f:
+        input_file = openai_client.files.create(file=f, purpose="batch")
+    batch = openai_client.batches.create(
+        input_file_id=input_file.id, endpoint=ENDPOINT, completion_window="24h"
+    )
+    logger.info(f"Submitted batch {batch.id} from {requests_path}")
+    return batch.id
+
+
+def fetch(batch_id, out_path):
+    from utils.llm import openai_client
+
+    batch = openai_client.batches.retrieve(batch_id)
+    if batch.status != "completed":
+        logger.info(f"Batch {batch_id} is {batch.status}")
+        return batch.status
+    with open(out_path, "wb") as f:
+        f.write(openai_client.files.content(batch.output_file_id).read())
+    logger.info(f"Downloaded results of batch {batch_id} to {out_path}")
+    return batch.status
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Offline OpenAI batch processing")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prepare_parser = commands.add_parser("prepare", help="write a batch requests JSONL")
+    prepare_parser.add_argument("--text-dir", default="data/Extracted Text")
+    prepare_parser.add_argument("--csv-dir", default="data/Excel Sheets")
+    prepare_parser.add_argument("--out", default="data/Batch/requests.jsonl")
+    prepare_parser.add_argument(
+        "--only-missing", action="store_true", help="skip rows that already have a summary"
+    )
+
+    ingest_parser = commands.add_parser("ingest", help="apply a batch results JSONL")
+    ingest_parser.add_argument("results")
+    ingest_parser.add_argument("--csv-dir", default="data/Excel Sheets")
+    ingest_parser.add_argument("--text-dir", default="data/Extracted Text")
+
+    submit_parser = commands.add_parser("submit", help="upload requests to the Batch API")
+    submit_parser.add_argument("requests", nargs="?", default="data/Batch/requests.jsonl")
+
+    fetch_parser = commands.add_parser("fetch", help="download a finished batch")
+    fetch_parser.add_argument("batch_id")
+    fetch_parser.add_argument("--out", default="data/Batch/results.jsonl")
+
+    args = parser.parse_args()
+    if args.command == "prepare":
+        print(json.dumps(prepare(args.text_dir, args.csv_dir, args.out, args.only_missing)))
+    elif args.command == "ingest":
+        print(json.dumps(ingest(args.results, args.csv_dir, args.text_dir), indent=2))
+    elif args.command == "submit":
+        print(submit(args.requests))
+    else:
+        print(fetch(args.batch_id, args.out))
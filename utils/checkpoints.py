@@ -0,0 +1,113 @@
+import os
+import json
+import shutil
+import logging
+import threading
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in order; a checkpoint records the last one that finished
+STAGES = ("extract", "clean", "summary", "structure", "enrich", "finalize")
+STATE_FILE = "state.json"
+
+
+class StageFailed(Exception):
+    # Raised by a stage for an expected failure; the message becomes the notice's reason
+    pass
+
+
+def write_text(path, text):
+    # Write-then-rename so a crash mid-write never leaves a torn file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _write_json(path, data):
+    write_text(path, json.dumps(data, ensure_ascii=False))
+
+
+def append_jsonl(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_jsonl(path):
+    # A line cut short by a crash is the last one; it is skipped and redone
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping torn checkpoint line in {path}")
+    return records
+
+
+class CheckpointStore:
+    # One directory per in-flight notice under `root`: state.json holds the job's
+    # inputs and the last finished stage, stage outputs sit next to it
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, notice_id, name):
+        return os.path.join(self.root, notice_id, name)
+
+    def create(self, notice_id, **job):
+        os.makedirs(os.path.join(self.root, notice_id), exist_ok=True)
+        state = {"job": job, "stage": None, "data": {}}
+        with self._lock:
+            _write_json(self.path(notice_id, STATE_FILE), state)
+        return state
+
+    def load(self, notice_id):
+        try:
+            with open(self.path(notice_id, STATE_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def complete(self, notice_id, stage, **data):
+        with self._lock:
+            state = self.load(notice_id)
+            state["stage"] = stage
+            state["data"].update(data)
+            _write_json(self.path(notice_id, STATE_FILE), state)
+        logger.info(f"Checkpoint {notice_id}: {stage} done")
+        return state
+
+    def save_json(self, notice_id, name, data):
+        _write_json(self.path(notice_id, name), data)
+
+    def load_json(self, notice_id, name):
+        with open(self.path(notice_id, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def pending(self):
+        # Notice ids with a readable checkpoint, i.e. jobs that have not finished
+        return [
+            notice_id
+            for notice_id in sorted(os.listdir(self.root))
+            if os.path.exists(self.path(notice_id, STATE_FILE))
+        ]
+
+    def remove(self, notice_id):
+        shutil.rmtree(os.path.join(self.root, notice_id), ignore_errors=True)
+
+
+def next_stages(state):
+    # Stages still to run after the checkpointed one
+    if not state["stage"]:
+        return list(STAGES)
+    return list(STAGES[STAGES.index(state["stage"]) + 1 :])
@@ -0,0 +1,128 @@
+import re
+import logging
+from utils.tokens import count_tokens
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Boundary strength of a line: chapters/annexes > top-level sections > sub-sections
+CHAPTER_RE = re.compile(
+    r"^\s*(chapter\s*[-–—]?\s*[ivxlc\d]+\b|annex(ure)?\b|appendix\b)", re.IGNORECASE
+)
+SECTION_RE = re.compile(r"^\s*(\d{1,2})\.\s+[A-Za-z(]")
+PRINCIPLE_RE = re.compile(r"^\s*principle\s+\d+", re.IGNORECASE)
+SUBSECTION_RE = re.compile(r"^\s*\d{1,2}\.\d{1,2}(\.\d{1,2})*\.?\s")
+
+
+def boundary_level(line):
+    if CHAPTER_RE.match(line):
+        return 3
+    if SECTION_RE.match(line) or PRINCIPLE_RE.match(line):
+        return 2
+    if SUBSECTION_RE.match(line):
+        return 1
+    return 0
+
+
+def _blocks(text):
+    # Cut the text into blocks that each start at a numbered/headed line
+    blocks = []
+    current = []
+    level = 0
+    for line in text.splitlines():
+        line_level = boundary_level(line)
+        if line_level:
+            if current:
+                blocks.append((level, "\n".join(current)))
+                current = []
+            level = line_level
+        current.append(line)
+    if current:
+        blocks.append((level, "\n".join(current)))
+    return blocks
+
+
+def _split_oversized(block, max_tokens):
+    # Last resort for a single block above budget: split on line boundaries
+    pieces = []
+    current = []
+    current_tokens = 0
+    for line in block.splitlines():
+        line_tokens = count_tokens(line) + 1
+        if current and current_tokens + line_tokens > max_tokens:
+            pieces.append("\n".join(current))
+            current = []
+            current_tokens = 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_into_chunks(text, max_tokens=3000, min_fill=0.6):
+    # Returns [{"text", "tokens", "chapter", "section"}]; chapter/section are the
+    # headings in force where the chunk starts, so straddling content can be placed
+    chunks = []
+    current = []
+    current_tokens = 0
+    chapter = ""
+    section = ""
+    start_chapter = ""
+    start_section = ""
+
+    def close():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(
+                {
+                    "text": "\n".join(current),
+                    "tokens": current_tokens,
+                    "chapter": start_chapter,
+                    "section": start_section,
+                }
+            )
+        current = []
+        current_tokens = 0
+
+    blocks = _blocks(text)
+    for position, (level, block) in enumerate(blocks):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        heading = lines[0] if lines else ""
+        if level == 3 and len(heading) < 20 and len(lines) > 1:
+            # "CHAPTER - II" on its own line is followed by the chapter title
+            heading = f"{heading} {lines[1]}"
+        # Index entries (dot leaders, or a chapter directly followed by another
+        # chapter) must not become the context of the body text that follows
+        next_level = blocks[position + 1][0] if position + 1 < len(blocks) else 0
+        is_index = "...." in heading or (level == 3 and next_level == 3)
+
+        block_tokens = count_tokens(block)
+        pieces = [block]
+        if block_tokens > max_tokens:
+            pieces = _split_oversized(block, max_tokens)
+        for i, piece in enumerate(pieces):
+            piece_tokens = block_tokens if len(pieces) == 1 else count_tokens(piece)
+            piece_level = level if i == 0 else 0
+            over_budget = current_tokens + piece_tokens > max_tokens
+            # Prefer to close on a strong boundary once the chunk is reasonably full
+            early_close = piece_level >= 2 and current_tokens >= max_tokens * min_fill
+            if current and (over_budget or early_close):
+                close()
+            if not current:
+                start_chapter = chapter
+                start_section = section
+            current.append(piece)
+            current_tokens += piece_tokens
+            if i == 0 and not is_index:
+                if level == 3:
+                    chapter = heading
+                    section = ""
+                elif level == 2:
+                    section = heading
+    close()
+    logger.info(
+        f"Split document into {len(chunks)} chunks "
+        f"({sum(chunk['tokens'] for chunk in chunks)} tokens, budget {max_tokens})"
+    )
+    return chunks
@@ -0,0 +1,151 @@
+import os
+import sys
+import csv
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Row fields cached per document; work-tracking columns are reset for every copy
+ROW_FIELDS = [
+    "Chapter",
+    "Section No.",
+    "Section",
+    "Sub-Section",
+    "Summary",
+    "Action Item",
+    "Due date",
+    "Periodicity",
+]
+
+
+def save_and_hash(stream, path):
+    # Write the upload to disk and hash it in the same pass
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as out:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            sha256.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+    logger.info(f"Saved {size} bytes to {path} (sha256 {sha256.hexdigest()})")
+    return sha256.hexdigest()
+
+
+def hash_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class ContentRegistry:
+    # Content-addressed store: <root>/<sha256>/{manifest.json, text.txt, rows.json}
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _entry_dir(self, content_hash):
+        return os.path.join(self.root, content_hash)
+
+    def lookup(self, content_hash):
+        # The manifest is written last, so its presence marks a complete entry
+        manifest_path = os.path.join(self._entry_dir(content_hash), "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Unreadable registry manifest {manifest_path}: {str(e)}")
+            return None
+
+    def load_text(self, content_hash):
+        with open(
+            os.path.join(self._entry_dir(content_hash), "text.txt"), encoding="utf-8"
+        ) as f:
+            return f.read()
+
+    def load_rows(self, content_hash):
+        with open(
+            os.path.join(self._entry_dir(content_hash), "rows.json"), encoding="utf-8"
+        ) as f:
+            return json.load(f)
+
+    def store(self, content_hash, text, rows, summary, action_item, source):
+        entry_dir = self._entry_dir(content_hash)
+        with self._lock:
+            os.makedirs(entry_dir, exist_ok=True)
+            with open(os.path.join(entry_dir, "text.txt"), "w", encoding="utf-8") as f:
+                f.write(text)
+            with open(os.path.join(entry_dir, "rows.json"), "w", encoding="utf-8") as f:
+                json.dump(
+                    [{field: row.get(field, "") for field in ROW_FIELDS} for row in rows],
+                    f,
+                    ensure_ascii=False,
+                )
+            manifest = {
+                "content_hash": content_hash,
+                "source": source,
+                "rows": len(rows),
+                "summary": summary,
+                "action_item": action_item,
+                "stored_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            tmp_path = os.path.join(entry_dir, "manifest.json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, os.path.join(entry_dir, "manifest.json"))
+        logger.info(f"Registered {len(rows)} rows for content {content_hash}")
+        return manifest
+
+    def store_from_csv(self, content_hash, text, csv_path, source):
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        if not rows:
+            return None
+        return self.store(
+            content_hash,
+            text,
+            rows,
+            rows[0].get("Document Summary", ""),
+            rows[0].get("Document Action Item", ""),
+            source,
+        )
+
+    def backfill(self, upload_dir, text_dir, csv_dir):
+        # Register already processed uploads so their next re-upload is a hit
+        added = 0
+        for filename in sorted(os.listdir(upload_dir)):
+            base = os.path.splitext(filename)[0]
+            csv_path = os.path.join(csv_dir, f"{base}.csv")
+            txt_path = os.path.join(text_dir, f"{base}.txt")
+            if not (os.path.exists(csv_path) and os.path.exists(txt_path)):
+                continue
+            content_hash = hash_file(os.path.join(upload_dir, filename))
+            if self.lookup(content_hash):
+                continue
+            with open(txt_path, encoding="utf-8") as f:
+                text = f.read()
+            if self.store_from_csv(content_hash, text, csv_path, base):
+                added += 1
+        logger.info(f"Backfilled {added} registry entries from {upload_dir}")
+        return added
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    upload_dir = sys.argv[1] if len(sys.argv) > 1 else "Uploads"
+    registry = ContentRegistry("data/Content Registry")
+    registry.backfill(upload_dir, "data/Extracted Text", "data/Excel Sheets")
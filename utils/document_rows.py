@@ -0,0 +1,89 @@
+import csv
+import logging
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Per-row CSV columns and the attribute each one is kept in, in file order
+COLUMN_SLOTS = {
+    "Chapter": "chapter",
+    "Section No.": "section_no",
+    "Section": "section",
+    "Sub-Section": "sub_section",
+    "Summary": "summary",
+    "Action Item": "action_item",
+    "Due date": "due_date",
+    "Periodicity": "periodicity",
+    "Marked as Completed": "marked_as_completed",
+    "Work Status": "work_status",
+    "Role Assigned To": "role_assigned_to",
+}
+ENRICHED_COLUMNS = ("Summary", "Action Item", "Due date", "Periodicity")
+DEFAULTS = {"marked_as_completed": "No", "work_status": "Not Started"}
+
+
+class DocumentRow:
+    # One structured row as it moves through the pipeline. Indexing by CSV column
+    # name keeps it interchangeable with the dict rows the prompt builders expect.
+    __slots__ = tuple(COLUMN_SLOTS.values())
+
+    def __init__(self, **fields):
+        for slot in self.__slots__:
+            setattr(self, slot, fields.get(slot, DEFAULTS.get(slot, "")))
+
+    @classmethod
+    def from_dict(cls, record):
+        row = cls()
+        for column, slot in COLUMN_SLOTS.items():
+            value = record.get(column)
+            if value not in (None, ""):
+                setattr(row, slot, str(value))
+        return row
+
+    def __getitem__(self, column):
+        try:
+            return getattr(self, COLUMN_SLOTS[column])
+        except KeyError:
+            raise KeyError(column) from None
+
+    def __setitem__(self, column, value):
+        setattr(self, COLUMN_SLOTS[column], value)
+
+    def get(self, column, default=None):
+        slot = COLUMN_SLOTS.get(column)
+        return getattr(self, slot) if slot else default
+
+    def keys(self):
+        return COLUMN_SLOTS.keys()
+
+    def apply(self, result):
+        # Copy the enrichment fields of a row result onto this row
+        for column in ENRICHED_COLUMNS:
+            self[column] = result[column]
+
+    def __repr__(self):
+        return f"DocumentRow({self.section_no!r}, {self.section!r})"
+
+
+class StructuredDocument:
+    __slots__ = ("document_id", "rows", "summary", "action_item")
+
+    def __init__(self, document_id, rows, summary="", action_item=""):
+        self.document_id = document_id
+        self.rows = rows
+        self.summary = summary
+        self.action_item = action_item
+
+
+def read_structured_csv(csv_path):
+    # One plain csv pass over a structured CSV; document-level fields come from row 0
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        records = list(csv.DictReader(f))
+    first = records[0] if records else {}
+    logger.info(f"Read {len(records)} rows from {csv_path}")
+    return StructuredDocument(
+        first.get("Document ID") or "",
+        [DocumentRow.from_dict(record) for record in records],
+        first.get("Document Summary") or "",
+        first.get("Document Action Item") or "",
+    )
@@ -0,0 +1,177 @@
+import math
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 5, "low": 9}
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def parse_priority(value):
+    if value is None or value == "":
+        return PRIORITIES["normal"]
+    if str(value).lower() in PRIORITIES:
+        return PRIORITIES[str(value).lower()]
+    return max(0, min(9, int(value)))
+
+
+class Job:
+    def __init__(self, job_id, name, priority, fn, args, kwargs):
+        self.id = job_id
+        self.name = name
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.status = "Queued"
+        self.error = None
+        self.enqueued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        def fmt(ts):
+            return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else None
+
+        waited = (self.started_at or time.time()) - self.enqueued_at
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "priority": self.priority,
+            "status": self.status,
+            "error": self.error,
+            "enqueued_at": fmt(self.enqueued_at),
+            "started_at": fmt(self.started_at),
+            "finished_at": fmt(self.finished_at),
+            "wait_seconds": round(waited, 3),
+            "run_seconds": round(self.finished_at - self.started_at, 3)
+            if self.finished_at and self.started_at
+            else None,
+        }
+
+
+class JobQueue:
+    # Bounded priority queue drained by a fixed set of worker threads
+    def __init__(self, workers=2, max_size=20, history=1000):
+        self.workers = workers
+        self.max_size = max_size
+        self._queue = queue.PriorityQueue(maxsize=max_size)
+        self._sequence = itertools.count()
+        self._jobs = OrderedDict()
+        self._history = history
+        self._lock = threading.Lock()
+        self._threads = []
+        self._running = 0
+        self._wait_times = deque(maxlen=200)
+        self._run_times = deque(maxlen=200)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f"job-worker-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Started {self.workers} job workers (queue size {self.max_size})")
+
+    def submit(self, fn, *args, job_id=None, name="", priority=None, block=False, **kwargs):
+        # block=True waits for a free slot instead of raising QueueFull
+        self.start()
+        job = Job(job_id, name, parse_priority(priority), fn, args, kwargs)
+        try:
+            self._queue.put((job.priority, next(self._sequence), job), block=block)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull(self.retry_after())
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status in ("Queued", "Running"):
+                    break
+                self._jobs.pop(oldest_id)
+        logger.info(f"Queued job {job.id} ({name}) with priority {job.priority}")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            job.started_at = time.time()
+            job.status = "Running"
+            with self._lock:
+                self._running += 1
+                self._wait_times.append(job.started_at - job.enqueued_at)
+            try:
+                job.fn(*job.args, **job.kwargs)
+                job.status = "Finished"
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+                job.status = "Error"
+                job.error = str(e)
+                with self._lock:
+                    self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                with self._lock:
+                    self._running -= 1
+                    self._run_times.append(job.finished_at - job.started_at)
+                self._queue.task_done()
+
+    def retry_after(self):
+        # Rough time until a slot frees up: queued work spread over the workers
+        with self._lock:
+            avg_run = (
+                sum(self._run_times) / len(self._run_times) if self._run_times else 30
+            )
+        depth = self._queue.qsize()
+        return max(1, math.ceil(avg_run * max(1, depth) / max(1, self.workers)))
+
+    def metrics(self):
+        with self._lock:
+            waits = sorted(self._wait_times)
+            runs = list(self._run_times)
+            return {
+                "workers": self.workers,
+                "max_queue_size": self.max_size,
+                "queue_depth": self._queue.qsize(),
+                "running": self._running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0,
+                "p95_wait_seconds": round(waits[math.ceil(0.95 * len(waits)) - 1], 3)
+                if waits
+                else 0,
+                "max_wait_seconds": round(waits[-1], 3) if waits else 0,
+                "avg_run_seconds": round(sum(runs) / len(runs), 3) if runs else 0,
+            }
+
+    def jobs(self, limit=100):
+        with self._lock:
+            recent = list(self._jobs.values())[-limit:]
+        return [job.to_dict() for job in reversed(recent)]
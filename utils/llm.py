@@ -0,0 +1,284 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import openai
+from openai import OpenAI
+import dotenv
+from utils.llm_cache import LLMCache
+from utils.rate_limit import RateLimiter
+from utils.resilience import (
+    CircuitBreaker,
+    RETRYABLE_ERRORS,
+    OUTAGE_ERRORS,
+    backoff_delay,
+)
+from utils.tokens import count_tokens
+from utils.perf import perf, in_scope
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Load environment variables and OpenAI client
+if not os.getenv("OPENAI_API_KEY"):
+    dotenv.load_dotenv()
+# OPENAI_BASE_URL points every client at another OpenAI-compatible server, e.g. the benchmark stub
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# Retries are ours (backoff, breaker, hedging below), so the SDK's own are turned off
+openai_client = OpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL, max_retries=0
+)
+
+# Persistent response cache shared by every helper that talks to the model
+llm_cache = LLMCache(
+    path=os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite3"),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "0")),
+    enabled=os.getenv("LLM_CACHE_BYPASS", "").lower() not in ("1", "true", "yes"),
+)
+
+# Shared by every thread and document so the account limits are respected globally
+rate_limiter = RateLimiter(
+    rpm=float(os.getenv("OPENAI_RPM", "500")),
+    tpm=float(os.getenv("OPENAI_TPM", "200000")),
+)
+# Pauses all traffic while the API keeps failing with 5xx or connection errors
+circuit_breaker = CircuitBreaker(
+    threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+    cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "30")),
+)
+# Retries per call for transient errors and malformed answers, with jittered backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "30"))
+LLM_INVALID_RETRIES = int(os.getenv("LLM_INVALID_RETRIES", "1"))
+# Seconds before a duplicate request is sent for a slow call (0 disables hedging)
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+_hedge_pool = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_HEDGE_WORKERS", "16")))
+# Assumed completion size when the request does not set max_tokens
+COMPLETION_TOKENS_ESTIMATE = int(os.getenv("COMPLETION_TOKENS_ESTIMATE", "512"))
+
+# Process-wide call and token counters (cache hits cost no tokens)
+usage_stats = {
+    "calls": 0,
+    "cache_hits": 0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "retries": 0,
+    "hedged": 0,
+}
+_usage_lock = threading.Lock()
+
+
+def usage_snapshot():
+    with _usage_lock:
+        return dict(usage_stats)
+
+
+def _record_usage(key, amount=1):
+    with _usage_lock:
+        usage_stats[key] += amount
+
+
+def estimate_tokens(messages, params):
+    prompt_tokens = sum(count_tokens(message["content"]) + 4 for message in messages)
+    return prompt_tokens + (params.get("max_tokens") or COMPLETION_TOKENS_ESTIMATE)
+
+
+def _complete(raw, estimated, started):
+    rate_limiter.on_response(raw.headers)
+    response = raw.parse()
+    _record_usage("calls")
+    usage = response.usage
+    if usage:
+        rate_limiter.reconcile(estimated, usage.total_tokens)
+        _record_usage("prompt_tokens", usage.prompt_tokens)
+        _record_usage("completion_tokens", usage.completion_tokens)
+    # Charged to the document and stage making the call
+    perf.record_call(
+        time.monotonic() - started,
+        usage.prompt_tokens if usage else 0,
+        usage.completion_tokens if usage else 0,
+    )
+    return response.choices[0].message.content
+
+
+def _cached(key, model, use_cache):
+    if not use_cache:
+        return None
+    cached = llm_cache.get(key)
+    if cached is not None:
+        _record_usage("cache_hits")
+        perf.count("cache_hits")
+        logger.info(f"LLM cache hit for {model} request {key[:12]}")
+    return cached
+
+
+def _on_error(e):
+    if isinstance(e, openai.RateLimitError):
+        rate_limiter.on_rate_limited(e.response.headers if e.response is not None else None)
+    if isinstance(e, OUTAGE_ERRORS):
+        circuit_breaker.record_failure()
+    else:
+        # Any other answer, 429s included, shows the API is reachable
+        circuit_breaker.record_success()
+
+
+def _admit(messages, params):
+    # Waits out an open breaker and the rate limiter; returns the token estimate
+    circuit_breaker.wait()
+    estimated = estimate_tokens(messages, params)
+    rate_limiter.acquire(estimated)
+    return estimated
+
+
+async def _aadmit(messages, params):
+    await circuit_breaker.wait_async()
+    estimated = estimate_tokens(messages, params)
+    await rate_limiter.acquire_async(estimated)
+    return estimated
+
+
+def _send(messages, model, params, estimated):
+    # One HTTP attempt; the outcome feeds the breaker and the rate limiter
+    started = time.monotonic()
+    try:
+        raw = openai_client.chat.completions.with_raw_response.create(
+            model=model, messages=messages, **params
+        )
+    except Exception as e:
+        _on_error(e)
+        raise
+    circuit_breaker.record_success()
+    return _complete(raw, estimated, started)
+
+
+async def _asend(messages, client, model, params, estimated):
+    started = time.monotonic()
+    try:
+        raw = await client.chat.completions.with_raw_response.create(
+            model=model, messages=messages, **params
+        )
+    except Exception as e:
+        _on_error(e)
+        raise
+    circuit_breaker.record_success()
+    return _complete(raw, estimated, started)
+
+
+def _request(messages, model, params):
+    # Admission happens before the hedge timer starts, so waiting on the limiter or
+    # an open breaker never triggers duplicates; a duplicate is admitted on its own
+    estimated = _admit(messages, params)
+    call = lambda: _send(messages, model, params, estimated)
+    if not LLM_HEDGE_AFTER:
+        return call()
+    first = _hedge_pool.submit(in_scope(call))
+    done, _ = wait([first], timeout=LLM_HEDGE_AFTER)
+    if done:
+        return first.result()
+    # The slower answer is discarded (a running thread cannot be cancelled)
+    _record_usage("hedged")
+    second = _hedge_pool.submit(
+        in_scope(lambda: _send(messages, model, params, _admit(messages, params)))
+    )
+    done, pending = wait([first, second], return_when=FIRST_COMPLETED)
+    winner = next(iter(done))
+    if winner.exception() is not None and pending:
+        return next(iter(pending)).result()
+    return winner.result()
+
+
+async def _arequest(messages, client, model, params):
+    estimated = await _aadmit(messages, params)
+    if not LLM_HEDGE_AFTER:
+        return await _asend(messages, client, model, params, estimated)
+    first = asyncio.ensure_future(_asend(messages, client, model, params, estimated))
+    done, _ = await asyncio.wait([first], timeout=LLM_HEDGE_AFTER)
+    if done:
+        return first.result()
+    _record_usage("hedged")
+
+    async def duplicate():
+        return await _asend(messages, client, model, params, await _aadmit(messages, params))
+
+    second = asyncio.ensure_future(duplicate())
+    done, pending = await asyncio.wait([first, second], return_when=asyncio.FIRST_COMPLETED)
+    winner = next(iter(done))
+    if winner.exception() is not None and pending:
+        return await next(iter(pending))
+    for task in pending:
+        task.cancel()
+    return winner.result()
+
+
+def _should_retry(attempt, error=None, content=None, validate=None):
+    # Retry transient errors and, when a validator is given, malformed answers
+    if error is not None:
+        return attempt < LLM_MAX_RETRIES and isinstance(error, RETRYABLE_ERRORS)
+    return attempt < min(LLM_MAX_RETRIES, LLM_INVALID_RETRIES) and (
+        validate is not None and not validate(content)
+    )
+
+
+def chat_completion(messages, model="gpt-4o-mini", use_cache=True, validate=None, **params):
+    # Return the text of a chat completion, serving repeats from the cache.
+    # Transient errors and answers rejected by `validate` are retried with backoff;
+    # a rejected final answer is returned but never cached.
+    key = llm_cache.make_key(model, messages, params)
+    cached = _cached(key, model, use_cache)
+    if cached is not None:
+        return cached
+
+    attempt = 0
+    while True:
+        try:
+            content = _request(messages, model, params)
+        except Exception as e:
+            if not _should_retry(attempt, error=e):
+                raise
+            logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying: {str(e)}")
+            time.sleep(backoff_delay(attempt, LLM_BACKOFF_BASE, LLM_BACKOFF_CAP))
+        else:
+            if not _should_retry(attempt, content=content, validate=validate):
+                break
+            logger.warning(f"Malformed {model} response, retrying")
+        _record_usage("retries")
+        perf.count("retries")
+        attempt += 1
+    if use_cache and (validate is None or validate(content)):
+        llm_cache.set(key, model, content)
+    return content
+
+
+async def achat_completion(
+    messages, client, model="gpt-4o-mini", use_cache=True, validate=None, **params
+):
+    # AsyncOpenAI counterpart of chat_completion sharing the same cache, limiter and breaker.
+    # The cache is SQLite, so its reads and writes run off the event loop.
+    key = llm_cache.make_key(model, messages, params)
+    cached = await asyncio.to_thread(_cached, key, model, use_cache) if use_cache else None
+    if cached is not None:
+        return cached
+
+    attempt = 0
+    while True:
+        try:
+            content = await _arequest(messages, client, model, params)
+        except Exception as e:
+            if not _should_retry(attempt, error=e):
+                raise
+            logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying: {str(e)}")
+            await asyncio.sleep(backoff_delay(attempt, LLM_BACKOFF_BASE, LLM_BACKOFF_CAP))
+        else:
+            if not _should_retry(attempt, content=content, validate=validate):
+                break
+            logger.warning(f"Malformed {model} response, retrying")
+        _record_usage("retries")
+        perf.count("retries")
+        attempt += 1
+    if use_cache and (validate is None or validate(content)):
+        await asyncio.to_thread(llm_cache.set, key, model, content)
+    return content
@@ -0,0 +1,198 @@
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Records are queued by the calling thread and written by one listener thread, so
+# workers never wait on file or console I/O. A full queue drops records, it never blocks.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+# "json" (one object per line) or "text" (the old "time - LEVEL - message" lines)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Longer messages are cut to this many characters before they are queued
+LOG_MAX_MESSAGE = int(os.getenv("LOG_MAX_MESSAGE", "2000"))
+# Share of INFO/DEBUG records kept per logger, e.g. "utils.helpers=0.1,utils.llm=0.5";
+# warnings and errors are always kept
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "")
+# Opt-in sink for full payloads (model responses, row dumps); unset drops them unformatted
+LOG_PAYLOAD_FILE = os.getenv("LOG_PAYLOAD_FILE", "")
+
+# Full payloads go to this logger, never to the main log
+payload_logger = logging.getLogger("payloads")
+
+_stats = {"dropped": 0, "sampled_out": 0, "truncated": 0}
+_stats_lock = threading.Lock()
+_listener = None
+_log_queue = None
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def truncate(text, limit):
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} chars truncated]"
+
+
+def parse_sample_rates(setting):
+    rates = {}
+    for item in setting.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps a share of low-level records from the configured loggers and their children
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def _rate(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        _count("sampled_out")
+        return False
+
+
+class BoundedQueueHandler(QueueHandler):
+    # Formats and truncates in the caller (records must not hold live objects), then
+    # hands off without blocking; a record that does not fit is counted and dropped
+    def __init__(self, log_queue, max_message):
+        super().__init__(log_queue)
+        self.max_message = max_message
+
+    def prepare(self, record):
+        # Only the message is cut; an exception's traceback is kept whole
+        message = record.getMessage()
+        short = truncate(message, self.max_message)
+        if short is not message:
+            _count("truncated")
+            record = copy.copy(record)
+            record.msg, record.args = short, None
+        return super().prepare(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _count("dropped")
+
+
+class JsonFormatter(logging.Formatter):
+    # Extra fields passed as logger.info(..., extra={"fields": {...}}) are merged in
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _formatter():
+    if LOG_FORMAT == "text":
+        return logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    return JsonFormatter()
+
+
+def _file_handler(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = RotatingFileHandler(
+        path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+    )
+    handler.setFormatter(_formatter())
+    return handler
+
+
+def setup_logging():
+    # Idempotent: the app and its reloader child may both import this
+    global _listener, _log_queue
+    if _listener is not None:
+        return _listener
+    _log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(_formatter())
+    handlers = [console]
+    if LOG_FILE:
+        handlers.append(_file_handler(LOG_FILE))
+
+    queue_handler = BoundedQueueHandler(_log_queue, LOG_MAX_MESSAGE)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(LOG_SAMPLE)))
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    # Payloads bypass truncation and sampling, and only exist when a sink is configured
+    payload_logger.propagate = False
+    payload_logger.handlers = []
+    if LOG_PAYLOAD_FILE:
+        # Both kinds of record share the queue; each sink keeps only its own
+        for handler in handlers:
+            handler.addFilter(lambda record: record.name != payload_logger.name)
+        payload_handler = _file_handler(LOG_PAYLOAD_FILE)
+        payload_handler.addFilter(lambda record: record.name == payload_logger.name)
+        handlers.append(payload_handler)
+        payload_logger.setLevel(logging.DEBUG)
+        payload_logger.addHandler(BoundedQueueHandler(_log_queue, 0))
+    else:
+        payload_logger.setLevel(logging.CRITICAL + 1)
+        payload_logger.addHandler(logging.NullHandler())
+
+    _listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def log_payload(kind, payload, **fields):
+    # Full text of a bulk payload for the debug sink; a no-op unless LOG_PAYLOAD_FILE is
+    # set. A callable payload is only evaluated when the sink is on.
+    if payload_logger.isEnabledFor(logging.DEBUG):
+        if callable(payload):
+            payload = payload()
+        payload_logger.debug(
+            "%s: %s", kind, payload, extra={"fields": dict(fields, kind=kind)}
+        )
+
+
+def log_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update(
+        queue_depth=_log_queue.qsize() if _log_queue else 0,
+        queue_size=LOG_QUEUE_SIZE,
+        format=LOG_FORMAT,
+        payload_sink=LOG_PAYLOAD_FILE or None,
+    )
+    return stats
@@ -0,0 +1,171 @@
+import os
+import sys
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+STATUSES = ("Processing", "Completed", "Failed")
+
+
+class UploadMetrics:
+    # Dashboard counters maintained from upload and status events, so /api/metrics
+    # reads a handful of precomputed rows instead of scanning the CSV directory
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS daily_uploads (
+                    day TEXT PRIMARY KEY,
+                    uploads INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS status_counts (
+                    status TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS documents (
+                    content_hash TEXT PRIMARY KEY,
+                    uploads INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _add(conn, table, key_column, key, column, amount):
+        conn.execute(
+            f"INSERT INTO {table} ({key_column}, {column}) VALUES (?, ?) "
+            f"ON CONFLICT({key_column}) DO UPDATE SET {column} = {column} + excluded.{column}",
+            (key, amount),
+        )
+
+    def _count_document(self, conn, content_hash, amount):
+        # unique_documents changes only when a hash gains its first or loses its last upload
+        self._add(conn, "documents", "content_hash", content_hash, "uploads", amount)
+        uploads = conn.execute(
+            "SELECT uploads FROM documents WHERE content_hash = ?", (content_hash,)
+        ).fetchone()[0]
+        if amount > 0 and uploads == amount:
+            self._add(conn, "counters", "name", "unique_documents", "value", 1)
+        elif amount < 0 and uploads <= 0:
+            conn.execute("DELETE FROM documents WHERE content_hash = ?", (content_hash,))
+            self._add(conn, "counters", "name", "unique_documents", "value", -1)
+
+    def record_upload(self, day, status, content_hash):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._add(conn, "daily_uploads", "day", day, "uploads", 1)
+                self._add(conn, "status_counts", "status", status, "count", 1)
+                self._add(conn, "counters", "name", "total_uploads", "value", 1)
+                self._count_document(conn, content_hash, 1)
+
+    def record_removed(self, day, status, content_hash):
+        # Undo of record_upload, for uploads rejected before they were queued
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._add(conn, "daily_uploads", "day", day, "uploads", -1)
+                self._add(conn, "status_counts", "status", status, "count", -1)
+                self._add(conn, "counters", "name", "total_uploads", "value", -1)
+                self._count_document(conn, content_hash, -1)
+
+    def record_status(self, old_status, new_status):
+        if old_status == new_status:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if old_status:
+                    self._add(conn, "status_counts", "status", old_status, "count", -1)
+                self._add(conn, "status_counts", "status", new_status, "count", 1)
+
+    def rebuild(self, notices):
+        # Recompute every counter from notice records (upload_date, status, content_hash)
+        daily, statuses, documents = {}, {}, {}
+        for notice in notices:
+            day = notice["upload_date"][:10]
+            daily[day] = daily.get(day, 0) + 1
+            statuses[notice["status"]] = statuses.get(notice["status"], 0) + 1
+            key = notice.get("content_hash") or notice["document_id"]
+            documents[key] = documents.get(key, 0) + 1
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for table in ("daily_uploads", "status_counts", "documents", "counters"):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.executemany("INSERT INTO daily_uploads VALUES (?, ?)", daily.items())
+                conn.executemany("INSERT INTO status_counts VALUES (?, ?)", statuses.items())
+                conn.executemany("INSERT INTO documents VALUES (?, ?)", documents.items())
+                conn.executemany(
+                    "INSERT INTO counters VALUES (?, ?)",
+                    [
+                        ("total_uploads", sum(daily.values())),
+                        ("unique_documents", len(documents)),
+                    ],
+                )
+        logger.info(f"Rebuilt upload metrics from {sum(daily.values())} notices")
+        return sum(daily.values())
+
+    def is_empty(self):
+        with self._lock:
+            return (
+                self._connect().execute("SELECT COUNT(*) FROM counters").fetchone()[0] == 0
+            )
+
+    def snapshot(self, today=None):
+        today = today or datetime.now().date()
+        week_ago = (today - timedelta(days=7)).strftime("%Y-%m-%d")
+        dates = [(today - timedelta(days=x)).strftime("%Y-%m-%d") for x in range(6, -1, -1)]
+        with self._lock:
+            conn = self._connect()
+            recent = dict(
+                conn.execute(
+                    "SELECT day, uploads FROM daily_uploads WHERE day >= ?", (week_ago,)
+                ).fetchall()
+            )
+            statuses = dict(conn.execute("SELECT status, count FROM status_counts").fetchall())
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        daily_uploads = {date: recent.get(date, 0) for date in dates}
+        return {
+            "daily_avg_uploads": round(sum(daily_uploads.values()) / 7, 2),
+            "weekly_uploads": sum(recent.values()),
+            "total_uploads": counters.get("total_uploads", 0),
+            "unique_documents": counters.get("unique_documents", 0),
+            "daily_uploads": daily_uploads,
+            "status_distribution": {status: statuses.get(status, 0) for status in STATUSES},
+        }
+
+
+if __name__ == "__main__":
+    # python -m utils.metrics rebuild: adopt existing CSVs, then recount from the registry
+    from utils.notice_registry import NoticeRegistry
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if sys.argv[1:2] != ["rebuild"]:
+        sys.exit("usage: python -m utils.metrics rebuild [csv_dir] [upload_dir]")
+    csv_dir = sys.argv[2] if len(sys.argv) > 2 else "data/Excel Sheets"
+    upload_dir = sys.argv[3] if len(sys.argv) > 3 else "Uploads"
+    registry = NoticeRegistry(os.getenv("NOTICE_REGISTRY_PATH", "data/notices.sqlite3"))
+    registry.sync_directory(csv_dir, upload_dir)
+    metrics = UploadMetrics(os.getenv("METRICS_PATH", "data/metrics.sqlite3"))
+    metrics.rebuild(registry.list(with_csv=False))
+    print(metrics.snapshot())
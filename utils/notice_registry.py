@@ -0,0 +1,273 @@
+import os
+import re
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from utils.dedup import hash_file
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+FIELDS = (
+    "notice_id",
+    "document_id",
+    "filename",
+    "status",
+    "approval_status",
+    "upload_date",
+    "last_updated",
+    "size",
+    "has_csv",
+    "summary",
+    "action_item",
+    "summary_mtime",
+    "content_hash",
+    "update_of",
+    "tokens_saved",
+    "structure_local_share",
+    "stage",
+    "perf",
+    "llm_calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "cost_usd",
+    "processing_seconds",
+)
+# Columns added after the first release, applied to existing databases on open
+MIGRATIONS = {
+    "summary_mtime": "REAL NOT NULL DEFAULT 0",
+    "content_hash": "TEXT NOT NULL DEFAULT ''",
+    "update_of": "TEXT NOT NULL DEFAULT ''",
+    "tokens_saved": "INTEGER NOT NULL DEFAULT 0",
+    "structure_local_share": "REAL NOT NULL DEFAULT 0",
+    "stage": "TEXT NOT NULL DEFAULT ''",
+    "perf": "TEXT NOT NULL DEFAULT ''",
+    "llm_calls": "INTEGER NOT NULL DEFAULT 0",
+    "prompt_tokens": "INTEGER NOT NULL DEFAULT 0",
+    "completion_tokens": "INTEGER NOT NULL DEFAULT 0",
+    "cost_usd": "REAL NOT NULL DEFAULT 0",
+    "processing_seconds": "REAL NOT NULL DEFAULT 0",
+}
+# Columns the costliest-notices query may sort by
+COST_COLUMNS = ("cost_usd", "processing_seconds", "prompt_tokens", "completion_tokens", "llm_calls")
+# Upload filenames embed their timestamp: <base>_<YYYYmmddHHMMSS>_<uuid>
+TIMESTAMP_RE = re.compile(r"_(\d{14})_")
+APPROVAL_STATUSES = ("Pending Approval", "Approved", "Rejected")
+
+
+def now_string():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class NoticeRegistry:
+    # Durable notice/file metadata: processing status, approval status and document
+    # summary per notice, indexed by notice_id, filename and both statuses
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS notices (
+                    notice_id TEXT PRIMARY KEY,
+                    document_id TEXT NOT NULL,
+                    filename TEXT NOT NULL UNIQUE,
+                    status TEXT NOT NULL,
+                    approval_status TEXT NOT NULL,
+                    upload_date TEXT NOT NULL,
+                    last_updated TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    has_csv INTEGER NOT NULL DEFAULT 0,
+                    summary TEXT NOT NULL DEFAULT '',
+                    action_item TEXT NOT NULL DEFAULT '',
+                    summary_mtime REAL NOT NULL DEFAULT 0,
+                    content_hash TEXT NOT NULL DEFAULT '',
+                    update_of TEXT NOT NULL DEFAULT '',
+                    tokens_saved INTEGER NOT NULL DEFAULT 0,
+                    structure_local_share REAL NOT NULL DEFAULT 0,
+                    stage TEXT NOT NULL DEFAULT '',
+                    perf TEXT NOT NULL DEFAULT '',
+                    llm_calls INTEGER NOT NULL DEFAULT 0,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    completion_tokens INTEGER NOT NULL DEFAULT 0,
+                    cost_usd REAL NOT NULL DEFAULT 0,
+                    processing_seconds REAL NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_notices_status ON notices (status);
+                CREATE INDEX IF NOT EXISTS idx_notices_approval ON notices (approval_status);
+                CREATE INDEX IF NOT EXISTS idx_notices_listing ON notices (has_csv, upload_date);
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(notices)")}
+            for column, definition in MIGRATIONS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE notices ADD COLUMN {column} {definition}")
+            self._conn.commit()
+        return self._conn
+
+    def register(self, notice_id, filename, status="Processing", **fields):
+        timestamp = now_string()
+        record = {
+            "notice_id": notice_id,
+            "document_id": os.path.splitext(filename)[0],
+            "filename": filename,
+            "status": status,
+            "approval_status": "Pending Approval",
+            "upload_date": timestamp,
+            "last_updated": timestamp,
+            "size": 0,
+            "has_csv": 0,
+            "summary": "",
+            "action_item": "",
+            "summary_mtime": 0,
+            "content_hash": "",
+            "update_of": "",
+            "tokens_saved": 0,
+            "structure_local_share": 0,
+            "stage": "",
+            "perf": "",
+            "llm_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0,
+            "processing_seconds": 0,
+        }
+        record.update(fields)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO notices ({', '.join(FIELDS)}) "
+                    f"VALUES ({', '.join('?' for _ in FIELDS)})",
+                    [record[field] for field in FIELDS],
+                )
+        return record
+
+    def update(self, notice_id, **fields):
+        # The one write path for existing notices; returns False for unknown ids
+        unknown = set(fields) - set(FIELDS[1:])
+        if unknown:
+            raise ValueError(f"Unknown notice fields: {sorted(unknown)}")
+        if not fields:
+            return self.get(notice_id) is not None
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute(
+                    f"UPDATE notices SET {assignments} WHERE notice_id = ?",
+                    [*fields.values(), notice_id],
+                )
+        return cursor.rowcount == 1
+
+    def remove(self, notice_id):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM notices WHERE notice_id = ?", (notice_id,))
+
+    def get(self, notice_id):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT * FROM notices WHERE notice_id = ?", (notice_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def by_filename(self, filename):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT * FROM notices WHERE filename = ?", (filename,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list(self, status=None, approval_status=None, with_csv=True):
+        clauses, params = [], []
+        if with_csv:
+            clauses.append("has_csv = 1")
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if approval_status:
+            clauses.append("approval_status = ?")
+            params.append(approval_status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT * FROM notices {where} ORDER BY upload_date DESC, notice_id", params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def costliest(self, limit=10, by="cost_usd"):
+        # Most expensive notices first, by one of COST_COLUMNS
+        if by not in COST_COLUMNS:
+            raise ValueError(f"Cannot sort notices by {by}")
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT * FROM notices ORDER BY {by} DESC, upload_date DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def fail_interrupted(self, keep=()):
+        # Jobs a previous run left in Processing can no longer finish, unless they
+        # have a checkpoint to resume from (`keep`)
+        keep = list(keep)
+        placeholders = ", ".join("?" for _ in keep)
+        exclude = f" AND notice_id NOT IN ({placeholders})" if keep else ""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                interrupted = conn.execute(
+                    "UPDATE notices SET status = 'Failed', last_updated = ? "
+                    f"WHERE status = 'Processing'{exclude}",
+                    (now_string(), *keep),
+                ).rowcount
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted notices as Failed")
+        return interrupted
+
+    def sync_directory(self, csv_dir, upload_dir=None):
+        # Adopt CSVs that predate the registry; their notice id is the document id, as before
+        with self._lock:
+            known = {
+                row[0] for row in self._connect().execute("SELECT filename FROM notices")
+            }
+        uploads = {}
+        if upload_dir and os.path.isdir(upload_dir):
+            uploads = {os.path.splitext(name)[0]: name for name in os.listdir(upload_dir)}
+        adopted = 0
+        for filename in os.listdir(csv_dir):
+            if not filename.endswith(".csv") or filename in known:
+                continue
+            file_path = os.path.join(csv_dir, filename)
+            document_id = os.path.splitext(filename)[0]
+            match = TIMESTAMP_RE.search(filename)
+            if match:
+                created = datetime.strptime(match.group(1), "%Y%m%d%H%M%S")
+            else:
+                created = datetime.fromtimestamp(os.path.getctime(file_path))
+            created = created.strftime("%Y-%m-%d %H:%M:%S")
+            content_hash = ""
+            if document_id in uploads:
+                content_hash = hash_file(os.path.join(upload_dir, uploads[document_id]))
+            self.register(
+                document_id,
+                filename,
+                status="Completed",
+                upload_date=created,
+                last_updated=created,
+                size=os.path.getsize(file_path),
+                has_csv=1,
+                content_hash=content_hash,
+            )
+            adopted += 1
+        return adopted
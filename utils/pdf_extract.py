@@ -0,0 +1,223 @@
+import os
+import sys
+import abc
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pypdf2")
+# Documents with at least this many pages are split into page ranges across processes
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+
+class PdfExtractor(abc.ABC):
+    name = None
+
+    @abc.abstractmethod
+    def page_count(self, path):
+        ...
+
+    @abc.abstractmethod
+    def extract_pages(self, path, start, stop):
+        # Text of pages [start, stop); empty string for pages without text
+        ...
+
+
+class PyPDF2Extractor(PdfExtractor):
+    name = "pypdf2"
+
+    def page_count(self, path):
+        import PyPDF2
+
+        with open(path, "rb") as f:
+            return len(PyPDF2.PdfReader(f).pages)
+
+    def extract_pages(self, path, start, stop):
+        import PyPDF2
+
+        with open(path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            return [
+                reader.pages[i].extract_text() or ""
+                for i in range(start, min(stop, len(reader.pages)))
+            ]
+
+
+def _open_pymupdf(path):
+    try:
+        import pymupdf
+    except ImportError:
+        # Older PyMuPDF releases only ship the fitz module name
+        import fitz as pymupdf
+    return pymupdf.open(path)
+
+
+class PyMuPDFExtractor(PdfExtractor):
+    name = "pymupdf"
+
+    def page_count(self, path):
+        with _open_pymupdf(path) as doc:
+            return doc.page_count
+
+    def extract_pages(self, path, start, stop):
+        with _open_pymupdf(path) as doc:
+            return [
+                doc.load_page(i).get_text() or ""
+                for i in range(start, min(stop, doc.page_count))
+            ]
+
+
+EXTRACTORS = {
+    PyPDF2Extractor.name: PyPDF2Extractor,
+    PyMuPDFExtractor.name: PyMuPDFExtractor,
+}
+
+
+class ExtractionResult:
+    __slots__ = ("pages", "backend", "seconds", "parallel", "text")
+
+    def __init__(self, pages, backend, seconds, parallel):
+        self.pages = pages
+        self.backend = backend
+        self.seconds = seconds
+        self.parallel = parallel
+        # Joined once here; same layout as the old page loop: non-empty pages,
+        # each newline-terminated
+        self.text = "".join(f"{page}\n" for page in pages if page)
+
+    @property
+    def empty_pages(self):
+        return sum(1 for page in self.pages if not page)
+
+
+def get_extractor(name=None):
+    name = (name or PDF_EXTRACTOR).lower()
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor: {name}")
+    return EXTRACTORS[name]()
+
+
+def _extract_range(backend, path, start, stop):
+    # Module-level so it can be pickled into the process pool
+    return EXTRACTORS[backend]().extract_pages(path, start, stop)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn keeps worker processes independent of the web server's threads
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+# Running totals per backend, for /api/pdf_backends
+backend_timings = {}
+_timings_lock = threading.Lock()
+
+
+def _record_timing(result):
+    with _timings_lock:
+        stats = backend_timings.setdefault(
+            result.backend, {"documents": 0, "pages": 0, "seconds": 0.0}
+        )
+        stats["documents"] += 1
+        stats["pages"] += len(result.pages)
+        stats["seconds"] += result.seconds
+
+
+def extract_pdf_text(path, backend=None, parallel=None):
+    extractor = get_extractor(backend)
+    start_time = time.perf_counter()
+    total_pages = extractor.page_count(path)
+    if parallel is None:
+        parallel = PDF_WORKERS > 1 and total_pages >= PDF_PARALLEL_MIN_PAGES
+
+    if parallel:
+        pool = _get_pool()
+        ranges = [
+            (start, min(start + PDF_PAGES_PER_TASK, total_pages))
+            for start in range(0, total_pages, PDF_PAGES_PER_TASK)
+        ]
+        futures = [
+            pool.submit(_extract_range, extractor.name, path, start, stop)
+            for start, stop in ranges
+        ]
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+    else:
+        pages = extractor.extract_pages(path, 0, total_pages)
+
+    result = ExtractionResult(
+        pages, extractor.name, time.perf_counter() - start_time, parallel
+    )
+    _record_timing(result)
+    logger.info(
+        f"Extracted {len(pages)} pages from {os.path.basename(path)} with "
+        f"{extractor.name}{' (parallel)' if parallel else ''} in {result.seconds:.3f}s"
+    )
+    return result
+
+
+def benchmark_backends(paths, parallel=None):
+    # Run every available backend over the same files and time them
+    rows = []
+    for name in EXTRACTORS:
+        total_seconds = 0.0
+        total_pages = 0
+        total_chars = 0
+        try:
+            for path in paths:
+                result = extract_pdf_text(path, backend=name, parallel=parallel)
+                total_seconds += result.seconds
+                total_pages += len(result.pages)
+                total_chars += len(result.text)
+        except Exception as e:
+            logger.error(f"Backend {name} failed: {str(e)}")
+            continue
+        rows.append(
+            {
+                "backend": name,
+                "files": len(paths),
+                "pages": total_pages,
+                "characters": total_chars,
+                "seconds": round(total_seconds, 3),
+                "pages_per_second": round(total_pages / total_seconds, 1)
+                if total_seconds
+                else 0,
+            }
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    from tabulate import tabulate
+
+    logging.basicConfig(level=logging.WARNING)
+    targets = sys.argv[1:] or ["Uploads"]
+    pdfs = []
+    for target in targets:
+        if os.path.isdir(target):
+            pdfs.extend(
+                os.path.join(target, name)
+                for name in sorted(os.listdir(target))
+                if name.lower().endswith(".pdf")
+            )
+        else:
+            pdfs.append(target)
+    print(tabulate(benchmark_backends(pdfs), headers="keys"))
@@ -0,0 +1,226 @@
+import os
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# USD per million tokens, for the cost estimates (defaults: gpt-4o-mini list prices)
+LLM_PRICE_INPUT = float(os.getenv("LLM_PRICE_INPUT", "0.15"))
+LLM_PRICE_OUTPUT = float(os.getenv("LLM_PRICE_OUTPUT", "0.60"))
+# Per-document counters kept for each stage of a notice
+DOCUMENT_COUNTERS = ("seconds", "calls", "prompt_tokens", "completion_tokens", "retries", "cache_hits")
+
+# (notice_id, stage) of the work running in this context; model calls are charged to it
+_scope = contextvars.ContextVar("perf_scope", default=None)
+
+
+def cost_usd(prompt_tokens, completion_tokens):
+    return round(
+        (prompt_tokens * LLM_PRICE_INPUT + completion_tokens * LLM_PRICE_OUTPUT) / 1_000_000, 6
+    )
+
+
+def in_scope(fn):
+    # Wraps fn to run in a copy of the caller's context, so work handed to a thread
+    # pool is still charged to the caller's document and stage
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        position = 0
+        while position < len(BUCKETS) and value > BUCKETS[position]:
+            position += 1
+        self.counts[position] += 1
+        self.sum += value
+        self.count += 1
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "mean": round(self.sum / self.count, 3) if self.count else 0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation; None past the last bound
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts[: len(BUCKETS)]):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[position]
+        return None
+
+
+def _empty_stage():
+    return {counter: 0 for counter in DOCUMENT_COUNTERS}
+
+
+def document_totals(stages):
+    # Roll a {stage: counters} breakdown up into one set of counters plus its cost
+    totals = _empty_stage()
+    for counters in stages.values():
+        for counter in DOCUMENT_COUNTERS:
+            totals[counter] += counters.get(counter, 0)
+    totals["seconds"] = round(totals["seconds"], 3)
+    totals["cost_usd"] = cost_usd(totals["prompt_tokens"], totals["completion_tokens"])
+    return totals
+
+
+class PerfRecorder:
+    # Process-wide latency histograms and token counters per stage, plus a running
+    # {stage: counters} breakdown for every document still being processed
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.documents = {}
+
+    def _observe(self, metric, label, seconds):
+        key = (metric, label)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+        self.histograms[key].observe(seconds)
+
+    def _add(self, counter, amount):
+        # Caller holds the lock; charges the current stage and its document
+        scope = _scope.get()
+        stage = scope[1] if scope else "other"
+        self.counters[(counter, stage)] = self.counters.get((counter, stage), 0) + amount
+        if scope and scope[0] in self.documents:
+            stages = self.documents[scope[0]]
+            stages.setdefault(stage, _empty_stage())[counter] += amount
+
+    def start(self, notice_id, stages=None):
+        # Begin tracking a document, continuing a breakdown saved by an earlier run
+        with self._lock:
+            self.documents[notice_id] = {
+                stage: dict(_empty_stage(), **counters) for stage, counters in (stages or {}).items()
+            }
+
+    @contextmanager
+    def stage(self, notice_id, stage):
+        with self._lock:
+            self.documents.setdefault(notice_id, {})
+        token = _scope.set((notice_id, stage))
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._observe("stage_seconds", stage, elapsed)
+                self._add("seconds", elapsed)
+            _scope.reset(token)
+
+    @contextmanager
+    def timed(self, name):
+        # Latency of one step inside a stage (a row request, a CSV write)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._observe("step_seconds", name, time.monotonic() - started)
+
+    def record_call(self, seconds, prompt_tokens, completion_tokens):
+        scope = _scope.get()
+        with self._lock:
+            self._observe("llm_request_seconds", scope[1] if scope else "other", seconds)
+            self._add("calls", 1)
+            self._add("prompt_tokens", prompt_tokens)
+            self._add("completion_tokens", completion_tokens)
+
+    def count(self, counter, amount=1):
+        with self._lock:
+            self._add(counter, amount)
+
+    def document(self, notice_id):
+        with self._lock:
+            stages = self.documents.get(notice_id)
+            return None if stages is None else _round_stages(stages)
+
+    def finish(self, notice_id):
+        # The document's breakdown, dropped from memory; the caller persists it
+        with self._lock:
+            stages = self.documents.pop(notice_id, {})
+        return _round_stages(stages)
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {}
+            for (metric, label), histogram in sorted(self.histograms.items()):
+                histograms.setdefault(metric, {})[label] = histogram.stats()
+            by_stage = {}
+            for (counter, stage), value in sorted(self.counters.items()):
+                by_stage.setdefault(stage, _empty_stage())[counter] = value
+            in_flight = {notice_id: _round_stages(stages) for notice_id, stages in self.documents.items()}
+        return {
+            "histograms": histograms,
+            "stages": _round_stages(by_stage),
+            "totals": document_totals(by_stage),
+            "in_flight": in_flight,
+            "prices_per_million": {"input": LLM_PRICE_INPUT, "output": LLM_PRICE_OUTPUT},
+        }
+
+    def prometheus(self):
+        # Text exposition format (version 0.0.4)
+        lines = []
+        with self._lock:
+            metrics = {}
+            for (metric, label), histogram in sorted(self.histograms.items()):
+                metrics.setdefault(metric, []).append((label, histogram))
+            for metric, entries in metrics.items():
+                name = f"pipeline_{metric}"
+                label_name = "step" if metric == "step_seconds" else "stage"
+                lines.append(f"# TYPE {name} histogram")
+                for label, histogram in entries:
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f'{name}_sum{{{label_name}="{label}"}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{{label_name}="{label}"}} {histogram.count}')
+            counters = {}
+            for (counter, stage), value in sorted(self.counters.items()):
+                counters.setdefault(counter, []).append((stage, value))
+            for counter, entries in counters.items():
+                name = f"pipeline_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                for stage, value in entries:
+                    lines.append(f'{name}{{stage="{stage}"}} {round(value, 6)}')
+            lines.append("# TYPE pipeline_documents_in_flight gauge")
+            lines.append(f"pipeline_documents_in_flight {len(self.documents)}")
+        return "\n".join(lines) + "\n"
+
+
+def _round_stages(stages):
+    return {
+        stage: dict(counters, seconds=round(counters["seconds"], 3))
+        for stage, counters in stages.items()
+    }
+
+
+# Shared by the pipeline, the LLM wrapper and the endpoints
+perf = PerfRecorder()
@@ -0,0 +1,116 @@
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Events after which a job's stream ends
+TERMINAL_EVENTS = ("completed", "failed")
+
+
+class _Channel:
+    __slots__ = ("events", "next_id", "finished_at")
+
+    def __init__(self, history):
+        self.events = deque(maxlen=history)
+        self.next_id = 1
+        self.finished_at = None
+
+
+class ProgressHub:
+    # Per-job event log that Server-Sent Event subscribers tail. Finished jobs are
+    # kept for `retention_seconds` so late or reconnecting clients still see the end.
+    def __init__(self, history=500, retention_seconds=600):
+        self.history = history
+        self.retention_seconds = retention_seconds
+        self._channels = {}
+        self._changed = threading.Condition()
+
+    def publish(self, job_id, event, **data):
+        now = time.time()
+        with self._changed:
+            channel = self._channels.get(job_id)
+            if channel is None or channel.finished_at:
+                # A job id reused after it finished starts a fresh stream
+                channel = self._channels[job_id] = _Channel(self.history)
+            record = dict(data, id=channel.next_id, event=event, time=round(now, 3))
+            channel.next_id += 1
+            channel.events.append(record)
+            if event in TERMINAL_EVENTS:
+                channel.finished_at = now
+            self._expire(now)
+            self._changed.notify_all()
+        return record
+
+    def reporter(self, job_id):
+        # Callable handed to pipeline code: progress("rows_enriched", done=3, total=10)
+        def progress(event, **data):
+            self.publish(job_id, event, **data)
+
+        return progress
+
+    def _expire(self, now):
+        expired = [
+            job_id
+            for job_id, channel in self._channels.items()
+            if channel.finished_at and now - channel.finished_at > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self._channels[job_id]
+
+    def known(self, job_id):
+        with self._changed:
+            return job_id in self._channels
+
+    def delivered(self, job_id, after):
+        # True when the job has finished and event `after` was its last one
+        with self._changed:
+            channel = self._channels.get(job_id)
+            return bool(channel and channel.finished_at and not self._pending(job_id, after))
+
+    def _pending(self, job_id, after):
+        channel = self._channels.get(job_id)
+        if channel is None:
+            return []
+        return [record for record in channel.events if record["id"] > after]
+
+    def events(self, job_id, after=0):
+        with self._changed:
+            return self._pending(job_id, after)
+
+    def subscribe(self, job_id, last_event_id=0, heartbeat=15, alive=None):
+        # Yields event dicts as they arrive, or None after `heartbeat` seconds of silence;
+        # returns after the job's terminal event. It also returns when that event was
+        # already delivered (a reconnect after the end) or the channel is gone and
+        # alive(), if given, says the job will publish nothing more.
+        while True:
+            with self._changed:
+                pending = self._pending(job_id, last_event_id)
+                deadline = time.monotonic() + heartbeat
+                # Other jobs' events wake us too; keep waiting until ours arrive
+                while not pending and time.monotonic() < deadline:
+                    channel = self._channels.get(job_id)
+                    if channel is not None and channel.finished_at:
+                        return
+                    if channel is None and not (alive and alive()):
+                        return
+                    self._changed.wait(deadline - time.monotonic())
+                    pending = self._pending(job_id, last_event_id)
+            if not pending:
+                yield None
+                continue
+            for record in pending:
+                last_event_id = record["id"]
+                yield record
+                if record["event"] in TERMINAL_EVENTS:
+                    return
+
+
+def format_sse(record):
+    # One Server-Sent Events frame; None becomes a comment line that keeps proxies open
+    if record is None:
+        return ": keep-alive\n\n"
+    return f"id: {record['id']}\nevent: {record['event']}\ndata: {json.dumps(record)}\n\n"
@@ -0,0 +1,172 @@
+import re
+import time
+import asyncio
+import logging
+import threading
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Fraction of a minute's allowance that may be spent in a single burst
+BURST_FRACTION = 1 / 6
+
+
+def parse_duration(value):
+    # OpenAI reset headers look like "20ms", "1s", "6m0s"; retry-after is plain seconds
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r"([\d.]+)(ms|s|m|h)", value):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.set_rate(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def set_rate(self, per_minute):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute * BURST_FRACTION)
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class RateLimiter:
+    # One limiter per process: a requests-per-minute and a tokens-per-minute bucket.
+    # The effective rate drops on 429s and recovers gradually on successes.
+    def __init__(self, rpm, tpm, min_fraction=0.1, recovery=0.05):
+        self.limit_rpm = rpm
+        self.limit_tpm = tpm
+        self.min_fraction = min_fraction
+        self.recovery = recovery
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self.waited_seconds = 0.0
+        self.acquired = 0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, tokens):
+        # Returns 0 after consuming, otherwise the number of seconds to wait
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+        self.requests.level -= 1
+        self.tokens.level -= min(tokens, self.tokens.capacity)
+        self.acquired += 1
+        return 0.0
+
+    def acquire(self, tokens):
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            time.sleep(min(wait, 1.0))
+        with self._lock:
+            self.waited_seconds += time.monotonic() - started
+
+    async def acquire_async(self, tokens):
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+        with self._lock:
+            self.waited_seconds += time.monotonic() - started
+
+    def reconcile(self, estimated, actual):
+        # Charge the difference between the estimate and the reported usage
+        if actual is None:
+            return
+        with self._lock:
+            self.tokens.level -= actual - estimated
+
+    def on_response(self, headers):
+        if not headers:
+            return
+        with self._lock:
+            limit_requests = headers.get("x-ratelimit-limit-requests")
+            limit_tokens = headers.get("x-ratelimit-limit-tokens")
+            if limit_requests:
+                self.limit_rpm = float(limit_requests)
+            if limit_tokens:
+                self.limit_tpm = float(limit_tokens)
+            # Additive increase towards the account limit
+            for bucket, limit in ((self.requests, self.limit_rpm), (self.tokens, self.limit_tpm)):
+                if bucket.per_minute < limit:
+                    bucket.set_rate(min(limit, bucket.per_minute + limit * self.recovery))
+                elif bucket.per_minute > limit:
+                    bucket.set_rate(limit)
+            # Never believe we have more room than the server says we do
+            remaining_requests = headers.get("x-ratelimit-remaining-requests")
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            if remaining_requests is not None:
+                self.requests.level = min(self.requests.level, float(remaining_requests))
+            if remaining_tokens is not None:
+                self.tokens.level = min(self.tokens.level, float(remaining_tokens))
+
+    def on_rate_limited(self, headers=None):
+        headers = headers or {}
+        retry_after = parse_duration(headers.get("retry-after")) or max(
+            parse_duration(headers.get("x-ratelimit-reset-requests")) or 0,
+            parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0,
+        )
+        with self._lock:
+            self.rate_limited += 1
+            # Multiplicative decrease, with a floor so traffic never stops entirely
+            self.requests.set_rate(
+                max(self.limit_rpm * self.min_fraction, self.requests.per_minute / 2)
+            )
+            self.tokens.set_rate(
+                max(self.limit_tpm * self.min_fraction, self.tokens.per_minute / 2)
+            )
+            self.requests.level = min(self.requests.level, 0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        logger.warning(
+            f"Rate limited by OpenAI; effective limits now {self.requests.per_minute:.0f} RPM / "
+            f"{self.tokens.per_minute:.0f} TPM, pausing {retry_after or 0:.2f}s"
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit_rpm": self.limit_rpm,
+                "limit_tpm": self.limit_tpm,
+                "effective_rpm": round(self.requests.per_minute, 1),
+                "effective_tpm": round(self.tokens.per_minute, 1),
+                "available_requests": round(self.requests.level, 1),
+                "available_tokens": round(self.tokens.level, 1),
+                "acquired": self.acquired,
+                "rate_limited": self.rate_limited,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
@@ -0,0 +1,114 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+import openai
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Transient API failures worth retrying; anything else (bad request, auth) is final
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+# Failures that mean the API itself is unhealthy; 429s are left to the rate limiter
+OUTAGE_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    # Exponential backoff with full jitter: uniform in [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class CircuitBreaker:
+    # Opens after `threshold` consecutive outage errors and holds every caller for
+    # `cooldown` seconds; then one probe request is let through (half-open). Its
+    # success closes the breaker, its failure opens it again.
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_until = 0.0
+        self.probing = False
+        self.opened = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _try_pass(self):
+        # Seconds to wait before asking again; 0 means the call may go ahead
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            now = time.monotonic()
+            if self.state == "open":
+                if now < self.opened_until:
+                    return self.opened_until - now
+                self.state = "half-open"
+                self.probing = False
+            if not self.probing:
+                self.probing = True
+                return 0.0
+            # A probe is in flight; check back shortly
+            return min(1.0, self.cooldown)
+
+    def wait(self):
+        started = time.monotonic()
+        delay = self._try_pass()
+        while delay:
+            time.sleep(delay)
+            delay = self._try_pass()
+        self._add_wait(time.monotonic() - started)
+
+    async def wait_async(self):
+        started = time.monotonic()
+        delay = self._try_pass()
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self._try_pass()
+        self._add_wait(time.monotonic() - started)
+
+    def _add_wait(self, seconds):
+        if seconds > 0.001:
+            with self._lock:
+                self.waited_seconds += seconds
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("OpenAI circuit breaker closed")
+            self.state = "closed"
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or (
+                self.state == "closed" and self.failures >= self.threshold
+            ):
+                self.state = "open"
+                self.opened_until = time.monotonic() + self.cooldown
+                self.probing = False
+                self.opened += 1
+                logger.warning(
+                    f"OpenAI circuit breaker opened after {self.failures} failures, "
+                    f"pausing requests for {self.cooldown:.0f}s"
+                )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "threshold": self.threshold,
+                "cooldown_seconds": self.cooldown,
+                "opened": self.opened,
+                "reopens_in_seconds": round(max(0.0, self.opened_until - time.monotonic()), 3)
+                if self.state == "open"
+                else 0,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import logging
+from difflib import SequenceMatcher
+from utils.document_rows import ENRICHED_COLUMNS
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Minimum similarity for two rows under the same Chapter / Section No. to be versions
+# of each other, and the stricter bar for rows that moved to another section number
+MATCH_THRESHOLD = 0.5
+MOVED_THRESHOLD = 0.8
+
+# Copied from the previous version onto unchanged rows
+CARRIED_COLUMNS = ENRICHED_COLUMNS + ("Marked as Completed", "Work Status", "Role Assigned To")
+
+
+def normalize(value):
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+
+def row_key(row):
+    return normalize(row.get("Chapter")), normalize(row.get("Section No."))
+
+
+def row_text(row):
+    return f"{normalize(row.get('Section'))}\n{normalize(row.get('Sub-Section'))}"
+
+
+def similarity(a, b):
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    # The quick upper bounds skip the expensive ratio for clearly different rows
+    if matcher.real_quick_ratio() < MATCH_THRESHOLD or matcher.quick_ratio() < MATCH_THRESHOLD:
+        return 0.0
+    return matcher.ratio()
+
+
+def _best_match(text, candidates, old_texts, used, threshold):
+    best, best_score = None, threshold
+    for index in candidates:
+        if index in used:
+            continue
+        score = 1.0 if old_texts[index] == text else similarity(text, old_texts[index])
+        if score >= best_score:
+            best, best_score = index, score
+            if score == 1.0:
+                break
+    return best, best_score
+
+
+def match_rows(old_rows, new_rows):
+    # One entry per new row: {"index", "previous_index", "change", "similarity"} where
+    # change is "unchanged", "changed" or "added"; plus the old indices left unmatched
+    old_texts = [row_text(row) for row in old_rows]
+    by_key, by_chapter = {}, {}
+    for index, row in enumerate(old_rows):
+        by_key.setdefault(row_key(row), []).append(index)
+        by_chapter.setdefault(row_key(row)[0], []).append(index)
+
+    used = set()
+    matches = []
+    for index, row in enumerate(new_rows):
+        text = row_text(row)
+        key = row_key(row)
+        previous, score = _best_match(text, by_key.get(key, []), old_texts, used, MATCH_THRESHOLD)
+        if previous is None:
+            # Renumbered sections: look elsewhere in the chapter, but demand closer text
+            previous, score = _best_match(
+                text, by_chapter.get(key[0], []), old_texts, used, MOVED_THRESHOLD
+            )
+        if previous is None:
+            matches.append({"index": index, "previous_index": None, "change": "added", "similarity": 0.0})
+            continue
+        used.add(previous)
+        unchanged = old_texts[previous] == text
+        matches.append(
+            {
+                "index": index,
+                "previous_index": previous,
+                "change": "unchanged" if unchanged else "changed",
+                "similarity": 1.0 if unchanged else round(score, 3),
+            }
+        )
+    removed = [index for index in range(len(old_rows)) if index not in used]
+    return matches, removed
+
+
+def carry_forward(old_rows, new_rows, matches):
+    # New rows with enrichment and user edits copied from their unchanged predecessors
+    rows = [dict(row) for row in new_rows]
+    for match in matches:
+        if match["change"] == "unchanged":
+            previous = old_rows[match["previous_index"]]
+            for column in CARRIED_COLUMNS:
+                if previous.get(column) not in (None, ""):
+                    rows[match["index"]][column] = previous[column]
+    return rows
+
+
+def change_report(old_rows, new_rows, matches, removed):
+    def describe(row):
+        return {
+            "chapter": row.get("Chapter", ""),
+            "section_no": row.get("Section No.", ""),
+            "section": row.get("Section", ""),
+        }
+
+    entries = [
+        dict(describe(new_rows[match["index"]]), **match) for match in matches
+    ] + [
+        dict(describe(old_rows[index]), index=None, previous_index=index, change="removed", similarity=0.0)
+        for index in removed
+    ]
+
+    # Section-level roll-up: a section is unchanged only if all of its rows are
+    sections = {}
+    for entry in entries:
+        key = (entry["chapter"], entry["section_no"])
+        section = sections.setdefault(
+            key,
+            {"chapter": entry["chapter"], "section_no": entry["section_no"], "section": entry["section"], "rows": {}},
+        )
+        section["rows"][entry["change"]] = section["rows"].get(entry["change"], 0) + 1
+    for section in sections.values():
+        changes = set(section["rows"])
+        if changes == {"unchanged"}:
+            section["change"] = "unchanged"
+        elif changes == {"added"}:
+            section["change"] = "added"
+        elif changes == {"removed"}:
+            section["change"] = "removed"
+        else:
+            section["change"] = "changed"
+
+    counts = {change: 0 for change in ("unchanged", "changed", "added", "removed")}
+    for entry in entries:
+        counts[entry["change"]] += 1
+    return {
+        "counts": counts,
+        "sections": list(sections.values()),
+        "rows": entries,
+    }
+
+
+def save_report(path, report):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_report(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,198 @@
+import os
+import re
+import calendar
+import logging
+from datetime import date, datetime, timedelta
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Set LOCAL_ROW_FIELDS=0 to ask the model for every field of every row, e.g. to compare outputs
+LOCAL_ROW_FIELDS = os.getenv("LOCAL_ROW_FIELDS", "1").lower() not in ("0", "false", "no", "off")
+
+MONTHS = {
+    name: number
+    for number in range(1, 13)
+    for name in (calendar.month_name[number].lower(), calendar.month_abbr[number].lower())
+}
+MONTHS["sept"] = 9
+MONTH_RE = r"(" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+ORDINAL_RE = r"(\d{1,2})(?:st|nd|rd|th)?"
+
+# Explicit dates: "March 31, 2025", "31st March 2025", "31.03.2025" (day first), "2025-03-31"
+MONTH_FIRST_RE = re.compile(rf"\b{MONTH_RE}\s+{ORDINAL_RE},?\s+(\d{{4}})\b", re.IGNORECASE)
+DAY_FIRST_RE = re.compile(rf"\b{ORDINAL_RE}\s+(?:of\s+)?{MONTH_RE},?\s+(\d{{4}})\b", re.IGNORECASE)
+NUMERIC_RE = re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4})\b")
+ISO_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+# Relative durations, resolved against the processing date: "within 6 months", "within thirty days"
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "thirty": 30,
+    "forty-five": 45, "sixty": 60, "ninety": 90, "a": 1, "one hundred and eighty": 180,
+}
+RELATIVE_RE = re.compile(
+    r"\bwithin\s+(?:a\s+period\s+of\s+)?("
+    + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+    + r"|\d{1,3})\s*(?:\(\d{1,3}\)\s*)?(calendar\s+|working\s+)?(day|week|month|year)s?\b",
+    re.IGNORECASE,
+)
+# References to when something was issued are not deadlines
+REFERENCE_RE = re.compile(r"\b(dated|issued\s+on|vide|circular\s+of)\s*$", re.IGNORECASE)
+# Timing language the rules above cannot resolve: leave the date to the model
+# ("may" is left out of the month names: as a verb it is in nearly every row)
+VAGUE_DATE_RE = re.compile(
+    r"\b("
+    + "|".join(sorted((name for name in MONTHS if name != "may"), key=len, reverse=True))
+    + r")\b|\b((19|20)\d{2}|deadline|timeline|not\s+later\s+than|on\s+or\s+before|"
+    r"by\s+the\s+end|end\s+of\s+the|within\s+(a\s+)?(reasonable|stipulated|specified|prescribed)|"
+    r"from\s+the\s+date|(day|week|month|year)s?)\b",
+    re.IGNORECASE,
+)
+
+PERIODICITY_RES = {
+    "daily": re.compile(r"\b(daily|every\s+day|each\s+day)\b", re.IGNORECASE),
+    "weekly": re.compile(r"\b(weekly|every\s+week|each\s+week)\b", re.IGNORECASE),
+    "fortnightly": re.compile(r"\b(fortnightly|every\s+fortnight)\b", re.IGNORECASE),
+    "monthly": re.compile(r"\b(monthly|every\s+month|each\s+month)\b", re.IGNORECASE),
+    "quarterly": re.compile(r"\b(quarterly|every\s+quarter|each\s+quarter)\b", re.IGNORECASE),
+    "half-yearly": re.compile(
+        r"\b(half[-\s]?yearly|semi[-\s]?annual(ly)?|bi[-\s]?annual(ly)?|every\s+six\s+months)\b",
+        re.IGNORECASE,
+    ),
+    "annual": re.compile(
+        r"\b(annually|yearly|every\s+year|each\s+year|once\s+a\s+year|once\s+in\s+a\s+year|"
+        r"per\s+annum|on\s+an\s+annual\s+basis)\b",
+        re.IGNORECASE,
+    ),
+}
+# Frequency language without a definite period ("annual report", "periodically", "ongoing")
+VAGUE_PERIODICITY_RE = re.compile(
+    r"\b(annual|periodic(al(ly)?)?|regular(ly)?|ongoing|continuous(ly)?|continual(ly)?|"
+    r"from\s+time\s+to\s+time|every|once|frequency|interval)",
+    re.IGNORECASE,
+)
+
+DEFINITION_TITLE_RE = re.compile(
+    r"^\s*(definitions?|interpretations?|abbreviations?|glossary)\b", re.IGNORECASE
+)
+# Definition wording that uses "shall" without creating an obligation
+DEFINITION_PHRASE_RE = re.compile(
+    r"\bshall\s+(mean|include|have\s+the\s+(same\s+)?meanings?|be\s+construed|be\s+interpreted)\b",
+    re.IGNORECASE,
+)
+OBLIGATION_RE = re.compile(
+    r"\b(shall|should|must|required|ensure|comply|submit|report|put\s+in\s+place)\b", re.IGNORECASE
+)
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _valid_date(year, month, day):
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _explicit_dates(text):
+    # (start, end, date) of every explicit date in the text; None for impossible dates
+    for match in MONTH_FIRST_RE.finditer(text):
+        yield match.start(), match.end(), _valid_date(
+            match.group(3), MONTHS[match.group(1).lower()], match.group(2)
+        )
+    for match in DAY_FIRST_RE.finditer(text):
+        yield match.start(), match.end(), _valid_date(
+            match.group(3), MONTHS[match.group(2).lower()], match.group(1)
+        )
+    for match in NUMERIC_RE.finditer(text):
+        yield match.start(), match.end(), _valid_date(match.group(3), match.group(2), match.group(1))
+    for match in ISO_RE.finditer(text):
+        yield match.start(), match.end(), _valid_date(match.group(1), match.group(2), match.group(3))
+
+
+def _relative_dates(text, today):
+    for match in RELATIVE_RE.finditer(text):
+        amount = match.group(1).lower()
+        amount = int(amount) if amount.isdigit() else NUMBER_WORDS[amount]
+        unit = match.group(3).lower()
+        if match.group(2) and match.group(2).lower().startswith("working"):
+            # Working days depend on holidays; let the model decide
+            yield match.start(), match.end(), None
+        elif unit == "day":
+            yield match.start(), match.end(), today + timedelta(days=amount)
+        elif unit == "week":
+            yield match.start(), match.end(), today + timedelta(weeks=amount)
+        elif unit == "month":
+            yield match.start(), match.end(), add_months(today, amount)
+        else:
+            yield match.start(), match.end(), add_months(today, 12 * amount)
+
+
+def extract_due_date(text, current_date):
+    # "YYYY-MM-DD" for a single unambiguous deadline, "N/A" when the text has no
+    # timing language at all, None when the model should decide
+    today = datetime.strptime(current_date, "%Y-%m-%d").date()
+    found = set()
+    spans = []
+    for start, end, value in list(_explicit_dates(text)) + list(_relative_dates(text, today)):
+        spans.append((start, end))
+        if REFERENCE_RE.search(text[max(0, start - 20) : start]):
+            continue
+        if value is None:
+            return None
+        found.add(value)
+    remainder = text
+    for start, end in sorted(spans, reverse=True):
+        remainder = remainder[:start] + " " + remainder[end:]
+    if len(found) > 1 or VAGUE_DATE_RE.search(remainder):
+        return None
+    return found.pop().strftime("%Y-%m-%d") if found else "N/A"
+
+
+def extract_periodicity(text):
+    # One of PERIODICITY_RES's keys, "N/A" when no frequency is mentioned, None when unclear
+    # In order, each period's words removed before the next looks: "semi-annually" is
+    # half-yearly, never also annual
+    matched = set()
+    remainder = text
+    for name, regex in PERIODICITY_RES.items():
+        if regex.search(remainder):
+            matched.add(name)
+            remainder = regex.sub(" ", remainder)
+    if len(matched) > 1 or VAGUE_PERIODICITY_RE.search(remainder):
+        return None
+    return matched.pop() if matched else "N/A"
+
+
+def local_row_fields(row, current_date):
+    # {"Due date", "Periodicity"} when both are certain from the row text, else None
+    text = " ".join(str(row[column]) for column in ("Section", "Sub-Section"))
+    due_date = extract_due_date(text, current_date)
+    periodicity = extract_periodicity(text) if due_date else None
+    if due_date is None or periodicity is None:
+        return None
+    return {"Due date": due_date, "Periodicity": periodicity}
+
+
+def is_definitional(row):
+    # Definitions sections that only define terms carry nothing to summarise or act on
+    sub_section = str(row["Sub-Section"]).strip()
+    if not sub_section or not DEFINITION_TITLE_RE.match(str(row["Section"])):
+        return False
+    return not OBLIGATION_RE.search(DEFINITION_PHRASE_RE.sub(" ", sub_section))
+
+
+def definitional_result(index, row):
+    return {
+        "index": index,
+        "Summary": f"Defines the terms used in these provisions ({row['Section']}).",
+        "Action Item": "No action required; apply these definitions when interpreting the requirements.",
+        "Due date": "N/A",
+        "Periodicity": "N/A",
+        "success": True,
+    }
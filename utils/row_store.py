@@ -0,0 +1,270 @@
+import io
+import os
+import sys
+import csv
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Columns users edit from the file view; everything else belongs to the pipeline
+EDITABLE_COLUMNS = ("Marked as Completed", "Work Status", "Role Assigned To")
+# Columns added to the documents table after the first release
+MIGRATIONS = {"version": "INTEGER NOT NULL DEFAULT 1"}
+
+
+def read_csv_rows(csv_path):
+    # Plain csv reader: every cell stays the string that was written, no dtype guessing
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        rows = [
+            {header: (row[i] if i < len(row) else "") for i, header in enumerate(headers)}
+            for row in reader
+        ]
+    return headers, rows
+
+
+class RowStore:
+    # SQLite (WAL) copy of every document's rows keyed by (document_id, row_index).
+    # Cell edits are single-row UPDATEs; the CSVs are imported once and exported on request.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    document_id TEXT PRIMARY KEY,
+                    csv_path TEXT NOT NULL,
+                    headers TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    source_mtime REAL NOT NULL,
+                    imported_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 1
+                );
+                CREATE TABLE IF NOT EXISTS rows (
+                    document_id TEXT NOT NULL,
+                    row_index INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (document_id, row_index)
+                ) WITHOUT ROWID;
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+            for column, definition in MIGRATIONS.items():
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE documents ADD COLUMN {column} {definition}"
+                    )
+            self._conn.commit()
+        return self._conn
+
+    def _document(self, conn, document_id):
+        return conn.execute(
+            "SELECT headers, row_count, source_mtime FROM documents WHERE document_id = ?",
+            (document_id,),
+        ).fetchone()
+
+    def import_csv(self, document_id, csv_path):
+        # (Re)load a CSV, keeping any edits already made to rows that still exist
+        headers, rows = read_csv_rows(csv_path)
+        mtime = os.path.getmtime(csv_path)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            edits = {
+                row_index: json.loads(data)
+                for row_index, data in conn.execute(
+                    "SELECT row_index, data FROM rows WHERE document_id = ?", (document_id,)
+                )
+            }
+            with conn:
+                conn.execute("DELETE FROM rows WHERE document_id = ?", (document_id,))
+                for row_index, row in enumerate(rows):
+                    previous = edits.get(row_index)
+                    if previous:
+                        for column in EDITABLE_COLUMNS:
+                            if column in row and column in previous:
+                                row[column] = previous[column]
+                conn.executemany(
+                    "INSERT INTO rows (document_id, row_index, data) VALUES (?, ?, ?)",
+                    (
+                        (document_id, row_index, json.dumps(row, ensure_ascii=False))
+                        for row_index, row in enumerate(rows)
+                    ),
+                )
+                # The version survives re-imports so ETags never repeat for a document
+                conn.execute(
+                    "INSERT OR REPLACE INTO documents "
+                    "(document_id, csv_path, headers, row_count, source_mtime, imported_at, "
+                    "updated_at, version) VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE("
+                    "(SELECT version FROM documents WHERE document_id = ?), 0) + 1)",
+                    (
+                        document_id,
+                        csv_path,
+                        json.dumps(headers),
+                        len(rows),
+                        mtime,
+                        now,
+                        now,
+                        document_id,
+                    ),
+                )
+        logger.info(f"Imported {len(rows)} rows of {document_id} into the row store")
+        return len(rows)
+
+    def ensure(self, document_id, csv_path):
+        # Import on first use, or again when the pipeline has rewritten the CSV since
+        if not os.path.exists(csv_path):
+            with self._lock:
+                return self._document(self._connect(), document_id) is not None
+        with self._lock:
+            document = self._document(self._connect(), document_id)
+        if document is None or os.path.getmtime(csv_path) > document[2]:
+            self.import_csv(document_id, csv_path)
+        return True
+
+    def import_directory(self, csv_dir):
+        imported = 0
+        for filename in sorted(os.listdir(csv_dir)):
+            if not filename.endswith(".csv"):
+                continue
+            document_id = os.path.splitext(filename)[0]
+            csv_path = os.path.join(csv_dir, filename)
+            with self._lock:
+                document = self._document(self._connect(), document_id)
+            if document is not None and os.path.getmtime(csv_path) <= document[2]:
+                continue
+            try:
+                self.import_csv(document_id, csv_path)
+                imported += 1
+            except Exception as e:
+                logger.error(f"Failed to import {csv_path} into the row store: {str(e)}")
+        return imported
+
+    def headers(self, document_id):
+        with self._lock:
+            document = self._document(self._connect(), document_id)
+        return json.loads(document[0]) if document else None
+
+    def version(self, document_id):
+        # Bumped by every import and cell edit; the basis for HTTP validators
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT version FROM documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def row_count(self, document_id):
+        with self._lock:
+            document = self._document(self._connect(), document_id)
+        return document[1] if document else 0
+
+    def rows(self, document_id, offset=0, limit=None):
+        with self._lock:
+            cursor = self._connect().execute(
+                "SELECT data FROM rows WHERE document_id = ? AND row_index >= ? "
+                "ORDER BY row_index LIMIT ?",
+                (document_id, offset, -1 if limit is None else limit),
+            )
+            return [json.loads(data) for (data,) in cursor]
+
+    def update_row(self, document_id, row_index, values):
+        # One transactional UPDATE; concurrent edits to other cells are never lost
+        values = {column: value for column, value in values.items() if value is not None}
+        unknown = set(values) - set(EDITABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Columns are not editable: {sorted(unknown)}")
+        if not values:
+            return True
+        assignments = ", ".join(f"'$.\"{column}\"', ?" for column in values)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute(
+                    f"UPDATE rows SET data = json_set(data, {assignments}) "
+                    "WHERE document_id = ? AND row_index = ?",
+                    (*[str(value) for value in values.values()], document_id, row_index),
+                )
+                if cursor.rowcount != 1:
+                    return False
+                conn.execute(
+                    "UPDATE documents SET updated_at = ?, version = version + 1 "
+                    "WHERE document_id = ?",
+                    (time.time(), document_id),
+                )
+        return True
+
+    def export_csv(self, document_id, csv_path=None):
+        # Returns the CSV text; also rewrites csv_path atomically when one is given
+        headers = self.headers(document_id)
+        if headers is None:
+            return None
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=headers, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(self.rows(document_id))
+        text = buffer.getvalue()
+        if csv_path:
+            tmp_path = f"{csv_path}.tmp"
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, csv_path)
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        "UPDATE documents SET csv_path = ?, source_mtime = ? WHERE document_id = ?",
+                        (csv_path, os.path.getmtime(csv_path), document_id),
+                    )
+            logger.info(f"Exported {document_id} from the row store to {csv_path}")
+        return text
+
+    def delete(self, document_id):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM rows WHERE document_id = ?", (document_id,))
+                conn.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+
+    def stats(self):
+        with self._lock:
+            documents, rows = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(row_count), 0) FROM documents"
+            ).fetchone()
+        return {"path": self.path, "documents": documents, "rows": rows}
+
+
+if __name__ == "__main__":
+    # python -m utils.row_store import [csv_dir] | export <document_id> [csv_path]
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    store = RowStore(os.getenv("ROW_STORE_PATH", "data/rows.sqlite3"))
+    command = sys.argv[1] if len(sys.argv) > 1 else "import"
+    if command == "import":
+        csv_dir = sys.argv[2] if len(sys.argv) > 2 else "data/Excel Sheets"
+        print(f"Imported {store.import_directory(csv_dir)} documents: {store.stats()}")
+    elif command == "export":
+        document_id = sys.argv[2]
+        csv_path = sys.argv[3] if len(sys.argv) > 3 else None
+        text = store.export_csv(document_id, csv_path)
+        if text is None:
+            sys.exit(f"Unknown document: {document_id}")
+        if not csv_path:
+            sys.stdout.write(text)
+    else:
+        sys.exit(f"Unknown command: {command}")
@@ -0,0 +1,463 @@
+import os
+import re
+import sys
+import logging
+
+from utils.chunking import (
+    CHAPTER_RE,
+    SECTION_RE,
+    PRINCIPLE_RE,
+    SUBSECTION_RE,
+    split_into_chunks,
+)
+from utils.tokens import count_tokens
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Set STRUCTURE_RULES=0 to send the whole document to the model, e.g. to compare outputs
+STRUCTURE_RULES = os.getenv("STRUCTURE_RULES", "1").lower() not in ("0", "false", "no", "off")
+
+NUMBERED_RE = re.compile(r"^\s*(\d{1,2})\.\s+(.*)$")
+SUBSECTION_NO_RE = re.compile(r"^\s*(\d{1,2})\.\d{1,2}")
+# List items inside a section: (a), a), a., (i), i)
+ITEM_RE = re.compile(r"^\s*(\(?[a-z]{1,2}\)|[a-z]\.\s|\(?[ivx]{1,5}\))\s*", re.IGNORECASE)
+# "Chapter - II  Role of the Regulated Entity", "Appendix - I  Usage of ...", "Annex"
+CHAPTER_TITLE_RE = re.compile(
+    r"^\s*(chapter|annex(ure)?|appendix)\s*[-–—]?\s*([ivxlc]+\b|\d+\b)?\s*[-–—:]?\s*(.*)$",
+    re.IGNORECASE,
+)
+# Table of contents entries: dot leaders or a trailing page number
+INDEX_RE = re.compile(r"\.{4,}|\s\d{1,3}\s*$")
+INDEX_MIN_RUN = 3
+# Headings never run longer than this; numbered lines above it start a paragraph
+TITLE_MAX_WORDS = 12
+SMALL_WORDS = {"a", "an", "and", "as", "at", "by", "for", "in", "of", "on", "or", "the", "to", "with"}
+# A numbered line using any of these opens a paragraph ("4. REs shall ..."), not a heading
+SENTENCE_WORDS = {"shall", "should", "may", "must", "will", "would", "can", "is", "are", "has", "have"}
+# Capitals the PDF text layer split off their word: "C ommunication", "I nterconnections"
+SPLIT_CAPITAL_RE = re.compile(r"(\w*)( ?)\b([A-Z]) ([a-z]+)\b")
+# Words a lone letter follows as a label ("Part B requirements"), never split off
+LABEL_WORDS = {
+    "part", "schedule", "form", "annex", "appendix", "table", "type", "tier", "category", "class", "section"
+}
+# How far back from a numbering restart to look for the title of the new part
+RESTART_LOOKBACK = 10
+
+
+def is_title(text, max_words=TITLE_MAX_WORDS):
+    text = text.strip()
+    words = text.split()
+    if not words or len(words) > max_words:
+        return False
+    if text[-1] in ".;,:" or not (text[0].isupper() or text[0].isdigit() or text[0] == "("):
+        return False
+    return not any(word.lower() in SENTENCE_WORDS for word in words)
+
+
+def is_heading(text):
+    # Unnumbered heading line: a short title with mostly capitalised words
+    if not is_title(text, max_words=10):
+        return False
+    words = [word for word in text.split() if word.isalpha() and word.lower() not in SMALL_WORDS]
+    return bool(words) and sum(word[0].isupper() for word in words) / len(words) >= 0.6
+
+
+def chapter_title(line, next_line):
+    # Title of a chapter heading; "CHAPTER - I" alone takes the next line as its title
+    match = CHAPTER_TITLE_RE.match(line)
+    title = re.sub(r"\.{4,}.*$", "", match.group(4) if match else "").strip(" -–—")
+    kind = match.group(1).lower() if match else ""
+    if not title and next_line and is_heading(next_line) and not NUMBERED_RE.match(next_line):
+        return next_line.strip(), True
+    if not title:
+        # Annexes without a title keep their own label, e.g. "Annex" or "Annex II"
+        return line.strip() if kind.startswith(("annex", "appendix")) else "", False
+    return title, False
+
+
+def join_split_capitals(text):
+    # "A" and "I" are words of their own before small words ("A and B"), and a letter
+    # after a label word is the label's ("Part B requirements")
+    def join(match):
+        before, space, letter, tail = match.groups()
+        if tail in SMALL_WORDS or before.lower() in LABEL_WORDS:
+            return match.group(0)
+        return f"{before}{space}{letter}{tail}"
+
+    return SPLIT_CAPITAL_RE.sub(join, text)
+
+
+def normalize_title(title):
+    title = join_split_capitals(re.sub(r"\s+", " ", title).strip())
+    return title.title() if title.isupper() else title
+
+
+def restart_title(lines):
+    # A document part restarting its numbering at 1 (cover letter, then the guidance
+    # itself) is usually preceded by its title and a few short lines (an index header).
+    # Returns (position, title) of the earliest such heading in lines, or None.
+    for position in range(max(len(lines) - RESTART_LOOKBACK, 0), len(lines)):
+        line = lines[position]
+        if (
+            len(line.split()) >= 3
+            and is_heading(line)
+            and all(len(after.split()) <= 4 for after in lines[position + 1 :])
+        ):
+            return position, line
+    return None
+
+
+def is_chapter_line(line):
+    # Annex mentions inside sentences ("Annex to RBI circular ... dated") are not headings
+    match = CHAPTER_TITLE_RE.match(line)
+    return (
+        bool(CHAPTER_RE.match(line))
+        and is_title(line, max_words=8)
+        and not (match and match.group(4)[:1].islower())
+    )
+
+
+def is_item_line(line):
+    return bool(SUBSECTION_RE.match(line) or PRINCIPLE_RE.match(line) or ITEM_RE.match(line))
+
+
+def index_lines(lines):
+    # Positions of table-of-contents runs, dropped before parsing
+    drop = set()
+    run = []
+    for position, line in enumerate(lines):
+        candidate = (
+            NUMBERED_RE.match(line) or CHAPTER_RE.match(line) or is_heading(line.split("..")[0])
+        ) and INDEX_RE.search(line)
+        if candidate:
+            run.append(position)
+            continue
+        if len(run) >= INDEX_MIN_RUN:
+            drop.update(run)
+        run = []
+    if len(run) >= INDEX_MIN_RUN:
+        drop.update(run)
+    return drop
+
+
+def contents_chapter_lines(lines, skipped):
+    # Chapters listed on a contents page without page numbers: a chapter line before
+    # the first numbered section whose title comes back as a later chapter line. It
+    # and the section titles listed under it are dropped like the index runs.
+    titles = {}
+    body_start = len(lines)
+    for position, line in enumerate(lines):
+        if position in skipped:
+            continue
+        numbered = NUMBERED_RE.match(line)
+        if numbered and SECTION_RE.match(line) and is_title(numbered.group(2)):
+            body_start = position
+            break
+    for position, line in enumerate(lines):
+        if position not in skipped and is_chapter_line(line):
+            next_line = lines[position + 1] if position + 1 < len(lines) else ""
+            titles[position] = (normalize_title(chapter_title(line, next_line)[0]), next_line)
+    drop = set()
+    for position, (title, next_line) in titles.items():
+        if position > body_start or not title:
+            continue
+        if not any(other == title for later, (other, _) in titles.items() if later > position):
+            continue
+        drop.add(position)
+        following = position + 1
+        while (
+            following < len(lines)
+            and following not in titles
+            and is_heading(lines[following])
+            and not NUMBERED_RE.match(lines[following])
+        ):
+            drop.add(following)
+            following += 1
+    return drop
+
+
+def sub_section_text(lines):
+    # Section body in the row format: "- 1.1 text - 1.1.1 text", one bullet per item
+    parts = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if not parts or is_item_line(line):
+            parts.append(f"- {line}")
+        else:
+            parts[-1] += f" {line}"
+    return re.sub(r"[ \t]+", " ", " ".join(parts))
+
+
+def _new_unit(kind, chapter, number="", title="", lines=None, ambiguous=False):
+    return {
+        "kind": kind,
+        "chapter": chapter,
+        "number": number,
+        "title": title,
+        "lines": lines or [],
+        "ambiguous": ambiguous,
+    }
+
+
+def plan_structure(text):
+    # Splits cleaned document text into units in document order: local "section" units
+    # whose numbering is unambiguous, and ambiguous ones (preamble, chapter text outside
+    # any section, breaks in numbering) that need the model. Index runs are dropped.
+    lines = text.splitlines()
+    skipped = index_lines(lines)
+    skipped |= contents_chapter_lines(lines, skipped)
+    units = [_new_unit("preamble", "", ambiguous=True)]
+    chapter = None  # None until the body starts
+    heading = ""
+    current_no = 0
+    chapter_start = True
+    parts = 1
+    position = 0
+    while position < len(lines):
+        line = lines[position]
+        next_line = lines[position + 1] if position + 1 < len(lines) else ""
+        position += 1
+        if position - 1 in skipped:
+            units[-1].setdefault("skipped", []).append(line)
+            continue
+        unit = units[-1]
+
+        if is_chapter_line(line):
+            title, consumed = chapter_title(line, next_line)
+            if consumed:
+                position += 1
+            chapter = normalize_title(title) or "Main Document"
+            heading = ""
+            chapter_start = True
+            units.append(_new_unit("chapter", chapter, ambiguous=True))
+            continue
+
+        numbered = NUMBERED_RE.match(line) if SECTION_RE.match(line) else None
+        if numbered:
+            number = int(numbered.group(1))
+            rest = numbered.group(2).strip()
+            titled = is_title(rest)
+            if chapter is not None and number == 1 and titled and current_no > 1 and not chapter_start:
+                # Numbering restarts: a new part of the document, never more sections of
+                # the current chapter (that would repeat its section numbers)
+                found = restart_title(unit["lines"])
+                if found:
+                    chapter = normalize_title(found[1])
+                    moved = unit["lines"][found[0] :]
+                    del unit["lines"][found[0] :]
+                else:
+                    parts += 1
+                    chapter = f"Part {parts}"
+                    moved = []
+                heading = ""
+                units.append(_new_unit("chapter", chapter))
+                units[-1]["skipped"] = moved
+                unit = units[-1]
+            expected = number == current_no + 1 or (number == 1 and (titled or chapter_start))
+            near = current_no < number <= current_no + 3 and titled
+            starts_body = chapter is None and number == 1 and titled
+            if chapter is not None and (expected or near) or starts_body:
+                if chapter is None:
+                    chapter = "Main Document"
+                # A heading line just before the number titles this section
+                pending = ""
+                body = unit["lines"]
+                if (
+                    body
+                    and is_heading(body[-1])
+                    and (len(body) == 1 or body[-2].rstrip()[-1:] in ".;:")
+                ):
+                    pending = normalize_title(body.pop())
+                    if unit["kind"] == "chapter" and not body:
+                        unit["ambiguous"] = False
+                if pending:
+                    heading = pending
+                section = _new_unit("section", chapter, str(number))
+                if titled:
+                    title = rest
+                    # Wrapped headings: a short tail line just before the first item
+                    after = lines[position + 1] if position + 1 < len(lines) else ""
+                    if (
+                        next_line.strip()
+                        and len(next_line.split()) <= 3
+                        and next_line.rstrip()[-1:] not in ".;,:"
+                        and not is_item_line(next_line)
+                        and not NUMBERED_RE.match(next_line)
+                        and is_item_line(after)
+                    ):
+                        title = f"{title} {next_line.strip()}"
+                        position += 1
+                    section["title"] = normalize_title(title)
+                else:
+                    # A paragraph without a title of its own takes the heading above it
+                    # ("Fraud Risk Management" for each of its numbered paragraphs);
+                    # with no heading in force the model has to name the section
+                    section["title"] = heading
+                    section["lines"].append(line)
+                    if not heading:
+                        section["ambiguous"] = True
+                if not expected:
+                    # A skipped number means a heading was missed: let the model re-split
+                    unit["ambiguous"] = True
+                    section["ambiguous"] = True
+                units.append(section)
+                current_no = number
+                chapter_start = False
+                continue
+            if unit["kind"] == "section" and number != current_no:
+                # Out-of-sequence number: a list item, or a heading we cannot place
+                unit["ambiguous"] = True
+
+        if unit["kind"] == "section":
+            sub_no = SUBSECTION_NO_RE.match(line)
+            if sub_no and SUBSECTION_RE.match(line) and int(sub_no.group(1)) != int(unit["number"]):
+                unit["ambiguous"] = True
+        unit["lines"].append(line)
+
+    planned = []
+    for position, unit in enumerate(units):
+        following = units[position + 1] if position + 1 < len(units) else None
+        filled = [line for line in unit["lines"] if line.strip()]
+        if unit["kind"] != "section" and (
+            not filled
+            # A contents page lists chapters with only their section titles under them
+            or (
+                unit["kind"] == "chapter"
+                and following is not None
+                and following["kind"] == "chapter"
+                and all(is_heading(line) for line in filled)
+            )
+        ):
+            skipped = unit.get("skipped", []) + unit["lines"]
+            planned.append(dict(unit, lines=[], skipped=skipped, ambiguous=False))
+            continue
+        planned.append(unit)
+    return planned
+
+
+def unit_row(unit):
+    return {
+        "Chapter": unit["chapter"],
+        "Section No.": unit["number"],
+        "Section": unit["title"],
+        "Sub-Section": sub_section_text(unit["lines"]),
+    }
+
+
+def unit_text(unit):
+    header = []
+    if unit["kind"] == "section":
+        header.append(f"{unit['number']}. {unit['title']}" if unit["title"] else "")
+    return "\n".join(line for line in header + unit["lines"] if line)
+
+
+def group_units(units):
+    # Consecutive units of the same kind merged into segments:
+    # [{"local": bool, "units": [...], "chapter", "section"}] in document order
+    segments = []
+    for unit in units:
+        local = not unit["ambiguous"]
+        if not local and not unit["lines"] and unit["kind"] != "section":
+            continue
+        if segments and segments[-1]["local"] == local:
+            segments[-1]["units"].append(unit)
+            continue
+        segments.append(
+            {
+                "local": local,
+                "units": [unit],
+                "chapter": unit["chapter"],
+                "section": f"{unit['number']}. {unit['title']}".strip(". ") if unit["number"] else "",
+            }
+        )
+    return segments
+
+
+def segment_text(segment):
+    return "\n".join(text for text in (unit_text(unit) for unit in segment["units"]) if text)
+
+
+def segment_rows(segment):
+    return [unit_row(unit) for unit in segment["units"] if unit["kind"] == "section"]
+
+
+def segment_chunks(segment, max_tokens):
+    # Model-bound text of an ambiguous segment, split to budget; pieces cut from the
+    # middle of the segment inherit its chapter and section as their context
+    chunks = split_into_chunks(segment_text(segment), max_tokens=max_tokens)
+    for chunk in chunks:
+        chunk["chapter"] = chunk["chapter"] or segment["chapter"]
+        chunk["section"] = chunk["section"] or segment["section"]
+    return chunks
+
+
+class StructurePlan:
+    __slots__ = ("segments", "tokens_local", "tokens_model")
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.tokens_local = sum(
+            count_tokens(segment_text(segment)) for segment in segments if segment["local"]
+        )
+        self.tokens_model = sum(
+            count_tokens(segment_text(segment)) for segment in segments if not segment["local"]
+        )
+
+    @property
+    def local_share(self):
+        total = self.tokens_local + self.tokens_model
+        return round(self.tokens_local / total, 3) if total else 0.0
+
+    def parts(self, max_tokens):
+        # Document-order parts: {"rows": [...]} parsed here, or {"text", "chapter", "section"}
+        parts = []
+        for segment in self.segments:
+            if segment["local"]:
+                parts.append({"rows": segment_rows(segment)})
+            else:
+                parts.extend(segment_chunks(segment, max_tokens))
+        return parts
+
+    def stats(self):
+        local = sum(segment["local"] for segment in self.segments)
+        return {
+            "segments_local": local,
+            "segments_model": len(self.segments) - local,
+            "tokens_local": self.tokens_local,
+            "tokens_model": self.tokens_model,
+            "local_share": self.local_share,
+        }
+
+
+def plan_document(text):
+    # Cleaned document text -> StructurePlan of local and model-bound segments
+    plan = StructurePlan(group_units(plan_structure(text)))
+    logger.info(f"Structure plan: {plan.stats()}")
+    return plan
+
+
+if __name__ == "__main__":
+    from tabulate import tabulate
+    from utils.helpers import clean_raw_text
+
+    logging.basicConfig(level=logging.WARNING)
+    targets = sys.argv[1:] or [os.path.join("data", "Extracted Text")]
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(
+                os.path.join(target, name)
+                for name in sorted(os.listdir(target))
+                if name.endswith(".txt")
+            )
+        else:
+            paths.append(target)
+    rows = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            text = clean_raw_text(f.read())
+        rows.append(dict({"file": os.path.basename(path)}, **plan_document(text).stats()))
+    print(tabulate(rows, headers="keys"))
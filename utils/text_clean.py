@@ -0,0 +1,166 @@
+import os
+import re
+import sys
+import math
+import logging
+from collections import Counter
+
+from utils.tokens import count_tokens
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+# Set TEXT_CLEANING=0 to send extracted text to the model untouched, e.g. to compare outputs
+TEXT_CLEANING = os.getenv("TEXT_CLEANING", "1").lower() not in ("0", "false", "no", "off")
+# Non-blank lines at the top and bottom of each page searched for headers and footers
+EDGE_LINES = int(os.getenv("TEXT_CLEAN_EDGE_LINES", "3"))
+# Share of pages an edge line must repeat on to count as a running header or footer
+REPEAT_FRACTION = float(os.getenv("TEXT_CLEAN_REPEAT_FRACTION", "0.5"))
+# Non-blank lines at the top of the first page searched for letterhead
+LETTERHEAD_LINES = int(os.getenv("TEXT_CLEAN_LETTERHEAD_LINES", "20"))
+
+# Hindi words in the PDFs come out as Devanagari mixed with U+FFFD for unmapped glyphs
+DEVANAGARI_RE = re.compile(r"[\u0900-\u097F\uA8E0-\uA8FF\uFFFD]")
+LATIN_RE = re.compile(r"[A-Za-z]")
+PAGE_NUMBER_RE = re.compile(
+    r"^(page\s*)?[-–]?\s*\d{1,4}\s*[-–]?(\s*(of|/)\s*\d{1,4})?$", re.IGNORECASE
+)
+LETTERHEAD_RES = [
+    re.compile(r"^reserve bank of india$", re.IGNORECASE),
+    re.compile(r"\b(tel|telephone|phone|fax)\b\.?\s*(no)?\.?\s*[:/]", re.IGNORECASE),
+    re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+|\bwww\.[\w.-]+", re.IGNORECASE),
+    re.compile(r"\b(floor|marg|building|bhavan)\b.*,", re.IGNORECASE),
+    re.compile(r"^[-–]?\s*\d{3}\s?\d{3}$"),
+]
+
+
+class CleaningResult:
+    __slots__ = ("text", "removed", "tokens_before", "tokens_after")
+
+    def __init__(self, text, removed, tokens_before, tokens_after):
+        self.text = text
+        self.removed = removed
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+
+    @property
+    def tokens_saved(self):
+        return self.tokens_before - self.tokens_after
+
+    def stats(self):
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_saved,
+            "removed_lines": dict(self.removed),
+        }
+
+
+def strip_devanagari(line):
+    # Drops Hindi words from a line; None if no Latin words are left of it
+    words = [word for word in line.split() if not DEVANAGARI_RE.search(word)]
+    kept = " ".join(words)
+    if not LATIN_RE.search(kept):
+        return None
+    return kept if len(words) != len(line.split()) else line
+
+
+def _edge_positions(lines):
+    # Indices of the first and last EDGE_LINES non-blank lines of a page
+    filled = [index for index, line in enumerate(lines) if line.strip()]
+    return set(filled[:EDGE_LINES] + filled[-EDGE_LINES:])
+
+
+def _edge_key(line):
+    # Running headers differ only by page number or date, so digits are masked
+    return re.sub(r"\d+", "#", re.sub(r"\s+", " ", line.strip().lower()))
+
+
+def clean_pages(pages):
+    # Deterministic pass over per-page text: Hindi, page numbers, repeated page
+    # headers/footers, first-page letterhead and blank lines. Returns a CleaningResult whose text
+    # has the same layout as ExtractionResult.text.
+    removed = Counter()
+    original = "".join(f"{page}\n" for page in pages if page)
+
+    page_lines = []
+    for page in pages:
+        if not page:
+            continue
+        lines = []
+        for line in page.split("\n"):
+            if DEVANAGARI_RE.search(line):
+                line = strip_devanagari(line)
+                if line is None:
+                    removed["devanagari"] += 1
+                    continue
+            lines.append(line)
+        page_lines.append(lines)
+
+    edge_keys = Counter()
+    for lines in page_lines:
+        edge_keys.update({_edge_key(lines[index]) for index in _edge_positions(lines)})
+    repeat_threshold = max(2, math.ceil(REPEAT_FRACTION * len(page_lines)))
+
+    cleaned_pages = []
+    for page_index, lines in enumerate(page_lines):
+        edges = _edge_positions(lines)
+        letterhead = set()
+        if page_index == 0:
+            filled = [index for index, line in enumerate(lines) if line.strip()]
+            letterhead = set(filled[:LETTERHEAD_LINES])
+        kept = []
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if not stripped:
+                # Blank runs are collapsed before structuring anyway; drop them here too
+                continue
+            elif index in edges and PAGE_NUMBER_RE.match(stripped):
+                removed["page_number"] += 1
+            elif index in edges and edge_keys[_edge_key(line)] >= repeat_threshold:
+                removed["header_footer"] += 1
+            elif index in letterhead and any(regex.search(stripped) for regex in LETTERHEAD_RES):
+                removed["letterhead"] += 1
+            else:
+                kept.append(line)
+        cleaned_pages.append("\n".join(kept))
+
+    text = "".join(f"{page}\n" for page in cleaned_pages if page)
+    result = CleaningResult(text, removed, count_tokens(original), count_tokens(text))
+    logger.info(
+        f"Cleaned text: {result.tokens_before} -> {result.tokens_after} tokens "
+        f"({result.tokens_saved} saved), removed {dict(removed)}"
+    )
+    return result
+
+
+def prepare_text(pages):
+    # The text the pipeline sends to the model, cleaned unless TEXT_CLEANING is off
+    if TEXT_CLEANING:
+        return clean_pages(pages)
+    text = "".join(f"{page}\n" for page in pages if page)
+    tokens = count_tokens(text)
+    return CleaningResult(text, Counter(), tokens, tokens)
+
+
+if __name__ == "__main__":
+    from tabulate import tabulate
+    from utils.pdf_extract import extract_pdf_text
+
+    logging.basicConfig(level=logging.WARNING)
+    targets = sys.argv[1:] or ["Uploads"]
+    pdfs = []
+    for target in targets:
+        if os.path.isdir(target):
+            pdfs.extend(
+                os.path.join(target, name)
+                for name in sorted(os.listdir(target))
+                if name.lower().endswith(".pdf")
+            )
+        else:
+            pdfs.append(target)
+    rows = []
+    for path in pdfs:
+        result = clean_pages(extract_pdf_text(path).pages)
+        rows.append(dict({"file": os.path.basename(path)}, **result.stats()))
+    print(tabulate(rows, headers="keys"))
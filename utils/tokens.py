@@ -0,0 +1,37 @@
+import logging
+import threading
+
+# Setup logger for this module
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def get_encoding(model="gpt-4o-mini"):
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+
+                    try:
+                        _encoding = tiktoken.encoding_for_model(model)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    # tiktoken needs its BPE files; fall back to a character estimate
+                    logger.warning(f"tiktoken unavailable, estimating tokens: {str(e)}")
+                    _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))